@@ -1,60 +1,40 @@
+import asyncio
 import sqlite3
-import random
-import hashlib
-from datetime import datetime, timedelta
-
-from fastapi import FastAPI, HTTPException, Depends, status
+import csv
+import io
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 
+from auth_tokens import (
+    ADMIN_USERS, InvalidTokenError, TOKEN_SECRET_CONFIGURED, TOKEN_TTL, decode_token, issue_token,
+    REVOCATION_MAINTENANCE_INTERVAL, prune_revocations, refresh_revocations, revocation_list, revoke_token,
+)
+from balance_cache import balance_cache, balance_etag
+from change_feed import change_feed
+from credentials import (
+    hash_password_async, verify_password_async, needs_rehash,
+    shutdown_executor as shutdown_credential_executor,
+)
+from db_pool import close_pool, get_pool
+from holiday_calendar import DateRangeError, calculate_working_days, check_date_range, get_calendar
+from metrics import MetricsMiddleware, METRICS_ENABLED, format_gauge, render_metrics
+from migrations import apply_migrations
+from write_queue import leave_write_queue, WriteQueueClosedError, WRITE_BEHIND_ENABLED
+from repository import (
+    LeaveRepository, get_repository, run_db, shutdown_executor,
+    InsufficientLeaveError, LeaveDecisionError, UserNotFoundError, fetch_last_change_event_id, iter_leave_requests,
+)
 
-# 데이터베이스 연결 유틸리티
-def get_db_connection():
-    conn = sqlite3.connect("leave_management.db")
-    conn.row_factory = sqlite3.Row
-    return conn
-
-# 비밀번호 해시 함수 (Streamlit 앱과 동일)
-def hash_password(password, salt=None):
-    if salt is None:
-        salt = str(random.randint(1000, 9999))
-
-    salted_password = f"{salt}{password}"
-    hashed = hashlib.sha256(salted_password.encode()).hexdigest()
-
-    return f"{salt}${hashed}"
-
-def verify_password(stored_password, provided_password):
-    try:
-        salt, hashed = stored_password.split('$')
-        new_hash = hashlib.sha256(f"{salt}{provided_password}".encode()).hexdigest()
-        return new_hash == hashed
-    except:
-        return False
-
-# 날짜 범위 내 날짜 계산 함수 (Streamlit 앱과 동일)
-def calculate_working_days(start_date, end_date, leave_type):
-    start = datetime.strptime(str(start_date), "%Y-%m-%d")
-    end = datetime.strptime(str(end_date), "%Y-%m-%d")
-    
-    # 반차인 경우 하루 이상 선택 불가
-    if (leave_type == 'MORNING_HALF' or leave_type == 'AFTERNOON_HALF'):
-        if start_date != end_date:
-            return {"error": "반차는 하루만 선택 가능합니다"}
-        return {"days": 0.5}
-    
-    # 주말을 제외한 날짜 계산
-    days = 0
-    current = start
-    while current <= end:
-        # 주말 제외 (토요일(5)과 일요일(6) 제외)
-        if current.weekday() < 5:
-            days += 1
-        current += timedelta(days=1)
-    
-    return {"days": days}
 
 # Pydantic 모델
 class UserCreate(BaseModel):
@@ -79,8 +59,109 @@ class LeaveResponse(BaseModel):
     leave_type: str
     status: str
 
+class LeaveHistoryPage(BaseModel):
+    items: List[LeaveResponse]
+    next_cursor: Optional[int] = None
+
+class BulkLeaveItem(BaseModel):
+    username: Optional[str] = None
+    start_date: str
+    end_date: str
+    leave_type: str
+
+class BulkLeaveSubmission(BaseModel):
+    requests: List[BulkLeaveItem]
+
+class LeaveDecision(BaseModel):
+    id: int
+    status: str
+
+class LeaveDecisionBatch(BaseModel):
+    decisions: List[LeaveDecision]
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+# 휴가 상태 / 유형 값
+LEAVE_STATUSES = ('PENDING', 'APPROVED', 'REJECTED')
+LEAVE_TYPES = ('FULL_DAY', 'MORNING_HALF', 'AFTERNOON_HALF')
+
+# 일괄 신청/결재 한 번에 받을 최대 건수
+MAX_BATCH_ITEMS = 10000
+
+# 팀 캘린더 한 번에 조회할 수 있는 최대 기간(일)
+MAX_CALENDAR_DAYS = 92
+
+# 휴가 내역 페이지 크기
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 500
+
+# 서버 워커 프로세스 수 / 포트 (여러 워커는 같은 DB 를 쓰고, 캐시는 변경 피드로 서로 무효화)
+# uvicorn --workers 로 직접 띄울 때도 확인할 수 있도록 WEB_CONCURRENCY 도 읽음
+SERVER_WORKERS = int(os.environ.get("LEAVE_WORKERS") or os.environ.get("WEB_CONCURRENCY") or "1")
+SERVER_PORT = int(os.environ.get("LEAVE_PORT", "8000"))
+
+# 워커마다 서명 키를 따로 만들면 한 워커가 발급한 토큰을 다른 워커가 거부하므로 시작하지 않음
+def check_worker_settings(workers=SERVER_WORKERS):
+    if workers > 1 and not TOKEN_SECRET_CONFIGURED:
+        raise RuntimeError("워커를 여러 개 실행하려면 LEAVE_TOKEN_SECRET 으로 공통 서명 키를 지정해야 합니다.")
+
+# 다른 워커/프로세스의 변경 이벤트로 이 워커의 캐시 무효화 (직원 정보/잔액 캐시, 폐기된 토큰 목록)
+# 변경 피드 poll 주기 안에 반영되고, poller 가 멈춰도 캐시 TTL 이 지나면 결국 다시 읽는다.
+def apply_remote_changes(events):
+    usernames = set()
+    for event in events:
+        if event["type"] == "token.revoked":
+            revocation_list.add(event["data"]["token_id"], event["data"]["expires_at"])
+        elif event["username"] is not None:
+            usernames.add(event["username"])
+    if usernames:
+        balance_cache.invalidate_many(usernames)
+
+change_feed.add_listener(apply_remote_changes)
+
+# 만료된 폐기 토큰 정리 (요청 경로가 아닌 백그라운드에서 주기적으로)
+async def revocation_maintenance():
+    while True:
+        await asyncio.sleep(REVOCATION_MAINTENANCE_INTERVAL)
+        try:
+            await run_db(prune_revocations)
+        except sqlite3.Error:
+            # 다음 주기에 다시 시도
+            pass
+
+# 앱 시작 시 스키마 마이그레이션, 종료 시 DB 스레드 풀과 연결 풀 정리
+@asynccontextmanager
+async def lifespan(app):
+    check_worker_settings()
+    with get_pool().connection() as conn:
+        apply_migrations(conn)
+        prune_revocations(conn)
+
+    # write-behind 모드: 휴가 신청을 group commit 큐로 처리
+    if WRITE_BEHIND_ENABLED:
+        leave_write_queue.start()
+        get_repository().write_queue = leave_write_queue
+
+    # 변경 피드 poller (SSE/long-poll, 워커 간 캐시 무효화)
+    # 피드 위치를 잡은 뒤 폐기 목록을 다시 읽어야 그 사이에 다른 워커가 폐기한 토큰도 놓치지 않음
+    await change_feed.start()
+    await run_db(refresh_revocations)
+    maintenance = asyncio.get_running_loop().create_task(revocation_maintenance())
+
+    yield
+
+    maintenance.cancel()
+    await change_feed.stop()
+    await leave_write_queue.stop()
+    shutdown_executor()
+    shutdown_credential_executor()
+    close_pool()
+
 # FastAPI 앱 생성
-app = FastAPI(title="연차 관리 시스템 API")
+app = FastAPI(title="연차 관리 시스템 API", lifespan=lifespan)
 
 # CORS 미들웨어 추가
 app.add_middleware(
@@ -91,64 +172,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 수 / 지연 시간 / 오류 수 지표 수집
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # OAuth2 인증
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# 토큰 검증 의존성 - 서명/만료/폐기 여부를 메모리에서만 확인 (DB 조회 없음)
+async def get_token_claims(token: str = Depends(oauth2_scheme)):
+    try:
+        username, expires_at, token_id = decode_token(token)
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if token_id in revocation_list:
+        raise HTTPException(status_code=401, detail="폐기된 토큰입니다.", headers={"WWW-Authenticate": "Bearer"})
+    return username, expires_at, token_id
+
+async def get_current_username(claims=Depends(get_token_claims)):
+    return claims[0]
+
+# 예전 클라이언트가 보내는 username 쿼리 파라미터는 토큰의 사용자와 같을 때만 허용
+def resolve_username(current_username, username):
+    if username is not None and username != current_username:
+        raise HTTPException(status_code=403, detail="다른 사용자의 정보에는 접근할 수 없습니다.")
+    return current_username
+
+# 로그인에 성공한 예전 형식(salt$sha256) 해시는 현재 KDF 로 다시 저장 (실패해도 로그인은 계속)
+async def rehash_if_needed(repo, username, stored_password, password):
+    if not needs_rehash(stored_password):
+        return
+    try:
+        new_hash = await hash_password_async(password)
+        await repo.update_password(username, stored_password, new_hash)
+    except sqlite3.Error:
+        pass
+
+def token_response(username):
+    access_token, _ = issue_token(username)
+    return {"access_token": access_token, "token_type": "bearer", "expires_in": TOKEN_TTL}
+
 # 회원가입 엔드포인트
 @app.post("/signup")
-async def signup(user: UserCreate):
+async def signup(user: UserCreate, repo: LeaveRepository = Depends(get_repository)):
     # 입력 검증
     if len(user.username) != 3:
         raise HTTPException(status_code=400, detail="이름은 3글자여야 합니다.")
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         try:
             # 사용자 추가
-            hashed_password = hash_password(user.password)
-            cursor.execute("""
-                INSERT INTO employees (username, password, total_leave, used_leave)
-                VALUES (?, ?, 14, 0)
-            """, (user.username, hashed_password))
-
-            conn.commit()
+            hashed_password = await hash_password_async(user.password)
+            await repo.create_employee(user.username, hashed_password)
             return {"message": f"{user.username}님, 회원가입이 완료되었습니다!"}
 
         except sqlite3.IntegrityError:
             raise HTTPException(status_code=400, detail="이미 존재하는 이름입니다. 다른 이름을 사용해주세요.")
         except sqlite3.Error as e:
             raise HTTPException(status_code=500, detail=f"데이터베이스 오류: {e}")
-        finally:
-            conn.close()
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"회원가입 중 오류 발생: {e}")
 
 # 로그인 엔드포인트
 @app.post("/login")
-async def login(user: UserLogin):
+async def login(user: UserLogin, repo: LeaveRepository = Depends(get_repository)):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         # 사용자 정보 조회
-        cursor.execute("SELECT password, total_leave, used_leave FROM employees WHERE username=?", (user.username,))
-        user_record = cursor.fetchone()
+        user_record = await repo.get_employee(user.username)
 
         if user_record:
             stored_password = user_record['password']
             total_leave = user_record['total_leave']
             used_leave = user_record['used_leave']
 
-            # 비밀번호 검증
-            if verify_password(stored_password, user.password):
+            # 비밀번호 검증 (KDF 계산은 작업자 풀에서)
+            if await verify_password_async(stored_password, user.password):
+                await rehash_if_needed(repo, user.username, stored_password, user.password)
                 return {
                     "message": "로그인 성공", 
                     "username": user.username,
                     "total_leave": total_leave,
-                    "used_leave": used_leave
+                    "used_leave": used_leave,
+                    **token_response(user.username),
                 }
             else:
                 raise HTTPException(status_code=401, detail="로그인 실패! 비밀번호가 일치하지 않습니다.")
@@ -157,79 +265,198 @@ async def login(user: UserLogin):
 
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"데이터베이스 오류: {e}")
-    finally:
-        conn.close()
+
+# 액세스 토큰 발급 엔드포인트 (OAuth2 password 방식 - form 의 username/password)
+# 이후 요청은 Authorization: Bearer <토큰> 으로 인증하므로 비밀번호 해시를 다시 계산하지 않음
+@app.post("/token", response_model=TokenResponse)
+async def create_token(form_data: OAuth2PasswordRequestForm = Depends(),
+                       repo: LeaveRepository = Depends(get_repository)):
+    try:
+        user_record = await repo.get_employee(form_data.username)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"데이터베이스 오류: {e}")
+
+    if not user_record or not await verify_password_async(user_record['password'], form_data.password):
+        raise HTTPException(status_code=401, detail="이름 또는 비밀번호가 올바르지 않습니다.",
+                            headers={"WWW-Authenticate": "Bearer"})
+    await rehash_if_needed(repo, form_data.username, user_record['password'], form_data.password)
+    return token_response(form_data.username)
+
+# 로그아웃 엔드포인트 - 현재 토큰을 만료 시각까지 폐기
+@app.post("/logout")
+async def logout(claims=Depends(get_token_claims)):
+    _, expires_at, token_id = claims
+    try:
+        await run_db(revoke_token, token_id, expires_at)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"로그아웃 중 오류 발생: {e}")
+    return {"message": "로그아웃되었습니다."}
+
+# 휴가 신청 한 건 검증 후 사용 일수 반환 (단건/일괄 신청 공용 - 잘못된 신청이면 HTTPException)
+def expected_leave_days(start_date, end_date, leave_type):
+    if leave_type not in LEAVE_TYPES:
+        raise HTTPException(status_code=422, detail=f"leave_type 은 {', '.join(LEAVE_TYPES)} 중 하나여야 합니다.")
+    try:
+        result = calculate_working_days(start_date, end_date, leave_type)
+    except DateRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="날짜는 YYYY-MM-DD 형식이어야 합니다.")
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    if result["days"] <= 0:
+        raise HTTPException(status_code=400, detail="선택한 기간에 근무일이 없습니다.")
+    return result["days"]
 
 # 휴가 신청 엔드포인트
 @app.post("/leave-request")
-async def create_leave_request(request: LeaveRequest, username: str):
+async def create_leave_request(
+    request: LeaveRequest,
+    username: Optional[str] = None,
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_username(current_username, username)
+
     # 예상 사용 연차 계산
-    result = calculate_working_days(request.start_date, request.end_date, request.leave_type)
-    
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
-    
-    expected_days = result['days']
+    expected_days = expected_leave_days(request.start_date, request.end_date, request.leave_type)
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # 남은 연차 확인 후 휴가 요청 저장 및 사용 연차 업데이트
+        await repo.create_leave_request(username, request.start_date, request.end_date,
+                                        expected_days, request.leave_type)
+        change_feed.notify()
+        return {"message": "✅ 휴가 신청이 완료되었습니다!", "days": expected_days}
+
+    except UserNotFoundError:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    except InsufficientLeaveError:
+        raise HTTPException(status_code=400, detail="남은 연차가 부족합니다.")
+    except WriteQueueClosedError:
+        raise HTTPException(status_code=503, detail="서버가 종료 중입니다. 잠시 후 다시 시도해주세요.")
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"휴가 신청 중 오류 발생: {e}")
+
+# 일괄 휴가 신청 엔드포인트 (HR 일괄 등록 등)
+# 전체를 먼저 검증한 뒤 유효한 건만 한 트랜잭션으로 저장하고, 건별 결과를 요청 순서대로 반환
+# username 을 생략하면 토큰의 사용자, 다른 직원 이름은 관리자만 지정 가능
+@app.post("/leave-requests/batch")
+async def create_leave_requests_batch(
+    batch: BulkLeaveSubmission,
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    if len(batch.requests) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_ITEMS}건까지 신청할 수 있습니다.")
+
+    is_admin = current_username in ADMIN_USERS
+    results = [None] * len(batch.requests)
+    valid = []
+    for index, item in enumerate(batch.requests):
+        username = item.username or current_username
+        if username != current_username and not is_admin:
+            results[index] = {"index": index, "error": "다른 직원의 휴가는 관리자만 신청할 수 있습니다."}
+            continue
+        try:
+            days = expected_leave_days(item.start_date, item.end_date, item.leave_type)
+        except HTTPException as e:
+            results[index] = {"index": index, "error": e.detail}
+            continue
+        valid.append((index, (username, item.start_date, item.end_date, days, item.leave_type)))
 
-        # 남은 연차 확인
-        cursor.execute("SELECT total_leave, used_leave FROM employees WHERE username=?", (username,))
-        user = cursor.fetchone()
-        
-        remaining_leave = user['total_leave'] - user['used_leave']
-        
-        if expected_days > remaining_leave:
-            raise HTTPException(status_code=400, detail="남은 연차가 부족합니다.")
+    if valid:
+        try:
+            outcomes = await repo.create_leave_requests_bulk([request for _, request in valid])
+            change_feed.notify()
+        except sqlite3.Error as e:
+            raise HTTPException(status_code=500, detail=f"일괄 휴가 신청 중 오류 발생: {e}")
 
+        for (index, request), outcome in zip(valid, outcomes):
+            if isinstance(outcome, UserNotFoundError):
+                results[index] = {"index": index, "error": "사용자를 찾을 수 없습니다."}
+            elif isinstance(outcome, InsufficientLeaveError):
+                results[index] = {"index": index, "error": "남은 연차가 부족합니다."}
+            else:
+                results[index] = {"index": index, "id": outcome, "username": request[0], "days": request[3]}
+
+    created = sum(1 for result in results if "id" in result)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+# 일괄 승인/반려 엔드포인트 (관리자용)
+# 대기 중인 신청만 결재할 수 있고, 반려하면 사용 연차를 되돌림
+@app.post("/leave-requests/decisions")
+async def decide_leave_requests(
+    batch: LeaveDecisionBatch,
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    if current_username not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="관리자만 휴가를 승인/반려할 수 있습니다.")
+    if len(batch.decisions) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_ITEMS}건까지 처리할 수 있습니다.")
+
+    results = [None] * len(batch.decisions)
+    valid = []
+    for index, decision in enumerate(batch.decisions):
+        if decision.status not in ('APPROVED', 'REJECTED'):
+            results[index] = {"index": index, "id": decision.id, "error": "status 는 APPROVED 또는 REJECTED 여야 합니다."}
+            continue
+        valid.append((index, (decision.id, decision.status)))
+
+    if valid:
         try:
-            # 휴가 요청 테이블에 저장
-            cursor.execute("""
-                INSERT INTO leave_requests 
-                (username, start_date, end_date, days, leave_type, status)
-                VALUES (?, ?, ?, ?, ?, 'PENDING')
-            """, (username, request.start_date, request.end_date, 
-                  expected_days, request.leave_type))
-
-            # 직원 테이블의 사용 연차 업데이트
-            cursor.execute("""
-                UPDATE employees
-                SET used_leave = used_leave + ?
-                WHERE username = ?
-            """, (expected_days, username))
-
-            conn.commit()
-            return {"message": "✅ 휴가 신청이 완료되었습니다!", "days": expected_days}
-
-        except Exception as e:
-            conn.rollback()
-            raise HTTPException(status_code=500, detail=f"휴가 신청 중 오류 발생: {e}")
+            outcomes = await repo.decide_leave_requests([decision for _, decision in valid])
+            change_feed.notify()
+        except sqlite3.Error as e:
+            raise HTTPException(status_code=500, detail=f"일괄 결재 중 오류 발생: {e}")
 
-    except sqlite3.Error as e:
-        raise HTTPException(status_code=500, detail=f"데이터베이스 오류: {e}")
-    finally:
-        conn.close()
+        for (index, (leave_id, new_status)), outcome in zip(valid, outcomes):
+            if isinstance(outcome, LeaveDecisionError):
+                results[index] = {"index": index, "id": leave_id, "error": str(outcome)}
+            else:
+                results[index] = {"index": index, "id": leave_id, "username": outcome[0], "status": new_status}
+
+    updated = sum(1 for result in results if "status" in result)
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
+
+# If-None-Match 헤더에 etag 가 있는지 ("a", W/"b" 처럼 쉼표로 여러 개 가능)
+def etag_matches(if_none_match, etag):
+    return if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]
+
+# 마지막 변경 이벤트 id 로 만든 약한 ETag - 그 뒤로 어떤 쓰기도 없었으면 같은 값이라 본 조회 없이 304 를 줄 수 있음
+# 변경 피드 poller 의 위치가 아니라 DB 에서 읽으므로 이 워커/다른 워커의 쓰기 직후에도 바로 바뀐다.
+# 본 조회 전에 읽어야 응답 내용이 ETag 보다 오래되지 않음
+async def change_etag():
+    return f'W/"changes-{await run_db(fetch_last_change_event_id)}"'
+
+# 휴가 신청 내역 조회 엔드포인트 (keyset 페이지네이션 - 다음 페이지는 after_id=next_cursor 로 요청)
+# 마지막 변경 이후 같은 요청이면 If-None-Match 로 304 반환
+@app.get("/leave-history", response_model=LeaveHistoryPage)
+async def get_leave_history(
+    response: Response,
+    username: Optional[str] = None,
+    limit: int = Query(DEFAULT_HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT),
+    after_id: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_username(current_username, username)
 
-# 휴가 신청 내역 조회 엔드포인트
-@app.get("/leave-history", response_model=List[LeaveResponse])
-async def get_leave_history(username: str):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        etag = await change_etag()
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
 
         # 현재 사용자의 휴가 신청 내역 조회 (최신 순으로 정렬)
-        cursor.execute("""
-            SELECT id, username, start_date, end_date, days, leave_type, status
-            FROM leave_requests 
-            WHERE username = ?
-            ORDER BY id DESC
-        """, (username,))
+        # 다음 페이지 존재 여부를 알기 위해 한 건 더 읽음
+        leave_history = await repo.get_leave_history(username, limit + 1, after_id)
+        has_more = len(leave_history) > limit
+        leave_history = leave_history[:limit]
         
-        leave_history = cursor.fetchall()
-        
-        return [
+        items = [
             LeaveResponse(
                 id=row['id'],
                 username=row['username'],
@@ -240,28 +467,33 @@ async def get_leave_history(username: str):
                 status=row['status']
             ) for row in leave_history
         ]
+        return LeaveHistoryPage(items=items, next_cursor=items[-1].id if has_more else None)
 
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"휴가 신청 내역 조회 중 오류 발생: {e}")
-    finally:
-        conn.close()
 
 # 사용자 정보 조회 엔드포인트
+# 캐시에 있으면 DB 조회 없이 응답하고, If-None-Match 가 현재 ETag 와 같으면 304 반환
 @app.get("/user-info")
-async def get_user_info(username: str):
+async def get_user_info(
+    response: Response,
+    username: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_username(current_username, username)
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT total_leave, used_leave 
-            FROM employees 
-            WHERE username = ?
-        """, (username,))
-        
-        user = cursor.fetchone()
+        user = await repo.get_balance(username)
         
         if user:
+            etag = balance_etag(username, user['total_leave'], user['used_leave'])
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
             return {
                 "total_leave": user['total_leave'],
                 "used_leave": user['used_leave'],
@@ -272,10 +504,314 @@ async def get_user_info(username: str):
 
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"사용자 정보 조회 중 오류 발생: {e}")
-    finally:
-        conn.close()
 
-# FastAPI 서버 실행 (로컬 개발용)
+# 근무일별 휴가자 이름 {날짜: [이름, ...]} (기간 안의 모든 근무일 포함)
+def on_leave_by_day(entries, start, end):
+    calendar = get_calendar()
+    days = {}
+    day = start
+    while day <= end:
+        if calendar.is_business_day(day):
+            days[day.isoformat()] = []
+        day += timedelta(days=1)
+
+    for entry in entries:
+        day = max(date.fromisoformat(entry['start_date']), start)
+        last = min(date.fromisoformat(entry['end_date']), end)
+        while day <= last:
+            names = days.get(day.isoformat())
+            if names is not None:
+                names.append(entry['username'])
+            day += timedelta(days=1)
+    return days
+
+# 팀 캘린더 엔드포인트 - 기간과 겹치는 휴가 (승인 + 기본으로 대기 중 포함)
+@app.get("/calendar")
+async def get_team_calendar(
+    response: Response,
+    date_from: str = Query(..., alias="from"),
+    date_to: str = Query(..., alias="to"),
+    include_pending: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    try:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+        check_date_range(start, end)
+        get_calendar().check_covered(start, end)
+    except DateRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="날짜는 YYYY-MM-DD 형식이어야 합니다.")
+    if start > end:
+        raise HTTPException(status_code=400, detail="시작 날짜가 종료 날짜보다 늦습니다.")
+    if (end - start).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_CALENDAR_DAYS}일까지 조회할 수 있습니다.")
+
+    try:
+        etag = await change_etag()
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+        rows = await repo.get_calendar(start, end, include_pending)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"팀 캘린더 조회 중 오류 발생: {e}")
+
+    entries = [dict(row) for row in rows]
+    return {
+        "from": date_from,
+        "to": date_to,
+        "entries": entries,
+        "days": on_leave_by_day(entries, start, end),
+    }
+
+# 보고서 조회 대상 사용자 - 관리자는 전체(username 생략) 또는 특정 직원, 일반 사용자는 본인만
+def resolve_report_username(current_username, username):
+    if current_username in ADMIN_USERS:
+        return username
+    return resolve_username(current_username, username)
+
+# 보고서에 포함할 상태 (기본: 반려 제외 = 사용 연차에 반영되는 신청)
+def parse_report_statuses(status):
+    if status is None:
+        return ('APPROVED', 'PENDING')
+    statuses = tuple(value.strip() for value in status.split(",") if value.strip())
+    if not statuses or any(value not in LEAVE_STATUSES for value in statuses):
+        raise HTTPException(status_code=400, detail=f"status 는 {', '.join(LEAVE_STATUSES)} 중에서 쉼표로 골라야 합니다.")
+    return statuses
+
+# 월별 휴가 사용 보고서 (직원 x 월 x 유형, 요약 테이블만 조회)
+@app.get("/reports/usage/monthly")
+async def get_monthly_usage_report(
+    month_from: str = Query(..., alias="from", pattern=r"^\d{4}-\d{2}$"),
+    month_to: str = Query(..., alias="to", pattern=r"^\d{4}-\d{2}$"),
+    username: Optional[str] = None,
+    status: Optional[str] = None,
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_report_username(current_username, username)
+    statuses = parse_report_statuses(status)
+    try:
+        rows = await repo.get_monthly_usage(month_from, month_to, statuses, username)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"보고서 조회 중 오류 발생: {e}")
+    return {"from": month_from, "to": month_to, "statuses": statuses, "items": [dict(row) for row in rows]}
+
+# 연도별 휴가 사용 보고서 (직원 x 유형)
+@app.get("/reports/usage/yearly")
+async def get_yearly_usage_report(
+    year: int = Query(..., ge=1900, le=9999),
+    username: Optional[str] = None,
+    status: Optional[str] = None,
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_report_username(current_username, username)
+    statuses = parse_report_statuses(status)
+    try:
+        rows = await repo.get_yearly_usage(year, statuses, username)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"보고서 조회 중 오류 발생: {e}")
+    return {"year": year, "statuses": statuses, "items": [dict(row) for row in rows]}
+
+# 연차 원장 조회 - 연도별 잔액(스냅샷 + 이후 항목)과 항목 목록 (year 생략 시 현재 연차 연도)
+@app.get("/ledger")
+async def get_leave_ledger(
+    username: Optional[str] = None,
+    year: Optional[int] = Query(None, ge=1900, le=9999),
+    current_username: str = Depends(get_current_username),
+    repo: LeaveRepository = Depends(get_repository),
+):
+    username = resolve_report_username(current_username, username) or current_username
+    try:
+        balance = await repo.get_ledger_balance(username, year)
+        if balance is None:
+            raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+        entries = await repo.get_ledger_entries(username, balance["year"])
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"연차 원장 조회 중 오류 발생: {e}")
+    return {"balance": balance, "entries": [dict(row) for row in entries]}
+
+# SSE keep-alive 주기(초) / long-poll 최대 대기 시간(초) / 연결이 끊겼을 때 브라우저 재연결 대기(ms)
+CHANGE_STREAM_HEARTBEAT = 15
+MAX_LONG_POLL_TIMEOUT = 60
+CHANGE_STREAM_RETRY_MS = 3000
+
+# SSE 연결 하나의 최대 유지 시간(초) - 끝나면 클라이언트가 Last-Event-ID 로 다시 연결해서 이어 받음
+# (uvicorn 은 열린 응답이 끝날 때까지 종료를 기다리므로 배포/재시작이 이 시간 이상 막히지 않게 함)
+CHANGE_STREAM_MAX_SECONDS = float(os.environ.get("LEAVE_CHANGE_STREAM_MAX_SECONDS", "300"))
+
+def format_sse(event):
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+# SSE 스트림 생성기 - 새 이벤트가 없으면 주기적으로 주석 한 줄을 보내 연결 유지
+async def stream_change_events(cursor, username):
+    change_feed.subscribers += 1
+    deadline = time.monotonic() + CHANGE_STREAM_MAX_SECONDS
+    try:
+        yield f"retry: {CHANGE_STREAM_RETRY_MS}\n\n"
+        while change_feed.running and time.monotonic() < deadline:
+            timeout = min(CHANGE_STREAM_HEARTBEAT, deadline - time.monotonic())
+            events, cursor, reset = await change_feed.wait(cursor, username, timeout)
+            if reset:
+                # 이어 받을 이벤트가 이미 정리됨 - 클라이언트는 전체를 다시 조회해야 함
+                yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+            elif events:
+                yield "".join(format_sse(event) for event in events)
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        change_feed.subscribers -= 1
+
+# 변경 피드 SSE 엔드포인트 - Last-Event-ID 헤더(재연결) 또는 after 이후부터, 생략하면 지금부터
+@app.get("/changes/stream")
+async def get_change_stream(
+    username: Optional[str] = None,
+    after: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+    current_username: str = Depends(get_current_username),
+):
+    username = resolve_report_username(current_username, username)
+    cursor = after
+    if last_event_id is not None:
+        try:
+            cursor = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID 는 정수여야 합니다.")
+    if cursor is None:
+        cursor = change_feed.last_id
+
+    return StreamingResponse(
+        stream_change_events(cursor, username),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# 변경 피드 long-poll 엔드포인트 (SSE 를 쓸 수 없는 클라이언트용)
+# after 이후 이벤트가 생기면 바로, 없으면 timeout 초 뒤 빈 목록으로 응답. after 를 생략하면 현재 위치만 반환.
+@app.get("/changes")
+async def get_changes(
+    after: Optional[int] = Query(None, ge=0),
+    username: Optional[str] = None,
+    timeout: float = Query(25, ge=0, le=MAX_LONG_POLL_TIMEOUT),
+    current_username: str = Depends(get_current_username),
+):
+    username = resolve_report_username(current_username, username)
+    if after is None:
+        return {"events": [], "last_event_id": change_feed.last_id, "reset": False}
+    try:
+        events, cursor, reset = await change_feed.wait(after, username, timeout)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=f"변경 이벤트 조회 중 오류 발생: {e}")
+    return {"events": events, "last_event_id": cursor, "reset": reset}
+
+# 연차 캐시 적중/실패 통계
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return balance_cache.stats()
+
+# write-behind 큐 지표 (묶음 크기, 큐 길이)
+@app.get("/write-queue/stats")
+async def get_write_queue_stats():
+    return leave_write_queue.stats()
+
+# 변경 피드 상태 (구독자 수, data_version 확인/재조회 횟수)
+@app.get("/changes/stats")
+async def get_change_feed_stats():
+    return change_feed.stats()
+
+# Prometheus 텍스트 형식 지표 (라우트별 요청, 쿼리 지문별 SQL 시간, 풀/캐시/큐 상태)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    pool_stats = get_pool().stats()
+    cache_stats = balance_cache.stats()
+    queue_stats = leave_write_queue.stats()
+    feed_stats = change_feed.stats()
+    extra = (
+        format_gauge("leave_db_pool_connections", "연결 풀 연결 수", {
+            "created": pool_stats["created"], "idle": pool_stats["idle"], "in_use": pool_stats["in_use"],
+        }, "state")
+        + format_gauge("leave_balance_cache_events", "연차 캐시 누적 적중/실패/제거 수", {
+            "hit": cache_stats["hits"], "miss": cache_stats["misses"], "eviction": cache_stats["evictions"],
+        }, "event")
+        + format_gauge("leave_balance_cache_entries", "연차 캐시 항목 수", cache_stats["size"])
+        + format_gauge("leave_write_queue_depth", "write-behind 큐 대기 건수", queue_stats["queue_depth"])
+        + format_gauge("leave_change_feed_subscribers", "변경 피드 SSE 구독자 수", feed_stats["subscribers"])
+        + format_gauge("leave_change_feed_last_event_id", "변경 피드가 읽은 마지막 이벤트 id", feed_stats["last_event_id"])
+    )
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# 내보내기 컬럼 순서 / 한 번에 DB 에서 읽을 행 수
+EXPORT_COLUMNS = ['id', 'username', 'start_date', 'end_date', 'days', 'leave_type', 'status']
+EXPORT_BATCH_SIZE = 1000
+
+# 내보내기 스트림 생성기 - batch 하나씩 읽어서 바로 내보내므로 행 수와 상관없이 메모리 사용량이 일정함
+def stream_leave_export(export_format, date_from, date_to, status):
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+
+        for rows in iter_leave_requests(conn, date_from, date_to, status, EXPORT_BATCH_SIZE):
+            if export_format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(tuple(row) for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(dict(row), ensure_ascii=False) + "\n" for row in rows)
+    finally:
+        pool.release(conn)
+
+# 급여 연동용 휴가 신청 내보내기 엔드포인트 (관리자용)
+@app.get("/export/leave-requests")
+async def export_leave_requests(
+    export_format: str = Query("csv", alias="format"),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    current_username: str = Depends(get_current_username),
+):
+    if current_username not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="관리자만 휴가 신청 내역을 내보낼 수 있습니다.")
+    if export_format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format 은 csv 또는 ndjson 이어야 합니다.")
+    if status is not None and status not in LEAVE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status 는 {', '.join(LEAVE_STATUSES)} 중 하나여야 합니다.")
+    for value in (date_from, date_to):
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="날짜는 YYYY-MM-DD 형식이어야 합니다.")
+
+    if export_format == "csv":
+        media_type = "text/csv; charset=utf-8"
+        headers = {"Content-Disposition": 'attachment; filename="leave_requests.csv"'}
+    else:
+        media_type = "application/x-ndjson"
+        headers = {}
+
+    # 동기 생성기는 Starlette 가 스레드 풀에서 순회하므로 이벤트 루프를 막지 않음
+    return StreamingResponse(stream_leave_export(export_format, date_from, date_to, status),
+                             media_type=media_type, headers=headers)
+
+# FastAPI 서버 실행
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    check_worker_settings()
+    if SERVER_WORKERS > 1:
+        # 여러 워커는 각 프로세스가 앱을 다시 import 해야 하므로 import 문자열로 실행
+        uvicorn.run("api:app", host="0.0.0.0", port=SERVER_PORT, workers=SERVER_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=SERVER_PORT)
\ No newline at end of file
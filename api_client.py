@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# API 서버 주소 / 요청 제한 시간(초) / keep-alive 연결 수 (환경 변수로 변경 가능)
+API_URL = os.environ.get("LEAVE_API_URL", "http://127.0.0.1:8000")
+API_TIMEOUT = float(os.environ.get("LEAVE_API_TIMEOUT", "10"))
+API_POOL_SIZE = int(os.environ.get("LEAVE_API_POOL_SIZE", "16"))
+
+# 응답 캐시 최대 항목 수 / 다시 확인하지 않고 그대로 쓰는 시간(초)
+# 이 시간이 지나면 If-None-Match 로 확인하고, 바뀌지 않았으면 서버는 본문 없이 304 를 준다.
+API_CACHE_SIZE = int(os.environ.get("LEAVE_API_CACHE_SIZE", "1000"))
+API_CACHE_MAX_AGE = float(os.environ.get("LEAVE_API_CACHE_MAX_AGE", "1"))
+
+# 내역 한 페이지 크기 (api.MAX_HISTORY_LIMIT 이하)
+HISTORY_PAGE_SIZE = 500
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# FastAPI 서비스 클라이언트 (Streamlit 앱의 API 모드, 프로세스당 하나를 모든 세션이 공유)
+#
+# keep-alive 연결 풀을 가진 requests.Session 하나로 요청하고, ETag 가 있는 GET 응답은
+# (경로, 파라미터, 토큰) 별로 LRU 캐시에 보관한다. rerun 이 잦아도 max_age 안에서는 요청하지 않고,
+# 그 뒤에는 조건부 요청으로 확인만 하므로 서버도 대부분 본 조회를 하지 않는다 (잔액 캐시 / 마지막 변경 id ETag).
+# 이 클라이언트로 쓰기를 하면 캐시 항목을 모두 확인 대상으로 돌려서 방금 쓴 내용이 바로 보이게 한다.
+class ApiClient:
+    def __init__(self, base_url=API_URL, timeout=API_TIMEOUT, pool_size=API_POOL_SIZE,
+                 cache_size=API_CACHE_SIZE, max_age=API_CACHE_MAX_AGE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.session = requests.Session()
+        # 연결 실패만 재시도 (요청이 서버에 도착했을 수 있는 쓰기는 다시 보내지 않음)
+        retry = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 지표
+        self.requests = 0
+        self.fresh_hits = 0
+        self.not_modified = 0
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method, path, token=None, headers=None, **kwargs):
+        headers = dict(headers or {})
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", headers=headers,
+                                             timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise ApiError(503, f"API 서버에 연결할 수 없습니다: {e}")
+        self.requests += 1
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise ApiError(response.status_code, detail)
+        return response
+
+    # ETag 를 주는 GET 요청 - 캐시된 응답이 있으면 max_age 안에서는 그대로, 이후엔 조건부 요청으로 확인
+    def _get(self, path, token=None, params=None):
+        key = (path, token, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                if time.monotonic() - entry[2] < self.max_age:
+                    self.fresh_hits += 1
+                    return entry[1]
+
+        headers = {"If-None-Match": entry[0]} if entry is not None else None
+        response = self._request("GET", path, token, headers=headers, params=params)
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            body = entry[1]
+        else:
+            body = response.json()
+        etag = response.headers.get("ETag")
+        if etag is not None and self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = (etag, body, time.monotonic())
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return body
+
+    # 캐시된 응답을 모두 다음 조회 때 확인하도록 (ETag 는 남겨서 바뀌지 않았으면 304)
+    def expire(self):
+        with self._lock:
+            for key, (etag, body, _) in self._cache.items():
+                self._cache[key] = (etag, body, float("-inf"))
+
+    def signup(self, username, password):
+        response = self._request("POST", "/signup", json={"username": username, "password": password})
+        return response.json()["message"]
+
+    # 로그인 - 잔액과 액세스 토큰
+    def login(self, username, password):
+        return self._request("POST", "/login", json={"username": username, "password": password}).json()
+
+    def logout(self, token):
+        self._request("POST", "/logout", token)
+
+    def user_info(self, token):
+        return self._get("/user-info", token)
+
+    # 전체 휴가 신청 내역 (모든 페이지, 최신 순)
+    def leave_history(self, token):
+        items, after_id = [], None
+        while True:
+            params = {"limit": HISTORY_PAGE_SIZE}
+            if after_id is not None:
+                params["after_id"] = after_id
+            page = self._get("/leave-history", token, params)
+            items.extend(page["items"])
+            after_id = page["next_cursor"]
+            if after_id is None:
+                return items
+
+    def create_leave_request(self, token, start_date, end_date, leave_type):
+        response = self._request("POST", "/leave-request", token, json={
+            "start_date": str(start_date), "end_date": str(end_date), "leave_type": leave_type,
+        })
+        self.expire()
+        return response.json()
+
+    def calendar(self, token, date_from, date_to, include_pending=True):
+        return self._get("/calendar", token, {
+            "from": str(date_from), "to": str(date_to), "include_pending": str(include_pending).lower(),
+        })
+
+    def stats(self):
+        with self._lock:
+            cached = len(self._cache)
+        return {
+            "requests": self.requests,
+            "fresh_hits": self.fresh_hits,
+            "not_modified": self.not_modified,
+            "cached": cached,
+        }
@@ -1,9 +1,18 @@
+import os
 import streamlit as st
 import sqlite3
-import random
 import pandas as pd
 from datetime import datetime, timedelta
-import hashlib
+
+from api_client import ApiClient, ApiError
+from holiday_calendar import calculate_working_days
+from calendar_view import read_team_calendar, build_calendar_frame
+from credentials import hash_password, verify_password, needs_rehash
+from db_pool import ConnectionPool
+from history_view import LEAVE_TYPE_DICT, read_leave_history, build_history_frame
+from migrations import migrate
+from repository import (InsufficientLeaveError, UserNotFoundError, fetch_balance, insert_leave_request,
+                        update_password)
 
 # 페이지 설정을 스크립트 최상단에 위치
 st.set_page_config(page_title="연차 관리 시스템", page_icon="🏖️", layout="wide")
@@ -15,107 +24,74 @@ POKEMON_EMOJIS = {
     "식스테": "🐟", "팬텀": "👻"
 }
 
-# 상태 변환 딕셔너리
-STATUS_DICT = {
-    'PENDING': '수락 대기중',
-    'APPROVED': '승인됨',
-    'REJECTED': '반려됨'
-}
+# 휴가 내역 캐시 유지 시간(초) - 다른 프로세스(API 등)에서 바뀐 내역도 이 시간 안에 반영됨
+HISTORY_CACHE_TTL = 60
 
-# 연차 유형 딕셔너리
-LEAVE_TYPE_DICT = {
-    'FULL_DAY': '전일',
-    'MORNING_HALF': '오전 반차',
-    'AFTERNOON_HALF': '오후 반차'
-}
+# 데이터 접근 방식 - "db": SQLite 직접 (기본), "api": FastAPI 서비스(LEAVE_API_URL) 호출
+# API 모드에서는 이 앱이 DB 파일을 열지 않으므로 API 서버를 따로 늘릴 수 있다.
+APP_BACKEND = os.environ.get("LEAVE_APP_BACKEND", "db")
+USE_API = APP_BACKEND == "api"
 
-# 비밀번호 해시 함수
-def hash_password(password, salt=None):
-    if salt is None:
-        salt = str(random.randint(1000, 9999))
+HISTORY_COLUMNS = ['id', 'username', 'start_date', 'end_date', 'days', 'leave_type', 'status']
 
-    salted_password = f"{salt}{password}"
-    hashed = hashlib.sha256(salted_password.encode()).hexdigest()
+# 프로세스 전체에서 공유하는 API 클라이언트 (keep-alive 연결 풀 + 응답 캐시)
+@st.cache_resource
+def get_api_client():
+    return ApiClient()
 
-    return f"{salt}${hashed}"
-
-# 비밀번호 검증 함수
-def verify_password(stored_password, provided_password):
+# 토큰이 만료/폐기되었으면 로그인 화면으로
+def handle_api_error(e, message):
+    if e.status_code == 401:
+        st.session_state['logged_in'] = False
+        st.session_state['current_page'] = 'login'
+        st.warning("로그인이 만료되었습니다. 다시 로그인해주세요.")
+    else:
+        st.error(f"{message}: {e.detail}")
+
+# API 모드 휴가 신청 내역 (시간순 DataFrame, 조건부 요청으로 바뀌었을 때만 본문을 받음)
+def fetch_leave_history_api(token):
+    items = get_api_client().leave_history(token)
+    return pd.DataFrame(items, columns=HISTORY_COLUMNS).sort_values('id', ignore_index=True)
+
+# API 모드 팀 캘린더
+def fetch_team_calendar_api(token, date_from, date_to, include_pending):
+    body = get_api_client().calendar(token, date_from, date_to, include_pending)
+    return pd.DataFrame(body['entries'], columns=HISTORY_COLUMNS)
+
+# 프로세스 전체에서 공유하는 DB 연결 풀 (rerun 마다 새로 연결하지 않음)
+@st.cache_resource
+def get_db_pool():
+    return ConnectionPool()
+
+# 사용자별 데이터 버전 - 휴가 신청 시 올려서 내역 캐시를 무효화 (모든 세션이 공유)
+@st.cache_resource
+def get_data_versions():
+    return {}
+
+def bump_data_version(username):
+    versions = get_data_versions()
+    versions[username] = versions.get(username, 0) + 1
+
+# 사용자별 휴가 신청 내역 (username + 데이터 버전이 같으면 DB 를 다시 조회하지 않음)
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def load_leave_history(username, data_version):
+    pool = get_db_pool()
+    conn = pool.acquire()
     try:
-        salt, hashed = stored_password.split('$')
-        new_hash = hashlib.sha256(f"{salt}{provided_password}".encode()).hexdigest()
-        return new_hash == hashed
-    except:
-        return False
-
-# 날짜 범위 내 날짜 계산 함수
-def calculate_working_days(start_date, end_date, leave_type):
-    start = datetime.strptime(str(start_date), "%Y-%m-%d")
-    end = datetime.strptime(str(end_date), "%Y-%m-%d")
-    
-    # 반차인 경우 하루 이상 선택 불가
-    if (leave_type == 'MORNING_HALF' or leave_type == 'AFTERNOON_HALF'):
-        if start_date != end_date:
-            return {"error": "반차는 하루만 선택 가능합니다"}
-        return {"days": 0.5}
-    
-    # 주말을 제외한 날짜 계산
-    days = 0
-    current = start
-    while current <= end:
-        # 주말 제외 (토요일(5)과 일요일(6) 제외)
-        if current.weekday() < 5:
-            days += 1
-        current += timedelta(days=1)
-    
-    return {"days": days}
-    
-# 데이터베이스 초기화 함수
-def init_database():
+        # 현재 사용자의 휴가 신청 내역 조회 (시간순)
+        return read_leave_history(conn, username)
+    finally:
+        pool.release(conn)
+
+# 팀 캘린더 (기간 + 전체 데이터 버전이 같으면 DB 를 다시 조회하지 않음)
+@st.cache_data(ttl=HISTORY_CACHE_TTL, show_spinner=False)
+def load_team_calendar(date_from, date_to, include_pending, data_version):
+    pool = get_db_pool()
+    conn = pool.acquire()
     try:
-        conn = sqlite3.connect("leave_management.db")
-        cursor = conn.cursor()
-
-        # 직원 테이블 생성 (기존 데이터 유지)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            total_leave INTEGER DEFAULT 14,
-            used_leave REAL DEFAULT 0
-        )
-        """)
-
-        # 휴가 신청 테이블 생성 (기존 데이터 유지)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS leave_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            start_date DATE NOT NULL,
-            end_date DATE NOT NULL,
-            days REAL NOT NULL,
-            leave_type TEXT NOT NULL,
-            status TEXT DEFAULT 'PENDING'
-        )
-        """)
-
-        # 테이블 존재 여부 및 컬럼 확인
-        cursor.execute("PRAGMA table_info(leave_requests)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        # 필요한 컬럼이 없는 경우에만 추가
-        if 'start_date' not in columns:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN start_date DATE")
-        if 'end_date' not in columns:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN end_date DATE")
-        if 'leave_type' not in columns:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN leave_type TEXT")
-
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        st.error(f"데이터베이스 초기화 중 오류 발생: {e}")
+        return read_team_calendar(conn, date_from, date_to, include_pending)
+    finally:
+        pool.release(conn)
 
 # 회원가입 페이지 함수
 def signup_page():
@@ -142,8 +118,17 @@ def signup_page():
                 st.error("비밀번호가 일치하지 않습니다.")
                 return
 
+            if USE_API:
+                try:
+                    st.success(get_api_client().signup(new_username, new_password))
+                except ApiError as e:
+                    st.error(f"회원가입 중 오류 발생: {e.detail}")
+                    return
+                st.session_state['current_page'] = 'login'
+                st.rerun()
+
             try:
-                conn = sqlite3.connect("leave_management.db")
+                conn = get_db_pool().acquire()
                 cursor = conn.cursor()
 
                 try:
@@ -164,7 +149,7 @@ def signup_page():
                 except sqlite3.Error as e:
                     st.error(f"데이터베이스 오류: {e}")
                 finally:
-                    conn.close()
+                    get_db_pool().release(conn)
 
             except Exception as e:
                 st.error(f"회원가입 중 오류 발생: {e}")
@@ -184,9 +169,22 @@ def login_page():
             st.session_state['current_page'] = 'signup'
             st.rerun()
 
+        if login_button and USE_API:
+            try:
+                user = get_api_client().login(username, password)
+            except ApiError as e:
+                st.error(e.detail if e.status_code in (401, 404) else f"로그인 중 오류 발생: {e.detail}")
+                return
+            st.session_state['logged_in'] = True
+            st.session_state['username'] = username
+            st.session_state['access_token'] = user['access_token']
+            st.session_state['total_leave'] = user['total_leave']
+            st.session_state['used_leave'] = user['used_leave']
+            st.rerun()
+
         if login_button:
+            conn = get_db_pool().acquire()
             try:
-                conn = sqlite3.connect("leave_management.db")
                 cursor = conn.cursor()
 
                 # 사용자 정보 조회
@@ -198,6 +196,9 @@ def login_page():
 
                     # 비밀번호 검증
                     if verify_password(stored_password, password):
+                        # 예전 형식 해시는 현재 KDF 로 다시 저장
+                        if needs_rehash(stored_password):
+                            update_password(conn, username, stored_password, hash_password(password))
                         st.session_state['logged_in'] = True
                         st.session_state['username'] = username
                         st.session_state['total_leave'] = total_leave
@@ -211,7 +212,7 @@ def login_page():
             except sqlite3.Error as e:
                 st.error(f"데이터베이스 오류: {e}")
             finally:
-                conn.close()
+                get_db_pool().release(conn)
 
 # 메인 페이지 함수
 def main_page():
@@ -219,6 +220,17 @@ def main_page():
     emoji = POKEMON_EMOJIS.get(st.session_state['username'], "🧑")
     st.title(f"{emoji} {st.session_state['username']}님의 연차 관리")
 
+    # API 모드에서는 다른 곳(다른 세션, 승인 처리 등)의 변경도 보이도록 잔액을 매번 확인 (대부분 304)
+    if USE_API:
+        try:
+            user = get_api_client().user_info(st.session_state['access_token'])
+            st.session_state['total_leave'] = user['total_leave']
+            st.session_state['used_leave'] = user['used_leave']
+        except ApiError as e:
+            handle_api_error(e, "사용자 정보 조회 중 오류 발생")
+            if not st.session_state['logged_in']:
+                return
+
     # 개인 연차 정보 표시
     col1, col2, col3 = st.columns(3)
 
@@ -258,7 +270,10 @@ def main_page():
     )
 
     # 예상 사용 연차 계산
-    result = calculate_working_days(start_date, end_date, leave_type)
+    try:
+        result = calculate_working_days(start_date, end_date, leave_type)
+    except ValueError as e:
+        result = {"error": str(e)}
     
     if "error" in result:
         st.error(result["error"])
@@ -266,94 +281,72 @@ def main_page():
         expected_days = 0
     else:
         st.write(f"예상 사용 연차: {result['days']}일")
-        can_submit = True
+        # 근무일이 없는 기간은 API 와 같이 신청 불가
+        can_submit = result['days'] > 0
         expected_days = result['days']
 
     with st.form("leave_request_form"):
         submit_leave = st.form_submit_button("휴가 신청하기", disabled=not can_submit)
 
         if submit_leave and can_submit:
-            # 연차 가능 여부 확인
-            remaining_leave = st.session_state['total_leave'] - st.session_state['used_leave']
-            if expected_days > remaining_leave:
-                st.error("남은 연차가 부족합니다.")
-                return
+            # 잔여 연차 확인은 저장할 때 DB(API 모드는 서버)에서 차감과 함께 원자적으로 함
+            if USE_API:
+                try:
+                    # 일수 계산과 잔여 연차 확인은 서버에서 다시 함
+                    get_api_client().create_leave_request(st.session_state['access_token'],
+                                                          start_date, end_date, leave_type)
+                except ApiError as e:
+                    handle_api_error(e, "휴가 신청 중 오류 발생")
+                    return
+                st.success("✅ 휴가 신청이 완료되었습니다!")
+                st.rerun()
 
-            conn = sqlite3.connect("leave_management.db")
-            cursor = conn.cursor()
+            conn = get_db_pool().acquire()
 
             try:
-                # 휴가 요청 테이블에 저장
-                cursor.execute("""
-                    INSERT INTO leave_requests 
-                    (username, start_date, end_date, days, leave_type, status)
-                    VALUES (?, ?, ?, ?, ?, 'PENDING')
-                """, (st.session_state['username'], start_date, end_date, 
-                     expected_days, leave_type))
-
-                # 직원 테이블의 사용 연차 업데이트
-                cursor.execute("""
-                    UPDATE employees
-                    SET used_leave = used_leave + ?
-                    WHERE username = ?
-                """, (expected_days, st.session_state['username']))
-
-                conn.commit()
-                st.success("✅ 휴가 신청이 완료되었습니다!")
+                # API 와 같은 예약 경로 (BEGIN IMMEDIATE + 조건부 UPDATE 로 차감 후 저장)
+                insert_leave_request(conn, st.session_state['username'], str(start_date), str(end_date),
+                                     expected_days, leave_type)
+                user = fetch_balance(conn, st.session_state['username'])
 
-                # 세션 상태 업데이트
-                st.session_state['used_leave'] += expected_days
-                st.rerun()
+            except InsufficientLeaveError:
+                st.error("남은 연차가 부족합니다.")
+                return
+
+            except UserNotFoundError:
+                st.error("사용자를 찾을 수 없습니다.")
+                return
 
             except Exception as e:
                 st.error(f"휴가 신청 중 오류 발생: {e}")
-                conn.rollback()
+                return
 
             finally:
-                conn.close()
+                get_db_pool().release(conn)
+
+            st.success("✅ 휴가 신청이 완료되었습니다!")
+
+            # 세션 상태를 DB 의 잔액으로 갱신하고 내역 캐시 무효화
+            st.session_state['total_leave'] = user['total_leave']
+            st.session_state['used_leave'] = user['used_leave']
+            bump_data_version(st.session_state['username'])
+            st.rerun()
 
     # 휴가 신청 내역 표시
     st.header("📋 휴가 신청 내역")
-    conn = sqlite3.connect("leave_management.db")
-    cursor = conn.cursor()
 
     try:
-        # 현재 사용자의 휴가 신청 내역 조회 (최신 순으로 정렬)
-        cursor.execute("""
-            SELECT id, start_date, end_date, days, leave_type, status
-            FROM leave_requests 
-            WHERE username = ?
-            ORDER BY id DESC
-        """, (st.session_state['username'],))
-        
-        leave_history = cursor.fetchall()
+        # 캐시된 휴가 신청 내역 (위젯을 조작해도 DB 를 다시 조회하지 않음)
+        username = st.session_state['username']
+        if USE_API:
+            leave_history = fetch_leave_history_api(st.session_state['access_token'])
+        else:
+            leave_history = load_leave_history(username, get_data_versions().get(username, 0))
         
-        if leave_history:
-            # 데이터프레임 생성
-            history_df = pd.DataFrame(leave_history, 
-                columns=['id', '시작날짜', '종료날짜', '일수', '유형', '상태'])
-            
-            # 상태와 유형 변환
-            history_df['상태'] = history_df['상태'].map(STATUS_DICT)
-            history_df['유형'] = history_df['유형'].map(LEAVE_TYPE_DICT)
-
-            # 현재 남은 연차부터 시작하여 각 신청 시점의 남은 연차 계산
+        if not leave_history.empty:
+            # 각 신청 시점의 남은 연차를 포함한 표 (시간순)
             current_remaining = st.session_state['total_leave'] - st.session_state['used_leave']
-            total_leave = st.session_state['total_leave']
-            
-            # 역순으로 남은 연차 계산
-            remaining_leaves = []
-            running_total = current_remaining
-            
-            for days in history_df['일수']:
-                remaining_leaves.append(running_total)
-                running_total += days  # 과거로 갈수록 사용량을 다시 더함
-            
-            history_df['남은 연차'] = remaining_leaves
-
-            # ID 컬럼 제거하고 시간순으로 정렬
-            history_df = history_df.drop('id', axis=1)
-            history_df = history_df.iloc[::-1]  # 시간순 정렬
+            history_df = build_history_frame(leave_history, current_remaining)
 
             # 데이터프레임 표시
             st.dataframe(history_df, use_container_width=True)
@@ -363,16 +356,62 @@ def main_page():
         else:
             st.write("아직 신청한 휴가가 없습니다.")
 
+    except ApiError as e:
+        handle_api_error(e, "휴가 신청 내역 조회 중 오류 발생")
+        return
     except Exception as e:
         st.error(f"휴가 신청 내역 조회 중 오류 발생: {e}")
         st.write(e)
-    finally:
-        conn.close()
-        
+
+    # 팀 캘린더 섹션
+    st.header("📆 팀 캘린더")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        today = datetime.now().date()
+        calendar_start = st.date_input("📅 시작 날짜",
+                                       value=today - timedelta(days=today.weekday()),
+                                       key='calendar_start')
+    with col2:
+        calendar_span = st.selectbox("🗓️ 기간", options=[7, 14, 31],
+                                     format_func=lambda x: f"{x}일",
+                                     key='calendar_span')
+    include_pending = st.checkbox("수락 대기중인 신청 포함", value=True, key='calendar_include_pending')
+    calendar_end = calendar_start + timedelta(days=calendar_span - 1)
+
+    try:
+        # 누가 휴가를 신청해도 캐시가 무효화되도록 전체 데이터 버전 합을 키로 사용
+        if USE_API:
+            entries = fetch_team_calendar_api(st.session_state['access_token'],
+                                              calendar_start, calendar_end, include_pending)
+        else:
+            entries = load_team_calendar(calendar_start, calendar_end, include_pending,
+                                         sum(get_data_versions().values()))
+        calendar_df = build_calendar_frame(entries, calendar_start, calendar_end)
+
+        if not calendar_df.empty:
+            st.dataframe(calendar_df, use_container_width=True)
+        else:
+            st.write("이 기간에 휴가자가 없습니다.")
+
+    except ApiError as e:
+        handle_api_error(e, "팀 캘린더 조회 중 오류 발생")
+    except Exception as e:
+        st.error(f"팀 캘린더 조회 중 오류 발생: {e}")
+
+# 데이터베이스 초기화 (스키마 마이그레이션) - 프로세스당 한 번만 실행
+@st.cache_resource
+def init_database():
+    migrate()
+
 # 메인 앱 로직
 def main():
-    # 데이터베이스 초기화
-    init_database()
+    # 데이터베이스 초기화 (API 모드에서는 API 서버가 담당)
+    if not USE_API:
+        try:
+            init_database()
+        except Exception as e:
+            st.error(f"데이터베이스 초기화 중 오류 발생: {e}")
 
     # 세션 상태 초기화
     if 'logged_in' not in st.session_state:
@@ -392,6 +431,12 @@ def main():
 
         # 로그아웃 버튼
         if st.sidebar.button("🚪 로그아웃"):
+            if USE_API:
+                # 토큰 폐기 (실패해도 화면에서는 로그아웃)
+                try:
+                    get_api_client().logout(st.session_state.pop('access_token'))
+                except ApiError:
+                    pass
             st.session_state['logged_in'] = False
             st.session_state['current_page'] = 'login'
             st.rerun()
@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+
+# 액세스 토큰 서명 키 / 유효 시간(초)
+# 서명 키를 지정하지 않으면 프로세스마다 새로 만들므로 재시작하면 토큰이 무효가 되고,
+# 워커가 여러 개면 서로의 토큰이 통하지 않으므로 api.py 가 시작을 거부한다
+TOKEN_SECRET_CONFIGURED = bool(os.environ.get("LEAVE_TOKEN_SECRET"))
+TOKEN_SECRET = os.environ.get("LEAVE_TOKEN_SECRET") or secrets.token_hex(32)
+TOKEN_TTL = int(os.environ.get("LEAVE_TOKEN_TTL", "3600"))
+
+# 관리자(팀장/HR) 이름 목록 - 다른 직원 대신 일괄 신청, 일괄 승인/반려 가능 (쉼표로 구분)
+ADMIN_USERS = frozenset(
+    name.strip() for name in os.environ.get("LEAVE_ADMIN_USERS", "").split(",") if name.strip()
+)
+
+# 만료된 폐기 내역을 DB 에서 정리하고 목록을 다시 읽는 유지보수 주기(초)
+# 다른 워커에서 폐기한 토큰은 변경 피드의 token.revoked 이벤트로 바로 반영되므로 이 주기와는 무관
+REVOCATION_MAINTENANCE_INTERVAL = float(os.environ.get("LEAVE_TOKEN_REVOCATION_MAINTENANCE", "3600"))
+
+
+# 서명이 맞지 않거나 형식이 잘못되었거나 만료/폐기된 토큰
+class InvalidTokenError(Exception):
+    pass
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload, secret):
+    return _b64encode(hmac.new(secret.encode(), payload.encode("ascii"), hashlib.sha256).digest())
+
+
+# 토큰 형식: base64url(username).만료시각.토큰ID.서명
+# DB 조회 없이 HMAC-SHA256 한 번으로 검증한다.
+def issue_token(username, ttl=TOKEN_TTL, secret=None, now=None):
+    expires_at = int((time.time() if now is None else now) + ttl)
+    token_id = secrets.token_hex(8)
+    payload = f"{_b64encode(username.encode('utf-8'))}.{expires_at}.{token_id}"
+    return f"{payload}.{_sign(payload, secret or TOKEN_SECRET)}", expires_at
+
+
+# 서명과 만료를 확인하고 (username, 만료시각, 토큰ID) 반환
+def decode_token(token, secret=None, now=None):
+    # 발급한 토큰은 모두 ASCII (아니면 서명 비교/인코딩에서 TypeError 등이 나서 500 이 됨)
+    if not token.isascii():
+        raise InvalidTokenError("토큰 형식이 올바르지 않습니다.")
+    try:
+        payload, signature = token.rsplit(".", 1)
+        encoded_username, expires_at, token_id = payload.split(".")
+        expires_at = int(expires_at)
+    except ValueError:
+        raise InvalidTokenError("토큰 형식이 올바르지 않습니다.")
+
+    if not hmac.compare_digest(signature, _sign(payload, secret or TOKEN_SECRET)):
+        raise InvalidTokenError("토큰 서명이 올바르지 않습니다.")
+    if expires_at <= (time.time() if now is None else now):
+        raise InvalidTokenError("토큰이 만료되었습니다.")
+
+    try:
+        username = _b64decode(encoded_username).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidTokenError("토큰 형식이 올바르지 않습니다.")
+    return username, expires_at, token_id
+
+
+# 폐기된 토큰 ID 목록
+#
+# 검증 경로에서는 메모리의 집합만 확인한다 (요청마다 DB 를 읽거나 쓰지 않음).
+# 폐기 내역은 revoked_tokens 테이블에도 기록해 재시작 후에도 유지되고, 시작할 때 한 번 읽은 뒤로는
+# 다른 워커의 폐기를 변경 피드(token.revoked 이벤트)로 받아 add() 한다.
+# 만료 시각이 지난 항목은 어차피 서명 검증에서 걸러지므로 유지보수 작업(prune_revocations)이 정리한다.
+class RevocationList:
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, token_id):
+        return token_id in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def add(self, token_id, expires_at):
+        with self._lock:
+            self._revoked[token_id] = expires_at
+
+    # DB 의 아직 만료되지 않은 폐기 목록으로 교체 (읽기만 함)
+    def load(self, conn):
+        now = int(time.time())
+        rows = conn.execute("SELECT token_id, expires_at FROM revoked_tokens WHERE expires_at > ?",
+                            (now,)).fetchall()
+        with self._lock:
+            revoked = {token_id: expires_at for token_id, expires_at in rows}
+            # 읽는 사이에 폐기된 토큰(이 프로세스 또는 변경 피드)은 유지
+            for token_id, expires_at in self._revoked.items():
+                if expires_at > now:
+                    revoked.setdefault(token_id, expires_at)
+            self._revoked = revoked
+
+
+# 프로세스 전역 폐기 목록
+revocation_list = RevocationList()
+
+
+def revoke_token(conn, token_id, expires_at):
+    conn.execute("INSERT OR IGNORE INTO revoked_tokens (token_id, expires_at) VALUES (?, ?)",
+                 (token_id, expires_at))
+    conn.commit()
+    revocation_list.add(token_id, expires_at)
+
+
+def refresh_revocations(conn):
+    try:
+        revocation_list.load(conn)
+    except sqlite3.Error:
+        # 갱신에 실패해도 기존 목록으로 계속 검증
+        pass
+
+
+# 유지보수 작업 - 만료된 폐기 내역 삭제 후 목록을 다시 읽음 (메모리의 만료 항목도 정리)
+def prune_revocations(conn):
+    deleted = conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (int(time.time()),)).rowcount
+    conn.commit()
+    refresh_revocations(conn)
+    return deleted
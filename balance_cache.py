@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# 캐시 유지 시간(초) / 최대 사용자 수 (환경 변수로 변경 가능)
+BALANCE_CACHE_TTL = float(os.environ.get("LEAVE_BALANCE_CACHE_TTL", "30"))
+BALANCE_CACHE_SIZE = int(os.environ.get("LEAVE_BALANCE_CACHE_SIZE", "10000"))
+
+
+# 사용자별 직원 정보(비밀번호 해시, 총 연차, 사용 연차) TTL + LRU 캐시
+#
+# 연차는 휴가 신청/승인 경로에서만 바뀌므로 그 경로에서 invalidate() 를 호출한다.
+# 다른 워커 프로세스(또는 Streamlit 앱)의 변경은 변경 피드(change_feed.py)가 읽어서 invalidate_many() 로 지운다.
+# DB 에서 읽는 도중 invalidate 가 일어나면 그 결과는 캐시에 넣지 않는다 (오래된 값이 다시 들어가는 것 방지).
+class BalanceCache:
+    def __init__(self, maxsize=BALANCE_CACHE_SIZE, ttl=BALANCE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._invalidations = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, username):
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return value
+                del self._entries[username]
+            self.misses += 1
+            return None
+
+    # DB 를 읽기 전에 호출해서 받은 토큰을 put() 에 넘김
+    def begin_load(self):
+        with self._lock:
+            return self._invalidations
+
+    def put(self, username, value, token=None):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if token is not None and token != self._invalidations:
+                return
+            self._entries[username] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username=None):
+        with self._lock:
+            self._invalidations += 1
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+    # 여러 사용자를 한 번에 무효화 (다른 워커의 변경 이벤트 묶음 - 진행 중인 적재는 한 번만 무효 처리)
+    def invalidate_many(self, usernames):
+        with self._lock:
+            self._invalidations += 1
+            for username in usernames:
+                self._entries.pop(username, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
+# 연차 정보로 만든 ETag (값이 같으면 프로세스가 달라도 같은 ETag)
+def balance_etag(username, total_leave, used_leave):
+    digest = hashlib.sha1(f"{username}:{total_leave}:{used_leave}".encode()).hexdigest()[:16]
+    return f'"{digest}"'
+
+
+# 프로세스 전역 캐시
+balance_cache = BalanceCache()
@@ -0,0 +1,5 @@
+# 연차 관리 시스템 벤치마크 / 부하 테스트 모음
+#
+#   python -m benchmarks.load_test ...      API 엔드포인트 부하 테스트 (인프로세스 / uvicorn)
+#   python benchmarks/bench_*.py            개별 최적화 마이크로 벤치마크
+#   python benchmarks/stress_*.py           동시성 스트레스 테스트
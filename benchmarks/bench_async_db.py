@@ -0,0 +1,137 @@
+# 비동기 DB 계층 벤치마크
+#
+# 동시 클라이언트 수(기본 50~500)별로 같은 요청 묶음을 두 가지 방식으로 처리해 처리량을 비교한다.
+#   - blocking : 엔드포인트 안에서 sqlite3를 바로 호출 (이전 방식 - 이벤트 루프가 멈춤)
+#   - executor : repository.LeaveRepository 가 DB 전용 스레드 풀에서 실행 (현재 방식)
+#
+# 처리량과 함께 이벤트 루프 지연(1ms 주기 타이머가 늦게 깨어난 최대 시간)을 측정한다.
+# 인프로세스 환경에서는 GIL 때문에 처리량 차이가 작을 수 있지만, 루프 지연은 blocking 방식에서
+# 쿼리 시간만큼 그대로 늘어난다 (= 다른 모든 요청이 그만큼 멈춤).
+#
+# 사용법: python benchmarks/bench_async_db.py --clients 50 100 200 500 --requests 2000
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# api 모듈이 임시 데이터베이스를 쓰도록 import 전에 경로 지정
+WORK_DIR = tempfile.mkdtemp(prefix="leave-bench-")
+os.environ["LEAVE_DB_PATH"] = os.path.join(WORK_DIR, "leave_management.db")
+
+import httpx  # noqa: E402
+
+import api  # noqa: E402
+import reset_database  # noqa: E402
+from auth_tokens import issue_token  # noqa: E402
+from credentials import hash_password  # noqa: E402
+from repository import LeaveRepository, get_repository, _run_with_connection  # noqa: E402
+
+
+# 이전 방식 재현: 쿼리를 이벤트 루프 스레드에서 바로 실행
+class BlockingLeaveRepository(LeaveRepository):
+    async def _run(self, fn, *args):
+        return _run_with_connection(fn, args)
+
+
+def seed_database(employees):
+    os.chdir(WORK_DIR)
+    reset_database.init_database()
+    conn = api.sqlite3.connect(os.environ["LEAVE_DB_PATH"])
+    hashed_password = hash_password("pw")
+    conn.executemany(
+        "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, ?, 100000, 0)",
+        [(f"u{i:02d}", hashed_password) for i in range(employees)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def build_workload(total, employees):
+    rng = random.Random(42)
+    headers = {}
+    workload = []
+    for _ in range(total):
+        username = f"u{rng.randrange(employees):02d}"
+        if username not in headers:
+            headers[username] = {"Authorization": f"Bearer {issue_token(username)[0]}"}
+        roll = rng.random()
+        if roll < 0.2:
+            workload.append(("POST", "/leave-request",
+                             {"start_date": "2024-05-02", "end_date": "2024-05-02", "leave_type": "MORNING_HALF"},
+                             headers[username]))
+        elif roll < 0.5:
+            workload.append(("GET", "/leave-history", None, headers[username]))
+        elif roll < 0.8:
+            workload.append(("GET", "/user-info", None, headers[username]))
+        else:
+            workload.append(("POST", "/login", {"username": username, "password": "pw"}, None))
+    return workload
+
+
+async def measure_loop_lag(stop, lags):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def run_workload(client, workload, clients):
+    semaphore = asyncio.Semaphore(clients)
+    errors = 0
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    async def one(method, url, body, headers):
+        nonlocal errors
+        async with semaphore:
+            response = await client.request(method, url, json=body, headers=headers)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*item) for item in workload))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, errors, max(lags, default=0.0)
+
+
+async def bench(mode, workload, clients):
+    repository = BlockingLeaveRepository() if mode == "blocking" else LeaveRepository()
+    api.app.dependency_overrides[get_repository] = lambda: repository
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        elapsed, errors, max_lag = await run_workload(client, workload, clients)
+    api.app.dependency_overrides.clear()
+    return len(workload) / elapsed, errors, max_lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비동기 DB 계층 처리량 벤치마크")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--employees", type=int, default=50)
+    args = parser.parse_args()
+
+    seed_database(args.employees)
+    workload = build_workload(args.requests, args.employees)
+
+    print(f"{'clients':>8} {'blocking req/s':>15} {'executor req/s':>15} {'gain':>7}"
+          f" {'blocking lag ms':>16} {'executor lag ms':>16}")
+    for clients in args.clients:
+        blocking, blocking_errors, blocking_lag = asyncio.run(bench("blocking", workload, clients))
+        executor, executor_errors, executor_lag = asyncio.run(bench("executor", workload, clients))
+        print(f"{clients:>8} {blocking:>15.1f} {executor:>15.1f} {executor / blocking:>6.2f}x"
+              f" {blocking_lag * 1000:>16.2f} {executor_lag * 1000:>16.2f}"
+              + (f"  (errors: {blocking_errors}/{executor_errors})" if blocking_errors or executor_errors else ""))
+
+
+if __name__ == "__main__":
+    main()
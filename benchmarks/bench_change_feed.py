@@ -0,0 +1,116 @@
+# 변경 피드 벤치마크
+#
+#   - 유휴 비용: 변경이 없을 때 poller 한 번 확인(PRAGMA data_version)에 드는 시간
+#     vs 매번 change_events 를 다시 조회하는 방식(SELECT MAX(id))
+#   - 전달 지연: 구독자 N 명이 기다리는 동안 다른 연결(다른 워커/Streamlit 앱 흉내)이 휴가 신청을 넣었을 때
+#     커밋부터 구독자가 이벤트를 받기까지의 시간. 같은 워커 쓰기(notify 호출)와 다른 워커 쓰기(poll 주기) 비교.
+#
+#   python benchmarks/bench_change_feed.py --subscribers 1 100 1000 --writes 50
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# change_feed 가 임시 데이터베이스를 쓰도록 import 전에 경로 지정
+WORK_DIR = tempfile.mkdtemp(prefix="leave-feed-")
+os.environ["LEAVE_DB_PATH"] = os.path.join(WORK_DIR, "leave_management.db")
+
+from change_feed import ChangeFeed  # noqa: E402
+from db_pool import close_pool  # noqa: E402
+from migrations import migrate  # noqa: E402
+from repository import insert_leave_request, shutdown_executor  # noqa: E402
+
+DB_PATH = os.environ["LEAVE_DB_PATH"]
+
+
+def seed_database(employees):
+    migrate(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executemany(
+        "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, 'x', 100000, 0)",
+        [(f"u{i:04d}",) for i in range(employees)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def idle_cost(feed, checks=20000):
+    conn = feed._conn
+    started = time.perf_counter()
+    for _ in range(checks):
+        conn.execute("PRAGMA data_version").fetchone()
+    data_version_us = (time.perf_counter() - started) / checks * 1e6
+    started = time.perf_counter()
+    for _ in range(checks):
+        conn.execute("SELECT MAX(id) FROM change_events").fetchone()
+    max_id_us = (time.perf_counter() - started) / checks * 1e6
+    return data_version_us, max_id_us
+
+
+async def measure(feed, writer_conn, subscribers, writes, notify):
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async def subscriber(cursor, committed):
+        # 이벤트를 받은 시각 - 커밋 시각
+        events, _, _ = await feed.wait(cursor, None, 10)
+        if events:
+            latencies.append(time.perf_counter() - committed[0])
+
+    for i in range(writes):
+        committed = [0.0]
+        tasks = [loop.create_task(subscriber(feed.last_id, committed)) for _ in range(subscribers)]
+        await asyncio.sleep(0.01)
+        await loop.run_in_executor(None, insert_leave_request, writer_conn, f"u{i % 100:04d}",
+                                   '2030-03-04', '2030-03-04', 0.5, 'MORNING_HALF')
+        committed[0] = time.perf_counter()
+        if notify:
+            feed.notify()
+        await asyncio.gather(*tasks)
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.95)] * 1000, len(latencies)
+
+
+async def main_async(args):
+    feed = ChangeFeed(poll_interval=args.poll_interval)
+    await feed.start()
+    data_version_us, max_id_us = idle_cost(feed)
+    print(f"유휴 확인 1회: PRAGMA data_version {data_version_us:.2f}us, SELECT MAX(id) {max_id_us:.2f}us")
+
+    writer_conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    writer_conn.row_factory = sqlite3.Row
+    print(f"poll 주기 {args.poll_interval * 1000:.0f}ms")
+    print(f"{'subscribers':>11} {'writer':>12} {'p50 ms':>8} {'p95 ms':>8} {'delivered':>10}")
+    for subscribers in args.subscribers:
+        for notify, label in ((True, "same worker"), (False, "other worker")):
+            p50, p95, delivered = await measure(feed, writer_conn, subscribers, args.writes, notify)
+            print(f"{subscribers:>11} {label:>12} {p50:>8.2f} {p95:>8.2f} {delivered:>10}")
+    writer_conn.close()
+    print(f"poller: 확인 {feed.polls}회, 재조회 {feed.reloads}회")
+    await feed.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변경 피드 전달 지연/유휴 비용 벤치마크")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--writes", type=int, default=30)
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    seed_database(args.employees)
+    asyncio.run(main_async(args))
+    shutdown_executor()
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
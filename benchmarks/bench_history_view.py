@@ -0,0 +1,89 @@
+# 휴가 내역 표(남은 연차 타임라인) 생성 마이크로 벤치마크
+#
+# 100k 행 합성 내역으로 이전 방식(map + Python for 루프 + iloc[::-1])과
+# history_view.build_history_frame (역방향 누적합 + categorical) 을 비교하고 결과가 같은지도 확인한다.
+# 팀 화면용으로 여러 사용자를 한 번에 계산하는 경우도 함께 측정한다.
+#
+# 사용법: python benchmarks/bench_history_view.py --rows 100000 --repeat 5
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history_view import STATUS_DICT, LEAVE_TYPE_DICT, build_history_frame  # noqa: E402
+
+
+def synthetic_history(rows, users=1, seed=42):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2015-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 3650, rows)), unit="D")
+    leave_types = rng.choice(list(LEAVE_TYPE_DICT), rows, p=[0.6, 0.2, 0.2])
+    days = np.where(leave_types == "FULL_DAY", rng.integers(1, 6, rows), 0.5).astype(float)
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "username": np.array([f"u{i:03d}" for i in range(users)])[rng.integers(0, users, rows)],
+        "start_date": starts.strftime("%Y-%m-%d"),
+        "end_date": starts.strftime("%Y-%m-%d"),
+        "days": days,
+        "leave_type": leave_types,
+        "status": rng.choice(list(STATUS_DICT), rows),
+    })
+
+
+# 이전 app.py 방식 (최신 순으로 읽은 뒤 Python 루프)
+def legacy_history_frame(history, current_remaining):
+    newest_first = history.iloc[::-1]
+    history_df = pd.DataFrame(
+        list(newest_first[["id", "start_date", "end_date", "days", "leave_type", "status"]].itertuples(index=False)),
+        columns=['id', '시작날짜', '종료날짜', '일수', '유형', '상태'])
+    history_df['상태'] = history_df['상태'].map(STATUS_DICT)
+    history_df['유형'] = history_df['유형'].map(LEAVE_TYPE_DICT)
+
+    remaining_leaves = []
+    running_total = current_remaining
+    for days in history_df['일수']:
+        remaining_leaves.append(running_total)
+        running_total += days
+    history_df['남은 연차'] = remaining_leaves
+
+    history_df = history_df.drop('id', axis=1)
+    return history_df.iloc[::-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="휴가 내역 표 생성 마이크로 벤치마크")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=200, help="팀 화면 측정에 사용할 사용자 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    history = synthetic_history(args.rows)
+    current_remaining = 5.0
+
+    legacy = legacy_history_frame(history, current_remaining)
+    vectorized = build_history_frame(history, current_remaining)
+    assert np.allclose(legacy['남은 연차'].to_numpy(), vectorized['남은 연차'].to_numpy())
+    assert (legacy['상태'].to_numpy() == vectorized['상태'].astype(str).to_numpy()).all()
+
+    legacy_time = min(timeit.repeat(lambda: legacy_history_frame(history, current_remaining),
+                                    number=1, repeat=args.repeat))
+    vectorized_time = min(timeit.repeat(lambda: build_history_frame(history, current_remaining),
+                                        number=1, repeat=args.repeat))
+    print(f"rows={args.rows}")
+    print(f"  legacy loop    : {legacy_time * 1000:8.2f} ms")
+    print(f"  vectorized     : {vectorized_time * 1000:8.2f} ms  ({legacy_time / vectorized_time:.1f}x)")
+
+    team = synthetic_history(args.rows, users=args.users)
+    team_remaining = {username: 5.0 for username in team['username'].unique()}
+    team_time = min(timeit.repeat(lambda: build_history_frame(team, team_remaining),
+                                  number=1, repeat=args.repeat))
+    print(f"  team ({args.users} users): {team_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
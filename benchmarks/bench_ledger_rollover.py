@@ -0,0 +1,137 @@
+# 연차 원장 잔액 조회 / 연도 전환 벤치마크
+#
+#   - 잔액 조회: 스냅샷 없이 원장 전체 합계 vs 스냅샷 + 이후 항목 (repository.fetch_ledger_balance)
+#   - 연도 전환: ledger.run_rollover 를 chunk 크기별로 실행하는 동안 다른 스레드가 휴가 신청을 계속 넣고
+#     신청 한 건의 지연 시간(p50/p99/최대)을 잰다. 전환 뒤 employees 잔액과 원장이 같은지 검증.
+#
+# 원본 DB 는 건드리지 않고 임시 디렉터리에 복사해서 실행한다.
+#
+#   python benchmarks/bench_ledger_rollover.py --db /tmp/synthetic.db --chunk-sizes 100 200 1000
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ledger  # noqa: E402
+from migrations import migrate  # noqa: E402
+from repository import fetch_ledger_balance, insert_leave_request  # noqa: E402
+
+FULL_SUM_SQL = """
+    SELECT COALESCE(SUM(granted), 0), COALESCE(SUM(used), 0)
+    FROM leave_ledger WHERE username = ? AND year = ?
+"""
+
+
+def balance_latency(conn, usernames, year, full_scan):
+    timings = []
+    for username in usernames:
+        started = time.perf_counter()
+        if full_scan:
+            conn.execute(FULL_SUM_SQL, (username, year)).fetchone()
+        else:
+            fetch_ledger_balance(conn, username, year)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6
+
+
+# 전환이 끝날 때까지 휴가 신청(반차 0.5일)을 계속 넣으면서 건별 지연 시간 기록
+def online_writer(db_path, usernames, stop, timings, errors):
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    rng = random.Random(7)
+    while not stop.is_set():
+        username = rng.choice(usernames)
+        started = time.perf_counter()
+        try:
+            insert_leave_request(conn, username, '2030-03-04', '2030-03-04', 0.5, 'MORNING_HALF')
+        except Exception as e:  # 잔여 연차 부족 등은 지연 시간만 기록
+            errors.append(type(e).__name__)
+        timings.append(time.perf_counter() - started)
+    conn.close()
+
+
+def run_case(source, work_dir, year, chunk_size, pause):
+    db_path = os.path.join(work_dir, f"rollover-{chunk_size}.db")
+    shutil.copyfile(source, db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    usernames = [row[0] for row in conn.execute("SELECT username FROM employees")]
+    conn.close()
+
+    stop, timings, errors = threading.Event(), [], []
+    writer = threading.Thread(target=online_writer, args=(db_path, usernames, stop, timings, errors))
+    writer.start()
+    started = time.perf_counter()
+    ledger.run_rollover(year, db_path, chunk_size=chunk_size, pause=pause, verbose=False)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    writer.join()
+
+    conn = sqlite3.connect(db_path)
+    balances, snapshots = ledger.verify_ledger(conn)
+    conn.close()
+    timings.sort()
+    return (elapsed, len(timings), statistics.median(timings) * 1000,
+            timings[int(len(timings) * 0.99)] * 1000, timings[-1] * 1000, len(balances) + len(snapshots))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="연차 원장 잔액 조회/연도 전환 벤치마크")
+    parser.add_argument("--db", help="이미 시드된 DB (없으면 임시 DB 에 합성 데이터 생성)")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 200, 1000])
+    parser.add_argument("--pause", type=float, default=ledger.LEDGER_CHUNK_PAUSE)
+    parser.add_argument("--samples", type=int, default=500, help="잔액 조회를 잴 직원 수")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="leave-ledger-")
+    source = os.path.join(work_dir, "source.db")
+    if args.db is None:
+        from reset_database import seed_synthetic
+        migrate(source)
+        seed_synthetic(args.employees, args.requests, db_path=source)
+    else:
+        shutil.copyfile(args.db, source)
+        started = time.perf_counter()
+        migrate(source)
+        print(f"마이그레이션: {time.perf_counter() - started:.1f}초")
+
+    conn = sqlite3.connect(source)
+    entries = conn.execute("SELECT COUNT(*) FROM leave_ledger").fetchone()[0]
+    employees = conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+    year = conn.execute("SELECT MAX(leave_year) FROM employees").fetchone()[0]
+    sample = random.Random(42).sample([row[0] for row in conn.execute("SELECT username FROM employees")],
+                                      min(args.samples, employees))
+    print(f"직원 {employees}명, 원장 항목 {entries}건")
+    full_us = balance_latency(conn, sample, year, full_scan=True)
+    conn.close()
+
+    ledger.take_snapshots(source, min_entries=1, verbose=False)
+    conn = sqlite3.connect(source)
+    # 스냅샷 뒤에 항목 몇 개가 더 쌓인 상태를 흉내 (평소 운영 상태)
+    conn.executemany("INSERT INTO leave_ledger (username, year, entry_type, used) VALUES (?, ?, 'DEBIT', 0)",
+                     [(username, year) for username in sample for _ in range(3)])
+    conn.commit()
+    snapshot_us = balance_latency(conn, sample, year, full_scan=False)
+    conn.close()
+    print(f"잔액 조회 p50: 원장 전체 합계 {full_us:.0f}us, 스냅샷 + 이후 항목 {snapshot_us:.0f}us")
+
+    print(f"{'chunk':>6} {'rollover s':>11} {'writes':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'mismatch':>9}")
+    for chunk_size in args.chunk_sizes:
+        elapsed, writes, p50, p99, worst, mismatches = run_case(source, work_dir, year + 1, chunk_size, args.pause)
+        print(f"{chunk_size:>6} {elapsed:>11.1f} {writes:>7} {p50:>8.2f} {p99:>8.2f} {worst:>8.2f} {mismatches:>9}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# 지표 수집(/metrics) 오버헤드 측정
+#
+# 같은 시드/같은 요청으로 load_test 를 LEAVE_METRICS=0 / 1 각각 별도 프로세스에서 돌리고
+# 엔드포인트별 p50 지연 시간과 처리량 차이를 출력한다.
+#
+#   python -m benchmarks.bench_metrics_overhead --iterations 1000
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_load_test(metrics_enabled, args, output_path):
+    env = dict(os.environ, LEAVE_METRICS="1" if metrics_enabled else "0")
+    command = [
+        sys.executable, "-m", "benchmarks.load_test", "--mode", "inprocess",
+        "--employees", str(args.employees),
+        "--requests-per-employee", str(args.requests_per_employee),
+        "--iterations", str(args.iterations),
+        "--output", output_path,
+    ]
+    if args.endpoints:
+        command += ["--endpoints", *args.endpoints]
+    subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(output_path, encoding="utf-8") as f:
+        return json.load(f)["endpoints"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="지표 수집 오버헤드 측정")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--requests-per-employee", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--endpoints", nargs="+", default=["login", "leave-history", "user-info"])
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="leave-metrics-")
+    without = run_load_test(False, args, os.path.join(workdir, "metrics_off.json"))
+    with_metrics = run_load_test(True, args, os.path.join(workdir, "metrics_on.json"))
+
+    print(f"{'endpoint':<16}{'p50 off':>10}{'p50 on':>10}{'diff':>9}{'rps off':>10}{'rps on':>10}")
+    for endpoint, off in without.items():
+        on = with_metrics[endpoint]
+        diff = (on["p50_ms"] / off["p50_ms"] - 1) * 100 if off["p50_ms"] else 0.0
+        print(f"{endpoint:<16}{off['p50_ms']:>8.2f}ms{on['p50_ms']:>8.2f}ms{diff:>+8.1f}%"
+              f"{off['throughput_rps']:>10.1f}{on['throughput_rps']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# 로그인 처리량 벤치마크 (비밀번호 해시 방식별)
+#
+# 동시 클라이언트 수별로 /login 만 반복 호출해서 세 가지 방식을 비교한다.
+#   - legacy : 예전 salt$sha256 해시 (빠르지만 무차별 대입에 취약)
+#   - inline : KDF 검증을 이벤트 루프 스레드에서 바로 실행 (루프가 해시 시간만큼 멈춤)
+#   - pool   : credentials 작업자 풀에서 KDF 검증 (현재 방식)
+#
+# 처리량, p95 지연 시간, 이벤트 루프 최대 지연을 출력한다. KDF 비용은 LEAVE_SCRYPT_N 등으로 조절.
+#
+# 사용법: python benchmarks/bench_password_hashing.py --clients 10 50 100 --requests 200
+import argparse
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# api 모듈이 임시 데이터베이스를 쓰도록 import 전에 경로 지정
+WORK_DIR = tempfile.mkdtemp(prefix="leave-bench-")
+os.environ["LEAVE_DB_PATH"] = os.path.join(WORK_DIR, "leave_management.db")
+
+import httpx  # noqa: E402
+
+import api  # noqa: E402
+import credentials  # noqa: E402
+from balance_cache import balance_cache  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+PASSWORD = "bench-pw"
+
+
+def legacy_hash(password, salt="1234"):
+    return f"{salt}${hashlib.sha256(f'{salt}{password}'.encode()).hexdigest()}"
+
+
+def seed_database(employees, hashed_password):
+    migrate(os.environ["LEAVE_DB_PATH"])
+    conn = sqlite3.connect(os.environ["LEAVE_DB_PATH"])
+    conn.execute("DELETE FROM employees")
+    conn.executemany(
+        "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, ?, 15, 0)",
+        [(f"u{i:02d}", hashed_password) for i in range(employees)],
+    )
+    conn.commit()
+    conn.close()
+    balance_cache.invalidate()
+
+
+async def verify_inline(stored_password, provided_password):
+    return credentials.verify_password(stored_password, provided_password)
+
+
+async def measure_loop_lag(stop, lags):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def run_logins(client, total, employees, clients):
+    semaphore = asyncio.Semaphore(clients)
+    latencies, errors = [], 0
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    async def one(index):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/login", json={"username": f"u{index % employees:02d}",
+                                                         "password": PASSWORD})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return total / elapsed, p95, max(lags, default=0.0), errors
+
+
+async def bench(mode, total, employees, clients):
+    verify = verify_inline if mode == "inline" else credentials.verify_password_async
+    original_verify, original_needs_rehash = api.verify_password_async, api.needs_rehash
+    api.verify_password_async = verify
+    # 로그인 시 재해시 비용이 섞이지 않도록 고정
+    api.needs_rehash = lambda stored_password: False
+    try:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_logins(client, total, employees, clients)
+    finally:
+        api.verify_password_async, api.needs_rehash = original_verify, original_needs_rehash
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로그인 비밀번호 해시 처리량 벤치마크")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--employees", type=int, default=20)
+    args = parser.parse_args()
+
+    kdf_hash = credentials.hash_password(PASSWORD)
+    print(f"KDF: {kdf_hash.split('$', 1)[0]}  작업자: {credentials.CREDENTIAL_WORKERS}"
+          f" ({credentials.CREDENTIAL_EXECUTOR})")
+    print(f"{'clients':>8} {'mode':>7} {'req/s':>9} {'p95 ms':>9} {'loop lag ms':>12}")
+    for clients in args.clients:
+        for mode in ("legacy", "inline", "pool"):
+            seed_database(args.employees, legacy_hash(PASSWORD) if mode == "legacy" else kdf_hash)
+            rate, p95, lag, errors = asyncio.run(bench(mode, args.requests, args.employees, clients))
+            print(f"{clients:>8} {mode:>7} {rate:>9.1f} {p95 * 1000:>9.1f} {lag * 1000:>12.2f}"
+                  + (f"  (errors: {errors})" if errors else ""))
+    credentials.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# 팀 캘린더 기간 겹침 조회 벤치마크
+#
+# 무작위 주/월 구간에 대해 R*Tree 인덱스 조회(repository.fetch_calendar)와
+# start_date/end_date 컬럼을 바로 비교하는 예전 방식(leave_requests 전체 스캔)의 지연 시간을 비교한다.
+#
+#   python benchmarks/bench_team_calendar.py --requests 1000000
+#   python benchmarks/bench_team_calendar.py --db /tmp/synthetic.db   (이미 시드된 DB 재사용)
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrations import migrate  # noqa: E402
+from repository import fetch_calendar  # noqa: E402
+
+SCAN_SQL = """
+    SELECT id, username, start_date, end_date, days, leave_type, status
+    FROM leave_requests
+    WHERE start_date <= ? AND end_date >= ? AND status IN ('APPROVED', 'PENDING')
+    ORDER BY start_date, username
+"""
+
+
+def fetch_calendar_scan(conn, date_from, date_to):
+    return conn.execute(SCAN_SQL, (date_to.isoformat(), date_from.isoformat())).fetchall()
+
+
+def measure(fn, conn, ranges):
+    timings, rows = [], 0
+    for date_from, date_to in ranges:
+        started = time.perf_counter()
+        rows += len(fn(conn, date_from, date_to))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.95)] * 1000, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="팀 캘린더 조회 벤치마크")
+    parser.add_argument("--db", help="이미 시드된 DB (없으면 임시 DB 에 합성 데이터 생성)")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=50, help="구간 종류별 조회 수")
+    args = parser.parse_args()
+
+    db_path = args.db
+    if db_path is None:
+        from reset_database import seed_synthetic
+        db_path = os.path.join(tempfile.mkdtemp(prefix="leave-calendar-"), "leave_management.db")
+        migrate(db_path)
+        seed_synthetic(args.employees, args.requests, db_path=db_path)
+    else:
+        migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM leave_requests").fetchone()[0]
+    first, last = conn.execute("SELECT MIN(start_date), MAX(end_date) FROM leave_requests").fetchone()
+    first, last = date.fromisoformat(first), date.fromisoformat(last)
+
+    rng = random.Random(42)
+    print(f"휴가 신청 {total}건")
+    print(f"{'range':>6} {'rtree p50 ms':>13} {'rtree p95 ms':>13} {'scan p50 ms':>12} {'scan p95 ms':>12} {'rows/query':>11}")
+    for label, span in (("day", 1), ("week", 7), ("month", 31)):
+        ranges = []
+        for _ in range(args.queries):
+            start = first + timedelta(days=rng.randrange((last - first).days - span))
+            ranges.append((start, start + timedelta(days=span - 1)))
+        rtree_p50, rtree_p95, rtree_rows = measure(fetch_calendar, conn, ranges)
+        scan_p50, scan_p95, scan_rows = measure(fetch_calendar_scan, conn, ranges)
+        assert rtree_rows == scan_rows, (rtree_rows, scan_rows)
+        print(f"{label:>6} {rtree_p50:>13.2f} {rtree_p95:>13.2f} {scan_p50:>12.2f} {scan_p95:>12.2f}"
+              f" {rtree_rows / len(ranges):>11.0f}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
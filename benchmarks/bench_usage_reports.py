@@ -0,0 +1,98 @@
+# 휴가 사용 보고서 벤치마크
+#
+# 전사 월별/연도별 보고서를 요약 테이블(leave_usage_monthly)로 조회할 때와
+# leave_requests 전체를 읽어서 집계할 때(예전 방식)의 지연 시간을 비교한다.
+# 휴가 신청 INSERT 에 붙은 요약 갱신 트리거 비용도 함께 측정한다.
+#
+#   python benchmarks/bench_usage_reports.py --requests 1000000
+#   python benchmarks/bench_usage_reports.py --db /tmp/synthetic.db   (이미 시드된 DB 재사용)
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from migrations import migrate  # noqa: E402
+from repository import fetch_monthly_usage, fetch_yearly_usage  # noqa: E402
+
+STATUSES = ('APPROVED', 'PENDING')
+
+RAW_MONTHLY_SQL = """
+    SELECT username, substr(start_date, 1, 7) AS month, leave_type, SUM(days), COUNT(*)
+    FROM leave_requests
+    WHERE start_date >= ? AND start_date < ? AND status IN ('APPROVED', 'PENDING')
+    GROUP BY username, month, leave_type
+"""
+
+
+def raw_monthly(conn, year):
+    return conn.execute(RAW_MONTHLY_SQL, (f"{year}-01-01", f"{year + 1}-01-01")).fetchall()
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(result)
+
+
+# 트리거가 있는 상태에서 INSERT 1건당 비용 (롤백해서 데이터는 그대로)
+def insert_cost(conn, count=2000):
+    username = conn.execute("SELECT username FROM employees LIMIT 1").fetchone()[0]
+    started = time.perf_counter()
+    conn.executemany("""
+        INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status)
+        VALUES (?, '2024-03-04', '2024-03-04', 1, 'FULL_DAY', 'PENDING')
+    """, [(username,)] * count)
+    elapsed = time.perf_counter() - started
+    conn.rollback()
+    return elapsed / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="휴가 사용 보고서 벤치마크")
+    parser.add_argument("--db", help="이미 시드된 DB (없으면 임시 DB 에 합성 데이터 생성)")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--year", type=int, default=2023)
+    args = parser.parse_args()
+
+    db_path = args.db
+    if db_path is None:
+        from reset_database import seed_synthetic
+        db_path = os.path.join(tempfile.mkdtemp(prefix="leave-reports-"), "leave_management.db")
+        migrate(db_path)
+        seed_synthetic(args.employees, args.requests, db_path=db_path)
+    else:
+        migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM leave_requests").fetchone()[0]
+    summary_rows = conn.execute("SELECT COUNT(*) FROM leave_usage_monthly").fetchone()[0]
+    print(f"휴가 신청 {total}건, 요약 {summary_rows}행")
+
+    year = args.year
+    cases = [
+        ("monthly (all)", lambda: fetch_monthly_usage(conn, f"{year}-01", f"{year}-12", STATUSES),
+         lambda: raw_monthly(conn, year)),
+        ("yearly (all)", lambda: fetch_yearly_usage(conn, year, STATUSES), None),
+    ]
+    print(f"{'report':>14} {'summary ms':>11} {'raw ms':>9} {'rows':>8}")
+    for label, summary_fn, raw_fn in cases:
+        summary_ms, rows = timed(summary_fn)
+        raw_ms = timed(raw_fn)[0] if raw_fn else float("nan")
+        print(f"{label:>14} {summary_ms:>11.1f} {raw_ms:>9.1f} {rows:>8}")
+
+    print(f"INSERT 1건 (인덱스/트리거 포함): {insert_cost(conn):.1f}us")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
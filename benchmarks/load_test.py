@@ -0,0 +1,239 @@
+# API 부하 테스트 / 벤치마크
+#
+# 합성 DB(직원 수 x 직원당 신청 수)를 만든 뒤 signup, login, leave-request, leave-history, user-info
+# 엔드포인트를 각각 호출하고 엔드포인트별 처리량과 p50/p95/p99 지연 시간을 JSON 으로 출력한다.
+#
+#   인프로세스 (TestClient, 네트워크 없음):
+#       python -m benchmarks.load_test --mode inprocess --employees 1000 --requests-per-employee 50
+#   실행 중인 uvicorn 대상 (비동기 동시 클라이언트, 토큰을 직접 서명하므로 서버와 같은 서명 키 필요):
+#       export LEAVE_TOKEN_SECRET=bench-secret
+#       LEAVE_DB_PATH=/tmp/bench.db uvicorn api:app --workers 1 &
+#       python -m benchmarks.load_test --mode http --url http://127.0.0.1:8000 --db /tmp/bench.db --concurrency 64
+#   기준 결과와 비교 (느려졌으면 종료 코드 1):
+#       python -m benchmarks.load_test --output baseline.json
+#       python -m benchmarks.load_test --baseline baseline.json --tolerance 0.2
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+ENDPOINTS = ["signup", "login", "leave-request", "leave-history", "user-info"]
+
+
+# 한글 세 글자 이름 생성 (signup 은 이름이 정확히 3글자여야 함)
+def random_korean_name(rng):
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(3))
+
+
+# 사용자별 Bearer 헤더 (토큰은 /token 대신 같은 서명 키로 직접 발급)
+_auth_headers = {}
+
+
+def auth_headers(username):
+    headers = _auth_headers.get(username)
+    if headers is None:
+        from auth_tokens import issue_token
+        token, _ = issue_token(username)
+        headers = _auth_headers[username] = {"Authorization": f"Bearer {token}"}
+    return headers
+
+
+# 엔드포인트별 요청 (method, url, json, headers) 생성기
+def build_requests(endpoint, count, employees, rng):
+    from benchmarks.seed import bench_username, BENCH_PASSWORD
+
+    used_names = set()
+    for _ in range(count):
+        username = bench_username(rng.randrange(employees))
+        if endpoint == "signup":
+            name = random_korean_name(rng)
+            while name in used_names:
+                name = random_korean_name(rng)
+            used_names.add(name)
+            yield "POST", "/signup", {"username": name, "password": BENCH_PASSWORD}, None
+        elif endpoint == "login":
+            yield "POST", "/login", {"username": username, "password": BENCH_PASSWORD}, None
+        elif endpoint == "leave-request":
+            day = (2024, 5, 2 + rng.randrange(2))
+            yield ("POST", "/leave-request",
+                   {"start_date": "%04d-%02d-%02d" % day, "end_date": "%04d-%02d-%02d" % day,
+                    "leave_type": "MORNING_HALF"}, auth_headers(username))
+        elif endpoint == "leave-history":
+            yield "GET", "/leave-history", None, auth_headers(username)
+        elif endpoint == "user-info":
+            yield "GET", "/user-info", None, auth_headers(username)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": count / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if count else 0.0,
+    }
+
+
+# 인프로세스: TestClient 로 순차 호출 (네트워크/동시성 없이 앱 자체 비용 측정)
+def run_inprocess(args, rng):
+    from fastapi.testclient import TestClient
+    import api
+
+    results = {}
+    with TestClient(api.app) as client:
+        for endpoint in args.endpoints:
+            latencies, errors = [], 0
+            started = time.perf_counter()
+            for method, url, body, headers in build_requests(endpoint, args.iterations, args.employees, rng):
+                request_started = time.perf_counter()
+                response = client.request(method, url, json=body, headers=headers)
+                latencies.append(time.perf_counter() - request_started)
+                if response.status_code >= 400:
+                    errors += 1
+            results[endpoint] = summarize(latencies, errors, time.perf_counter() - started)
+    return results
+
+
+# HTTP: 실행 중인 uvicorn 에 동시 클라이언트 concurrency 개로 호출
+async def run_http_endpoint(client, endpoint, args, rng):
+    requests = list(build_requests(endpoint, args.iterations, args.employees, rng))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one(method, url, body, headers):
+        nonlocal errors
+        async with semaphore:
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body, headers=headers)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - request_started)
+            if failed:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_http(args, rng):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        for endpoint in args.endpoints:
+            results[endpoint] = await run_http_endpoint(client, endpoint, args, rng)
+    return results
+
+
+# 기준 결과 대비 p95 가 늘었거나 처리량이 줄어든 엔드포인트 목록
+def compare_with_baseline(results, baseline, tolerance):
+    regressions = []
+    for endpoint, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: throughput {previous['throughput_rps']:.1f} -> "
+                               f"{current['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="연차 관리 API 부하 테스트")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="http 모드 대상 서버")
+    parser.add_argument("--db", help="시드할 DB 경로 (http 모드에서는 서버가 쓰는 DB, 인프로세스는 기본 임시 파일)")
+    parser.add_argument("--no-seed", action="store_true", help="DB 를 새로 시드하지 않음 (http 모드)")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--requests-per-employee", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=32, help="http 모드 동시 클라이언트 수")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+
+    db_path = args.db
+    if db_path is None:
+        if args.mode == "http":
+            sys.exit("http 모드에서는 --db 로 서버가 사용하는 DB 경로를 지정해야 합니다.")
+        db_path = os.path.join(tempfile.mkdtemp(prefix="leave-load-"), "leave_management.db")
+    if args.mode == "http" and not os.environ.get("LEAVE_TOKEN_SECRET"):
+        sys.exit("http 모드에서는 서버와 같은 LEAVE_TOKEN_SECRET 을 지정해야 합니다.")
+    # api 모듈을 import 하기 전에 DB 경로 지정
+    os.environ["LEAVE_DB_PATH"] = db_path
+
+    if not args.no_seed:
+        from benchmarks.seed import seed_database
+        seed_database(db_path, args.employees, args.requests_per_employee, args.seed)
+
+    if args.mode == "inprocess":
+        endpoints = run_inprocess(args, rng)
+    else:
+        endpoints = asyncio.run(run_http(args, rng))
+
+    results = {
+        "mode": args.mode,
+        "config": {
+            "employees": args.employees,
+            "requests_per_employee": args.requests_per_employee,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency if args.mode == "http" else 1,
+        },
+        "endpoints": endpoints,
+    }
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("성능 저하 감지:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print("기준 결과 대비 성능 저하 없음", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
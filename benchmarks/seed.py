@@ -0,0 +1,51 @@
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from migrations import apply_migrations
+from credentials import hash_password
+
+
+# 벤치마크용 직원 이름 / 비밀번호
+BENCH_PASSWORD = "bench-pw"
+BENCH_TOTAL_LEAVE = 100000
+
+
+def bench_username(index):
+    return f"e{index:05d}"
+
+
+# 직원 employees 명 x 직원당 requests_per_employee 건의 휴가 신청이 있는 합성 DB 생성
+def seed_database(path, employees, requests_per_employee, seed=42):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    try:
+        apply_migrations(conn)
+        conn.execute("DELETE FROM leave_requests")
+        conn.execute("DELETE FROM employees")
+
+        # 해시는 한 번만 계산해서 모든 직원이 공유 (로그인 검증 비용은 동일)
+        hashed_password = hash_password(BENCH_PASSWORD)
+        conn.executemany(
+            "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, ?, ?, 0)",
+            ((bench_username(i), hashed_password, BENCH_TOTAL_LEAVE) for i in range(employees)),
+        )
+
+        def requests():
+            for i in range(employees):
+                for _ in range(requests_per_employee):
+                    start = date(2020, 1, 1) + timedelta(days=rng.randrange(365 * 5))
+                    yield (bench_username(i), start.isoformat(), start.isoformat(), 1.0, "FULL_DAY", "APPROVED")
+
+        conn.executemany("""
+            INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, requests())
+        conn.execute("""
+            UPDATE employees
+            SET used_leave = (SELECT COALESCE(SUM(days), 0) FROM leave_requests r
+                              WHERE r.username = employees.username)
+        """)
+        conn.commit()
+    finally:
+        conn.close()
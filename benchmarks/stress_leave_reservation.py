@@ -0,0 +1,149 @@
+# 동시 휴가 신청 스트레스 테스트
+#
+# 여러 프로세스 x 스레드가 소수의 직원에게 반차 신청을 동시에 쏟아붓고, 끝난 뒤
+#   - 어떤 직원도 total_leave 를 넘겨 사용하지 않았는지 (초과 사용 없음)
+#   - employees.used_leave 가 leave_requests 합계와 정확히 같은지 (lost update 없음)
+#   - 잔여 연차가 있는 신청은 모두 성공했는지 (성공 건수 = 직원별 min(시도 횟수, total_leave * 2) 합계)
+# 를 확인하고 처리량을 출력한다. 하나라도 어긋나면 종료 코드 1.
+#
+#   atomic : repository.insert_leave_request (BEGIN IMMEDIATE + 조건부 UPDATE, 현재 방식)
+#   legacy : 잔여 연차를 먼저 읽고 Python 에서 비교한 뒤 INSERT + UPDATE (이전 방식 - 비교용)
+#
+# 사용법: python benchmarks/stress_leave_reservation.py --processes 4 --threads 8 --attempts 400
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db_pool import ConnectionPool  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from repository import insert_leave_request, InsufficientLeaveError  # noqa: E402
+
+def legacy_insert(conn, username, start_date, end_date, days, leave_type):
+    user = conn.execute("SELECT total_leave, used_leave FROM employees WHERE username=?", (username,)).fetchone()
+    if days > user['total_leave'] - user['used_leave']:
+        raise InsufficientLeaveError()
+    try:
+        conn.execute("""
+            INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status)
+            VALUES (?, ?, ?, ?, ?, 'PENDING')
+        """, (username, start_date, end_date, days, leave_type))
+        conn.execute("UPDATE employees SET used_leave = used_leave + ? WHERE username = ?", (days, username))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def setup_database(path, employees, total_leave):
+    conn = sqlite3.connect(path)
+    apply_migrations(conn)
+    conn.executemany(
+        "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, 'x', ?, 0)",
+        [(f"e{i}", total_leave) for i in range(employees)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def worker(path, mode, threads, attempts, employees, results):
+    pool = ConnectionPool(path=path, size=threads)
+    insert = insert_leave_request if mode == "atomic" else legacy_insert
+    counts = {"ok": 0, "insufficient": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def run(thread_index):
+        for i in range(attempts):
+            username = f"e{(thread_index + i) % employees}"
+            try:
+                with pool.connection() as conn:
+                    insert(conn, username, "2024-05-02", "2024-05-02", 0.5, "MORNING_HALF")
+                outcome = "ok"
+            except InsufficientLeaveError:
+                outcome = "insufficient"
+            except sqlite3.Error:
+                outcome = "errors"
+            with lock:
+                counts[outcome] += 1
+
+    pool_threads = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in pool_threads:
+        t.start()
+    for t in pool_threads:
+        t.join()
+    pool.close()
+    results.put(counts)
+
+
+# 성공해야 하는 신청 수 - 스레드 t 의 i 번째 신청은 e{(t + i) % employees} 이고,
+# 직원마다 total_leave * 2 건(반차)까지는 잔여 연차가 있으므로 모두 성공해야 함
+def expected_committed(processes, threads, attempts, employees, total_leave):
+    per_employee = [0] * employees
+    for t in range(threads):
+        for i in range(attempts):
+            per_employee[(t + i) % employees] += processes
+    return sum(min(count, total_leave * 2) for count in per_employee)
+
+
+def verify(path):
+    conn = sqlite3.connect(path)
+    overdrafts = conn.execute("SELECT COUNT(*) FROM employees WHERE used_leave > total_leave").fetchone()[0]
+    mismatches = conn.execute("""
+        SELECT COUNT(*) FROM employees e
+        WHERE ABS(e.used_leave - COALESCE((SELECT SUM(days) FROM leave_requests r
+                                           WHERE r.username = e.username), 0)) > 1e-9
+    """).fetchone()[0]
+    conn.close()
+    return overdrafts, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 휴가 신청 스트레스 테스트")
+    parser.add_argument("--mode", choices=["atomic", "legacy"], default="atomic")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=400, help="스레드당 신청 횟수")
+    parser.add_argument("--employees", type=int, default=5)
+    parser.add_argument("--total-leave", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="leave-stress-"), "stress.db")
+    setup_database(path, args.employees, args.total_leave)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker,
+                                args=(path, args.mode, args.threads, args.attempts, args.employees, results))
+        for _ in range(args.processes)
+    ]
+    started = time.perf_counter()
+    for p in processes:
+        p.start()
+    totals = {"ok": 0, "insufficient": 0, "errors": 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    overdrafts, mismatches = verify(path)
+    attempted = sum(totals.values())
+    print(f"mode={args.mode} processes={args.processes} threads={args.threads}")
+    print(f"  attempted={attempted} ok={totals['ok']} insufficient={totals['insufficient']} errors={totals['errors']}")
+    print(f"  throughput={attempted / elapsed:.1f} req/s ({totals['ok'] / elapsed:.1f} committed/s)")
+    expected = expected_committed(args.processes, args.threads, args.attempts, args.employees, args.total_leave)
+    print(f"  expected committed={expected}")
+    print(f"  overdrafts={overdrafts} balance mismatches={mismatches}")
+    sys.exit(1 if overdrafts or mismatches or totals['ok'] != expected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# 다중 워커 캐시 일관성 스트레스 테스트
+#
+# 임시 DB 로 uvicorn 을 워커 수별(--workers 1 2 4)로 띄우고
+#   - 처리량: /user-info 를 동시 클라이언트로 호출한 초당 요청 수 (워커 수에 따른 확장)
+#   - 잔액 지연: 모든 워커의 캐시를 채운 뒤 다른 프로세스(sqlite 직접 UPDATE)가 total_leave 를 바꾸고,
+#     새 연결로 보낸 요청이 모두 새 값을 돌려줄 때까지 걸린 시간
+#   - 토큰 폐기 지연: 한 워커에서 /logout 한 토큰이 모든 워커에서 401 이 될 때까지 걸린 시간
+# 을 출력한다. 캐시 TTL 은 일부러 길게(300초) 두므로 지연이 poll 주기 + 여유 시간을 넘으면
+# 워커 간 무효화가 동작하지 않는 것이고 종료 코드 1. 처리량 확장은 CPU 가 워커 수 이상일 때만 확인한다.
+#
+#   python benchmarks/stress_multiworker_cache.py --workers 1 2 4 --concurrency 32 --requests 4000
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 토큰을 서버와 같은 서명 키로 직접 발급
+os.environ["LEAVE_TOKEN_SECRET"] = os.environ.get("LEAVE_TOKEN_SECRET") or "stress-multiworker-secret"
+
+import httpx  # noqa: E402
+
+from auth_tokens import issue_token  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+
+def setup_database(path, employees):
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executemany(
+        "INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, 'x', 15, 0)",
+        [(f"w{i:03d}",) for i in range(employees)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def start_server(db_path, workers, port, poll_interval):
+    env = dict(os.environ,
+               LEAVE_DB_PATH=db_path,
+               LEAVE_BALANCE_CACHE_TTL="300",
+               LEAVE_CHANGE_FEED_POLL_INTERVAL=str(poll_interval),
+               LEAVE_METRICS="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def wait_until_ready(url, workers, timeout=30):
+    deadline = time.monotonic() + timeout
+    ready = 0
+    # 워커마다 기동 시간이 달라서 연속으로 여러 번 응답할 때까지 기다림
+    while ready < workers * 4:
+        if time.monotonic() > deadline:
+            raise RuntimeError("서버가 시작되지 않았습니다.")
+        try:
+            httpx.get(f"{url}/cache/stats", timeout=1)
+            ready += 1
+        except httpx.TransportError:
+            ready = 0
+            time.sleep(0.2)
+
+
+async def measure_throughput(url, usernames, concurrency, total):
+    headers = {username: {"Authorization": f"Bearer {issue_token(username)[0]}"} for username in usernames}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        async def run(index):
+            for i in range(index, total, concurrency):
+                response = await client.get("/user-info", headers=headers[usernames[i % len(usernames)]])
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(index) for index in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+# 새 연결로 보낸 요청 batch 개 (연결마다 다른 워커가 받을 수 있음), (응답 받은 시각, 응답) 목록
+async def probe(url, headers, batch):
+    async def one():
+        async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+            response = await client.get("/user-info", headers=headers)
+            return time.perf_counter(), response
+    return await asyncio.gather(*(one() for _ in range(batch)))
+
+
+# batch 전체가 조건을 만족할 때까지 반복하고, 조건에 어긋난(오래된) 응답을 마지막으로 받은 시각까지의 시간 반환
+async def time_until(url, headers, batch, started, predicate, timeout):
+    last_stale = 0.0
+    while True:
+        responses = await probe(url, headers, batch)
+        stale = [received for received, response in responses if not predicate(response)]
+        if not stale:
+            return last_stale
+        last_stale = max(stale) - started
+        if last_stale > timeout:
+            return None
+
+
+async def measure_balance_staleness(url, db_path, username, batch, timeout):
+    headers = {"Authorization": f"Bearer {issue_token(username)[0]}"}
+    # 모든 워커의 캐시 채우기
+    for _, response in await probe(url, headers, batch * 2):
+        response.raise_for_status()
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    total = conn.execute("SELECT total_leave FROM employees WHERE username = ?", (username,)).fetchone()[0] + 1
+    conn.execute("UPDATE employees SET total_leave = ? WHERE username = ?", (total, username))
+    conn.commit()
+    conn.close()
+    started = time.perf_counter()
+    return await time_until(url, headers, batch, started,
+                            lambda response: response.json()["total_leave"] == total, timeout)
+
+
+async def measure_revocation_staleness(url, username, batch, timeout):
+    headers = {"Authorization": f"Bearer {issue_token(username)[0]}"}
+    for _, response in await probe(url, headers, batch * 2):
+        response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        (await client.post("/logout", headers=headers)).raise_for_status()
+    started = time.perf_counter()
+    return await time_until(url, headers, batch, started, lambda response: response.status_code == 401, timeout)
+
+
+async def run_case(url, db_path, workers, args):
+    usernames = [f"w{i:03d}" for i in range(args.employees)]
+    throughput = await measure_throughput(url, usernames, args.concurrency, args.requests)
+    batch = max(8, workers * 4)
+    timeout = max(10.0, args.poll_interval * 10)
+    balance = [await measure_balance_staleness(url, db_path, usernames[round_ % len(usernames)], batch, timeout)
+               for round_ in range(args.rounds)]
+    revocation = [await measure_revocation_staleness(url, usernames[round_ % len(usernames)], batch, timeout)
+                  for round_ in range(args.rounds)]
+    return throughput, balance, revocation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다중 워커 처리량/캐시 무효화 지연 스트레스 테스트")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--rounds", type=int, default=5, help="지연 측정 반복 횟수")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--margin", type=float, default=0.5, help="허용 지연 = poll 주기 + margin (초)")
+    parser.add_argument("--min-scaling", type=float, default=0.6,
+                        help="워커 수 대비 최소 처리량 배율 비율 (CPU 가 충분할 때만 확인)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="leave-multiworker-")
+    bound = args.poll_interval + args.margin
+    cpus = os.cpu_count() or 1
+    failures = []
+    baseline = None
+    print(f"CPU {cpus}개, 허용 지연 {bound:.2f}초 (poll {args.poll_interval}초 + 여유 {args.margin}초)")
+    print(f"{'workers':>7} {'req/s':>9} {'scale':>6} {'balance max s':>14} {'revoke max s':>13}")
+    for workers in args.workers:
+        db_path = os.path.join(work_dir, f"workers-{workers}.db")
+        setup_database(db_path, args.employees)
+        url = f"http://127.0.0.1:{args.port}"
+        process = start_server(db_path, workers, args.port, args.poll_interval)
+        try:
+            wait_until_ready(url, workers)
+            throughput, balance, revocation = asyncio.run(run_case(url, db_path, workers, args))
+        finally:
+            stop_server(process)
+
+        baseline = baseline or throughput
+        scale = throughput / baseline
+        worst = {}
+        for name, timings in (("잔액", balance), ("토큰 폐기", revocation)):
+            worst[name] = None if None in timings else max(timings)
+            if worst[name] is None or worst[name] > bound:
+                failures.append(f"workers={workers}: {name} 반영 지연 {worst[name]} > {bound:.2f}초")
+        if workers <= cpus and scale < workers * args.min_scaling:
+            failures.append(f"workers={workers}: 처리량 배율 {scale:.2f} < {workers * args.min_scaling:.2f}")
+
+        def show(value):
+            return "timeout" if value is None else f"{value:.3f}"
+        print(f"{workers:>7} {throughput:>9.0f} {scale:>6.2f} {show(worst['잔액']):>14} {show(worst['토큰 폐기']):>13}")
+
+    if any(workers > cpus for workers in args.workers):
+        print(f"CPU 가 {cpus}개라 워커 수가 이보다 많은 경우 처리량 확장은 확인하지 않음")
+    for failure in failures:
+        print(f"실패: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
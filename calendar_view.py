@@ -0,0 +1,51 @@
+import pandas as pd
+
+from history_view import LEAVE_TYPE_DICT
+from holiday_calendar import get_calendar
+from repository import fetch_calendar
+
+
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+
+# 칸에 표시할 짧은 유형 이름
+CELL_LABELS = {
+    'FULL_DAY': '🌴 전일',
+    'MORNING_HALF': '🌅 오전',
+    'AFTERNOON_HALF': '🌇 오후',
+}
+
+
+# 기간과 겹치는 휴가 신청을 DataFrame 으로 (R*Tree 인덱스 조회)
+def read_team_calendar(conn, date_from, date_to, include_pending=True):
+    rows = fetch_calendar(conn, date_from, date_to, include_pending)
+    return pd.DataFrame([dict(row) for row in rows],
+                        columns=['id', 'username', 'start_date', 'end_date', 'days', 'leave_type', 'status'])
+
+
+# 이름 x 날짜 표 (근무일만, 대기 중인 신청은 '(대기)' 표시)
+# 신청마다 기간 안의 날짜 수만큼 행을 늘린 뒤 pivot 한 번으로 만든다.
+def build_calendar_frame(entries, date_from, date_to):
+    calendar = get_calendar()
+    days = [day for day in pd.date_range(date_from, date_to, freq='D') if calendar.is_business_day(day.date())]
+    columns = [f"{day:%m/%d} ({WEEKDAYS[day.weekday()]})" for day in days]
+    if entries.empty or not days:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='이름'))
+
+    start = pd.to_datetime(entries['start_date']).clip(lower=pd.Timestamp(date_from))
+    end = pd.to_datetime(entries['end_date']).clip(upper=pd.Timestamp(date_to))
+    lengths = ((end - start).dt.days + 1).clip(lower=0)
+
+    expanded = entries.loc[entries.index.repeat(lengths)]
+    offsets = expanded.groupby(level=0).cumcount()
+    label = expanded['leave_type'].map(CELL_LABELS).fillna(expanded['leave_type'].map(LEAVE_TYPE_DICT))
+    label = label.where(expanded['status'] != 'PENDING', label + ' (대기)')
+
+    frame = pd.DataFrame({
+        '이름': expanded['username'].to_numpy(),
+        '날짜': (start.repeat(lengths) + pd.to_timedelta(offsets.to_numpy(), unit='D')).to_numpy(),
+        '유형': label.to_numpy(),
+    }).pivot_table(index='이름', columns='날짜', values='유형', aggfunc=', '.join)
+
+    frame = frame.reindex(columns=pd.DatetimeIndex(days)).fillna('')
+    frame.columns = columns
+    return frame
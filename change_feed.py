@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import sqlite3
+from collections import deque
+
+from db_pool import get_pool
+from repository import run_db, fetch_change_events, fetch_oldest_change_event_id
+
+
+# 다른 워커/프로세스가 커밋한 변경을 확인하는 주기(초) - PRAGMA data_version 한 번이라 매우 가벼움
+CHANGE_FEED_POLL_INTERVAL = float(os.environ.get("LEAVE_CHANGE_FEED_POLL_INTERVAL", "0.5"))
+
+# 메모리에 보관할 최근 이벤트 수 (이보다 오래된 id 부터 이어 받으면 DB 에서 읽음)
+CHANGE_FEED_BUFFER_SIZE = int(os.environ.get("LEAVE_CHANGE_FEED_BUFFER_SIZE", "2000"))
+
+# change_events 테이블에 남길 최근 이벤트 수 (0 이면 정리하지 않음)
+CHANGE_FEED_RETENTION = int(os.environ.get("LEAVE_CHANGE_FEED_RETENTION", "100000"))
+
+# 한 번에 읽거나 보낼 최대 이벤트 수
+CHANGE_FEED_BATCH_SIZE = 500
+
+# 워커 내부 캐시 무효화용 이벤트 (리스너에게만 전달하고 SSE/long-poll 로는 내보내지 않음)
+INTERNAL_EVENT_TYPES = ('token.revoked',)
+
+
+def _event(row):
+    return {
+        "id": row[0],
+        "type": row[1],
+        "username": row[2],
+        "data": json.loads(row[3]) if row[3] else {},
+        "created_at": row[4],
+    }
+
+
+# 변경 이벤트 피드 (워커 프로세스마다 하나)
+#
+# 쓰기는 트리거가 change_events 에 남기므로 어느 워커(또는 Streamlit 앱)가 커밋했든 같은 id 순서로 보인다.
+# 백그라운드 poller 가 전용 연결에서 PRAGMA data_version 을 확인하고, 바뀌었을 때만 새 행을 읽어
+# 메모리 버퍼에 넣은 뒤 기다리는 SSE/long-poll 요청을 깨운다.
+# 이 워커의 쓰기 경로는 커밋 직후 notify() 를 호출해서 다음 주기를 기다리지 않고 바로 읽게 한다.
+# add_listener() 로 등록한 함수는 새 이벤트 묶음마다 이벤트 루프에서 호출된다 (워커 간 캐시 무효화).
+class ChangeFeed:
+    def __init__(self, poll_interval=CHANGE_FEED_POLL_INTERVAL, buffer_size=CHANGE_FEED_BUFFER_SIZE,
+                 retention=CHANGE_FEED_RETENTION):
+        self.poll_interval = poll_interval
+        self.buffer_size = max(1, buffer_size)
+        self.retention = retention
+        self.last_id = 0
+        self._buffer = deque()
+        # 이 id 보다 큰 이벤트는 모두 버퍼에 있음
+        self._floor = 0
+        self._conn = None
+        self._data_version = None
+        self._pruned_at = 0
+        self._changed = None
+        self._wakeup = None
+        self._task = None
+        self._listeners = []
+
+        # 지표
+        self.polls = 0
+        self.reloads = 0
+        self.published = 0
+        self.subscribers = 0
+        self.listener_errors = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._conn = sqlite3.connect(get_pool().path, check_same_thread=False)
+        self._changed = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._data_version = await loop.run_in_executor(None, self._read_data_version)
+        self.last_id = self._floor = self._pruned_at = await loop.run_in_executor(None, self._read_last_id)
+        self._buffer.clear()
+        self._task = loop.create_task(self._poller())
+
+    # poller 를 멈추고 기다리던 요청을 모두 깨움 (스트림은 빈 결과를 받고 끝남)
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._changed.set()
+        self._conn.close()
+        self._conn = None
+
+    # listener(events) - 빨리 끝나야 함 (이벤트 루프에서 바로 실행)
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    # 쓰기 경로에서 커밋 직후 호출
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _read_data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_last_id(self):
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_events").fetchone()[0]
+
+    # data_version 이 바뀌었을 때만 새 이벤트를 읽음 (poller 스레드에서 실행)
+    def _read_new_events(self):
+        self.polls += 1
+        version = self._read_data_version()
+        if version == self._data_version:
+            return []
+        self.reloads += 1
+        rows = self._conn.execute("""
+            SELECT id, event_type, username, payload, created_at
+            FROM change_events
+            WHERE id > ?
+            ORDER BY id LIMIT ?
+        """, (self.last_id, CHANGE_FEED_BATCH_SIZE)).fetchall()
+        # 다 못 읽었으면 다음 확인에서 버전과 상관없이 이어서 읽음
+        self._data_version = version if len(rows) < CHANGE_FEED_BATCH_SIZE else None
+        return rows
+
+    # 보관 개수를 넘은 오래된 이벤트 정리 (보관 개수의 10% 만큼 쌓일 때마다)
+    def _prune(self):
+        self._conn.execute("DELETE FROM change_events WHERE id <= ?", (self.last_id - self.retention,))
+        self._conn.commit()
+        self._pruned_at = self.last_id
+
+    async def _poller(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                rows = await loop.run_in_executor(None, self._read_new_events)
+                if rows:
+                    self._publish(rows)
+                    if self._data_version is None:
+                        self._wakeup.set()
+                if self.retention > 0 and self.last_id - self._pruned_at > self.retention // 10:
+                    await loop.run_in_executor(None, self._prune)
+            except sqlite3.Error:
+                # 잠금 등 일시적인 오류는 다음 주기에 다시 시도
+                self._data_version = None
+
+    def _publish(self, rows):
+        events = [_event(row) for row in rows]
+        for event in events:
+            if len(self._buffer) >= self.buffer_size:
+                self._floor = self._buffer.popleft()["id"]
+            self._buffer.append(event)
+        self.last_id = rows[-1][0]
+        self.published += len(rows)
+        for listener in self._listeners:
+            try:
+                listener(events)
+            except Exception:
+                # 리스너 하나의 오류로 poller 가 멈추지 않도록 (캐시는 TTL 로 결국 만료됨)
+                self.listener_errors += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    # after_id 이후 이벤트 목록, 다음에 이어 받을 id, 이미 정리되어 건너뛴 이벤트가 있는지 여부
+    async def events_after(self, after_id, username=None, limit=CHANGE_FEED_BATCH_SIZE):
+        until_id = self.last_id
+        if after_id >= until_id:
+            return [], after_id, False
+
+        if after_id >= self._floor:
+            events = [event for event in self._buffer
+                      if event["id"] > after_id and event["type"] not in INTERNAL_EVENT_TYPES
+                      and (username is None or event["username"] == username)]
+            events = events[:limit]
+        else:
+            oldest = await run_db(fetch_oldest_change_event_id)
+            if oldest is None or oldest > after_id + 1:
+                return [], until_id, True
+            rows = await run_db(fetch_change_events, after_id, until_id, username, limit, INTERNAL_EVENT_TYPES)
+            events = [_event(row) for row in rows]
+
+        cursor = events[-1]["id"] if len(events) == limit else until_id
+        return events, cursor, False
+
+    # 새 이벤트가 생기거나 timeout 이 지날 때까지 기다림 (long-poll / SSE 공통)
+    async def wait(self, after_id, username=None, timeout=None):
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            changed = self._changed
+            events, after_id, reset = await self.events_after(after_id, username)
+            if events or reset or not self.running:
+                return events, after_id, reset
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return [], after_id, False
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return [], after_id, False
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "last_event_id": self.last_id,
+            "buffered": len(self._buffer),
+            "subscribers": self.subscribers,
+            "polls": self.polls,
+            "reloads": self.reloads,
+            "published": self.published,
+            "listener_errors": self.listener_errors,
+        }
+
+
+# 앱 전체에서 공유하는 변경 피드
+change_feed = ChangeFeed()
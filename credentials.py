@@ -0,0 +1,132 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+# 비밀번호 해시 (api.py / app.py / reset_database.py 공용)
+#
+# 새 해시는 KDF 로 저장한다.
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+# 예전 형식(<4자리 salt>$<sha256 hex>)도 검증할 수 있고, needs_rehash() 가 True 를 반환하므로
+# 로그인에 성공했을 때 현재 설정의 KDF 로 다시 해시해서 저장하면 된다.
+PASSWORD_KDF = os.environ.get("LEAVE_PASSWORD_KDF", "scrypt")
+SCRYPT_N = int(os.environ.get("LEAVE_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("LEAVE_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("LEAVE_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("LEAVE_PBKDF2_ITERATIONS", "600000"))
+
+# 해시 계산용 작업자 수 / 종류 (thread 또는 process)
+# hashlib 의 scrypt/pbkdf2 는 계산 중 GIL 을 놓으므로 기본은 스레드 풀
+CREDENTIAL_WORKERS = int(os.environ.get("LEAVE_CREDENTIAL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CREDENTIAL_EXECUTOR = os.environ.get("LEAVE_CREDENTIAL_EXECUTOR", "thread")
+
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+if PASSWORD_KDF not in ("scrypt", "pbkdf2_sha256"):
+    raise ValueError(f"지원하지 않는 LEAVE_PASSWORD_KDF 입니다: {PASSWORD_KDF}")
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    # n * r * 128 바이트가 필요하므로 기본 메모리 한도(32MB)보다 여유 있게 지정
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=n * r * 256, dklen=HASH_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=HASH_BYTES)
+
+
+# 비밀번호 해시 함수
+def hash_password(password, salt=None):
+    salt = salt if salt is not None else secrets.token_bytes(SALT_BYTES)
+    if isinstance(salt, str):
+        salt = salt.encode()
+
+    if PASSWORD_KDF == "scrypt":
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(digest)}"
+    digest = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+# 비밀번호 검증 함수 (형식이 잘못된 해시는 False)
+def verify_password(stored_password, provided_password):
+    try:
+        parts = stored_password.split("$")
+        if parts[0] == "scrypt":
+            _, n, r, p, salt, expected = parts
+            digest = _scrypt(provided_password, _b64decode(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(digest, _b64decode(expected))
+        if parts[0] == "pbkdf2_sha256":
+            _, iterations, salt, expected = parts
+            digest = _pbkdf2(provided_password, _b64decode(salt), int(iterations))
+            return hmac.compare_digest(digest, _b64decode(expected))
+
+        # 예전 형식: salt$sha256(salt + password)
+        salt, expected = parts
+        digest = hashlib.sha256(f"{salt}{provided_password}".encode()).hexdigest()
+        return hmac.compare_digest(digest, expected)
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+# 예전 형식이거나 현재 설정과 다른 KDF/비용으로 저장된 해시면 True
+def needs_rehash(stored_password):
+    parts = stored_password.split("$")
+    if PASSWORD_KDF == "scrypt":
+        return parts[:4] != ["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[:2] != ["pbkdf2_sha256", str(PBKDF2_ITERATIONS)]
+
+
+# ---------------------------------------------------------------------------
+# 비동기 엔드포인트용 - 해시 계산을 제한된 작업자 풀에서 실행 (이벤트 루프는 막히지 않음)
+# ---------------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if CREDENTIAL_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=CREDENTIAL_WORKERS)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=CREDENTIAL_WORKERS,
+                                                   thread_name_prefix="leave-credentials")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def hash_password_async(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), hash_password, password)
+
+
+async def verify_password_async(stored_password, provided_password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), verify_password, stored_password, provided_password)
@@ -0,0 +1,200 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import InstrumentedConnection, METRICS_ENABLED
+from slow_query_log import SLOW_QUERY_LOG_ENABLED
+
+
+# 데이터베이스 파일 경로 (환경 변수로 변경 가능)
+DB_PATH = os.environ.get("LEAVE_DB_PATH", "leave_management.db")
+
+# 풀 크기 / 연결 대기 시간(초) / 헬스 체크 주기(초)
+POOL_SIZE = int(os.environ.get("LEAVE_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("LEAVE_DB_POOL_TIMEOUT", "10"))
+HEALTH_CHECK_INTERVAL = float(os.environ.get("LEAVE_DB_HEALTH_CHECK_INTERVAL", "30"))
+
+# 연결마다 적용할 PRAGMA 기본값
+# LEAVE_DB_PRAGMA_<이름> 환경 변수로 개별 값을 덮어쓸 수 있음 (예: LEAVE_DB_PRAGMA_BUSY_TIMEOUT=10000)
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",       # 읽기와 쓰기가 서로를 막지 않도록 WAL 사용
+    "synchronous": "NORMAL",     # WAL 모드에서는 NORMAL로도 커밋 내구성이 보장됨
+    "busy_timeout": 5000,        # 잠금 시 "database is locked" 대신 최대 5초 대기 (ms)
+    "cache_size": -20000,        # 연결당 페이지 캐시 약 20MB (음수는 KiB 단위)
+    "mmap_size": 268435456,      # 256MB 메모리 맵 I/O
+}
+
+
+# 풀에서 제한 시간 안에 연결을 얻지 못했을 때 발생 (기존 sqlite3.Error 처리에 그대로 걸리도록 상속)
+class PoolTimeoutError(sqlite3.OperationalError):
+    pass
+
+
+def load_pragmas(overrides=None):
+    pragmas = dict(DEFAULT_PRAGMAS)
+    for name in DEFAULT_PRAGMAS:
+        env_value = os.environ.get(f"LEAVE_DB_PRAGMA_{name.upper()}")
+        if env_value is not None:
+            pragmas[name] = env_value
+    if overrides:
+        pragmas.update(overrides)
+    return pragmas
+
+
+# SQLite 연결 풀
+class ConnectionPool:
+    def __init__(self, path=DB_PATH, size=POOL_SIZE, pragmas=None,
+                 timeout=POOL_TIMEOUT, health_check_interval=HEALTH_CHECK_INTERVAL, factory=None):
+        if size < 1:
+            raise ValueError("풀 크기는 1 이상이어야 합니다.")
+
+        self.path = path
+        self.size = size
+        self.pragmas = load_pragmas(pragmas)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        # 지표 수집이나 느린 쿼리 로그가 켜져 있으면 쿼리 시간을 재는 연결 사용
+        instrumented = METRICS_ENABLED or SLOW_QUERY_LOG_ENABLED
+        self.factory = factory or (InstrumentedConnection if instrumented else sqlite3.Connection)
+
+        # (연결, 마지막 사용 시각) 쌍을 보관 - 최근에 반납된 연결부터 재사용 (캐시가 따뜻함)
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               factory=self.factory)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("연결 풀이 이미 닫혔습니다.")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                item = self._idle.get_nowait()
+            except queue.Empty:
+                item = None
+
+            if item is None:
+                # 여유가 있으면 새 연결 생성
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+
+                # 풀이 가득 찼으면 반납될 때까지 대기
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"{self.timeout}초 안에 데이터베이스 연결을 얻지 못했습니다.")
+                try:
+                    item = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            # 오래 쉬었던 연결은 사용 전에 상태 확인
+            conn, last_used = item
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        if self._closed:
+            self._discard(conn)
+            return
+
+        # 커밋되지 않은 트랜잭션은 되돌린 뒤 반납
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self._lock:
+            created = self._created
+        idle = self._idle.qsize()
+        return {"size": self.size, "created": created, "idle": idle, "in_use": created - idle}
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+# 프로세스 전역 풀 (처음 사용할 때 생성)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# FastAPI 의존성: 요청마다 풀에서 연결을 빌려주고 요청이 끝나면 반납
+def get_db():
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
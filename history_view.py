@@ -0,0 +1,62 @@
+import pandas as pd
+
+
+# 상태 변환 딕셔너리
+STATUS_DICT = {
+    'PENDING': '수락 대기중',
+    'APPROVED': '승인됨',
+    'REJECTED': '반려됨'
+}
+
+# 연차 유형 딕셔너리
+LEAVE_TYPE_DICT = {
+    'FULL_DAY': '전일',
+    'MORNING_HALF': '오전 반차',
+    'AFTERNOON_HALF': '오후 반차'
+}
+
+# 코드 -> 한글 이름 변환은 categorical 의 카테고리 이름만 바꾸므로 행 수와 무관
+STATUS_DTYPE = pd.CategoricalDtype(categories=list(STATUS_DICT))
+LEAVE_TYPE_DTYPE = pd.CategoricalDtype(categories=list(LEAVE_TYPE_DICT))
+
+
+# 휴가 신청 내역을 시간순(id 오름차순)으로 DataFrame 에 바로 읽기
+def read_leave_history(conn, usernames):
+    if isinstance(usernames, str):
+        usernames = [usernames]
+    placeholders = ", ".join("?" for _ in usernames)
+    return pd.read_sql(f"""
+        SELECT id, username, start_date, end_date, days, leave_type, status
+        FROM leave_requests
+        WHERE username IN ({placeholders})
+        ORDER BY id
+    """, conn, params=list(usernames))
+
+
+# 각 신청 시점의 남은 연차 계산 (벡터 연산)
+#
+# 시간순 정렬된 내역에서 i 번째 신청 시점의 남은 연차는
+#   현재 남은 연차 + (i 이후 신청들의 일수 합) = 현재 남은 연차 + (전체 합 - 누적합)
+# 이므로 사용자별 역방향 누적합 한 번으로 끝난다.
+# current_remaining 은 한 사용자면 숫자, 팀 화면이면 {username: 현재 남은 연차}.
+def build_history_frame(history_df, current_remaining):
+    days = history_df['days']
+    if isinstance(current_remaining, dict):
+        grouped = days.groupby(history_df['username'], sort=False)
+        later_days = grouped.transform('sum') - grouped.cumsum()
+        base = history_df['username'].map(current_remaining)
+    else:
+        later_days = days.sum() - days.cumsum()
+        base = current_remaining
+
+    frame = pd.DataFrame({
+        '시작날짜': history_df['start_date'],
+        '종료날짜': history_df['end_date'],
+        '일수': days,
+        '유형': history_df['leave_type'].astype(LEAVE_TYPE_DTYPE).cat.rename_categories(LEAVE_TYPE_DICT),
+        '상태': history_df['status'].astype(STATUS_DTYPE).cat.rename_categories(STATUS_DICT),
+        '남은 연차': base + later_days,
+    })
+    if isinstance(current_remaining, dict):
+        frame.insert(0, '이름', history_df['username'])
+    return frame
@@ -0,0 +1,188 @@
+import calendar
+import csv
+import os
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+
+
+# 공휴일 데이터 파일 (date,name 형식의 CSV - 환경 변수로 변경 가능)
+HOLIDAYS_PATH = os.environ.get(
+    "LEAVE_HOLIDAYS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "holidays_kr.csv"),
+)
+
+# 영업일을 계산할 수 있는 연도 범위 - 이 밖의 날짜는 입력 오류로 처리
+# 연도별 표를 요청 처리 중에(이벤트 루프 위에서) 만들기 때문에 처음 넓히는 비용이 작도록 100년으로 제한
+# (전체를 만들어도 수십 ms, API 는 공휴일 데이터가 있는 연도만 계산하므로 보통 몇 ms)
+MIN_YEAR = 2000
+MAX_YEAR = 2099
+
+
+class DateRangeError(ValueError):
+    pass
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+# 지원 연도 범위 밖의 날짜면 DateRangeError
+def check_date_range(*days):
+    for day in days:
+        if not MIN_YEAR <= day.year <= MAX_YEAR:
+            raise DateRangeError(f"날짜는 {MIN_YEAR}년부터 {MAX_YEAR}년 사이여야 합니다.")
+
+
+# 공휴일 CSV 읽기 - {날짜: 이름}
+def load_holidays(path=HOLIDAYS_PATH):
+    holidays = {}
+    if not os.path.exists(path):
+        return holidays
+    with open(path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            holidays[_to_date(row["date"])] = row["name"]
+    return holidays
+
+
+# 영업일(주말·공휴일 제외) 계산 엔진
+#
+# 연도마다 prefix[i] = (1월 1일부터 i일 전까지의 영업일 수) 배열을 만들어 두고,
+# 연도 시작까지의 누적 영업일(offset)을 함께 보관한다.
+# 날짜 d 이전까지의 누적 영업일 = offset[연도] + prefix[연도][연중 일수] 이므로
+# 임의 구간의 영업일 수는 두 번의 조회로 끝난다.
+#
+# 표는 (첫 연도, 마지막 연도, prefix, offset) 튜플 하나로 보관하고 만든 뒤에는 고치지 않는다.
+# 범위를 넓힐 때는 잠금 안에서 새 튜플을 만들어 한 번에 바꾸므로, 잠금 없이 읽는 쪽은
+# 한 번 가져온 튜플로 계산하는 동안 반쯤 만들어진 표나 기준 연도가 다른 offset 을 보지 않는다.
+class HolidayCalendar:
+    def __init__(self, holidays=None):
+        self.holidays = dict(holidays or {})
+        # 공휴일 데이터가 있는 연도 범위 (데이터가 없으면 None - 확인하지 않음)
+        years = [day.year for day in self.holidays]
+        self.covered_years = (min(years), max(years)) if years else None
+        self._tables = None
+        self._lock = threading.Lock()
+
+    # 공휴일 데이터가 없는 연도의 날짜면 DateRangeError (공휴일을 근무일로 세지 않도록)
+    def check_covered(self, *days):
+        if self.covered_years is None:
+            return
+        first, last = self.covered_years
+        for day in days:
+            if not first <= day.year <= last:
+                raise DateRangeError(f"공휴일 정보는 {first}년부터 {last}년까지만 있습니다.")
+
+    def is_holiday(self, day):
+        return _to_date(day) in self.holidays
+
+    def is_business_day(self, day):
+        day = _to_date(day)
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _build_year(self, year):
+        days_in_year = 366 if calendar.isleap(year) else 365
+        prefix = array("i", [0]) * (days_in_year + 1)
+        current = date(year, 1, 1)
+        count = 0
+        for i in range(days_in_year):
+            # 주말 제외 (토요일(5)과 일요일(6) 제외) + 공휴일 제외
+            if current.weekday() < 5 and current not in self.holidays:
+                count += 1
+            prefix[i + 1] = count
+            current += timedelta(days=1)
+        return prefix
+
+    # first ~ last 연도를 포함하는 표 반환 (없으면 범위를 넓힌 새 표를 만들어 교체)
+    def _ensure_years(self, first, last):
+        tables = self._tables
+        if tables is not None and tables[0] <= first and last <= tables[1]:
+            return tables
+
+        with self._lock:
+            tables = self._tables
+            if tables is not None:
+                if tables[0] <= first and last <= tables[1]:
+                    return tables
+                first, last = min(first, tables[0]), max(last, tables[1])
+                built = tables[2]
+            else:
+                built = {}
+
+            # 이미 만든 연도 배열은 그대로 쓰고 offset 은 새 기준 연도부터 다시 계산
+            prefix, offset, running = {}, {}, 0
+            for year in range(first, last + 1):
+                prefix[year] = built.get(year) or self._build_year(year)
+                offset[year] = running
+                running += prefix[year][-1]
+            tables = (first, last, prefix, offset)
+            self._tables = tables
+            return tables
+
+    # 기준 연도 1월 1일부터 day 전날까지의 누적 영업일 수
+    @staticmethod
+    def _cumulative(tables, day):
+        return tables[3][day.year] + tables[2][day.year][day.timetuple().tm_yday - 1]
+
+    # start ~ end (양 끝 포함) 사이의 영업일 수
+    def count_business_days(self, start, end):
+        start, end = _to_date(start), _to_date(end)
+        check_date_range(start, end)
+        if end < start:
+            return 0
+        tables = self._ensure_years(start.year, end.year + 1)
+        return self._cumulative(tables, end + timedelta(days=1)) - self._cumulative(tables, start)
+
+    def holidays_between(self, start, end):
+        start, end = _to_date(start), _to_date(end)
+        return sorted((day, name) for day, name in self.holidays.items() if start <= day <= end)
+
+
+# 프로세스 전역 공휴일 달력 (처음 사용할 때 데이터 파일에서 읽음)
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar():
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = HolidayCalendar(load_holidays())
+    return _calendar
+
+
+# 공휴일 데이터 파일이 바뀌었을 때 다시 읽기
+def reload_calendar(path=HOLIDAYS_PATH):
+    global _calendar
+    with _calendar_lock:
+        _calendar = HolidayCalendar(load_holidays(path))
+    return _calendar
+
+
+# 날짜 범위 내 날짜 계산 함수 (API 와 Streamlit 앱 공용)
+# 날짜 형식이 틀리거나 지원 연도 범위 또는 공휴일 데이터 범위를 벗어나면 ValueError (DateRangeError)
+def calculate_working_days(start_date, end_date, leave_type):
+    start = _to_date(start_date)
+    end = _to_date(end_date)
+    check_date_range(start, end)
+    get_calendar().check_covered(start, end)
+
+    if end < start:
+        return {"error": "시작 날짜가 종료 날짜보다 늦습니다."}
+
+    # 반차인 경우 하루 이상 선택 불가
+    if (leave_type == 'MORNING_HALF' or leave_type == 'AFTERNOON_HALF'):
+        if start != end:
+            return {"error": "반차는 하루만 선택 가능합니다"}
+        # 주말·공휴일의 반차는 차감하지 않음
+        return {"days": 0.5 if get_calendar().is_business_day(start) else 0}
+
+    # 주말과 공휴일을 제외한 날짜 계산
+    days = get_calendar().count_business_days(start, end)
+
+    return {"days": days}
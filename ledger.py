@@ -0,0 +1,260 @@
+import argparse
+import os
+import sqlite3
+import time
+
+from db_pool import DB_PATH
+from migrations import migrate
+from repository import fetch_ledger_balance, run_immediate
+
+
+# 연차 원장 일괄 작업 (잔액 스냅샷 / 연차 연도 전환 / 검증)
+#
+# 직원을 username 순서로 LEDGER_CHUNK_SIZE 명씩 짧은 BEGIN IMMEDIATE 트랜잭션으로 처리하고,
+# 트랜잭션 사이에 잠깐 쉬어서 온라인 휴가 신청이 오래 기다리지 않게 한다.
+# 진행 상태가 DB 에 남으므로 중간에 멈춰도 같은 명령으로 이어서 실행할 수 있다.
+
+# 한 트랜잭션에서 처리할 직원 수 / 트랜잭션 사이 쉬는 시간(초)
+# 잠금을 기다리는 쪽은 SQLite busy handler 가 최대 100ms 씩 자면서 재시도하므로,
+# 쉬는 시간이 그보다 짧으면 온라인 쓰기가 틈을 놓치고 계속 밀린다.
+LEDGER_CHUNK_SIZE = int(os.environ.get("LEAVE_LEDGER_CHUNK_SIZE", "200"))
+LEDGER_CHUNK_PAUSE = float(os.environ.get("LEAVE_LEDGER_CHUNK_PAUSE", "0.1"))
+
+# 마지막 스냅샷 이후 항목이 이만큼 쌓인 직원만 새 스냅샷을 남김
+SNAPSHOT_MIN_ENTRIES = int(os.environ.get("LEAVE_SNAPSHOT_MIN_ENTRIES", "20"))
+
+# 다음 연도로 이월할 수 있는 최대 잔여 연차
+CARRYOVER_MAX = float(os.environ.get("LEAVE_CARRYOVER_MAX", "5"))
+
+
+def _connect(db_path):
+    return sqlite3.connect(db_path, timeout=30)
+
+
+def _insert_snapshot(conn, balance):
+    conn.execute("""
+        INSERT OR IGNORE INTO leave_balance_snapshots (username, year, ledger_id, granted, used)
+        VALUES (?, ?, ?, ?, ?)
+    """, (balance["username"], balance["year"], balance["ledger_id"], balance["granted"], balance["used"]))
+
+
+# ---------------------------------------------------------------------------
+# 잔액 스냅샷
+# ---------------------------------------------------------------------------
+
+def _snapshot_chunk(conn, usernames, min_entries):
+    taken = 0
+    for username in usernames:
+        balance = fetch_ledger_balance(conn, username)
+        if balance is not None and balance["delta_entries"] >= min_entries:
+            _insert_snapshot(conn, balance)
+            taken += 1
+    return taken
+
+
+# 현재 연차 연도의 잔액 스냅샷 (잔액 조회 때 읽는 원장 항목 수를 줄임)
+def take_snapshots(db_path=DB_PATH, min_entries=SNAPSHOT_MIN_ENTRIES, chunk_size=LEDGER_CHUNK_SIZE,
+                   pause=LEDGER_CHUNK_PAUSE, verbose=True):
+    migrate(db_path)
+    conn = _connect(db_path)
+    try:
+        last_username, scanned, taken = "", 0, 0
+        while True:
+            usernames = [row[0] for row in conn.execute(
+                "SELECT username FROM employees WHERE username > ? ORDER BY username LIMIT ?",
+                (last_username, chunk_size),
+            )]
+            if not usernames:
+                break
+            taken += run_immediate(conn, _snapshot_chunk, usernames, min_entries)
+            scanned += len(usernames)
+            last_username = usernames[-1]
+            time.sleep(pause)
+        if verbose:
+            print(f"직원 {scanned}명 중 {taken}명의 잔액 스냅샷을 남겼습니다.")
+        return taken
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# 연차 연도 전환
+# ---------------------------------------------------------------------------
+
+# 전환 작업 행을 만들거나 (이어서 실행이면) 기존 설정을 읽음
+def _start_rollover(conn, year, annual_grant, carryover_max):
+    latest = conn.execute("SELECT MAX(year) FROM leave_rollovers").fetchone()[0]
+    if latest is not None and year < latest:
+        raise ValueError(f"이미 {latest}년으로 전환되었습니다.")
+    unfinished = conn.execute(
+        "SELECT year FROM leave_rollovers WHERE completed_at IS NULL AND year != ?", (year,),
+    ).fetchone()
+    if unfinished is not None:
+        raise ValueError(f"{unfinished[0]}년 전환이 끝나지 않았습니다. 먼저 마무리하세요.")
+
+    conn.execute("""
+        INSERT OR IGNORE INTO leave_rollovers (year, annual_grant, carryover_max)
+        VALUES (?, ?, ?)
+    """, (year, annual_grant, carryover_max))
+    return conn.execute(
+        "SELECT annual_grant, carryover_max, processed, completed_at FROM leave_rollovers WHERE year = ?", (year,),
+    ).fetchone()
+
+
+# 직원 한 명씩: 이전 연도 마감 스냅샷 -> 새 연도 GRANT/CARRYOVER 항목 -> employees 잔액 교체
+# 새 연차는 annual_grant (없으면 이전 연도에 받은 연차에서 이월분을 뺀 값 = 본인 기본 연차)
+# 전환 전에 낸 대기 중 신청은 이전 연도 사용분으로 남고, 나중에 반려되면 새 연도에 REVERSAL 로 돌려받는다.
+def _rollover_chunk(conn, year, usernames, annual_grant, carryover_max):
+    processed = 0
+    for username in usernames:
+        row = conn.execute(
+            "SELECT leave_year FROM employees WHERE username = ? AND leave_year < ?", (username, year),
+        ).fetchone()
+        if row is None:
+            continue
+        closing = fetch_ledger_balance(conn, username, row[0])
+        carried_in = conn.execute("""
+            SELECT COALESCE(SUM(granted), 0) FROM leave_ledger
+            WHERE username = ? AND year = ? AND entry_type = 'CARRYOVER'
+        """, (username, row[0])).fetchone()[0]
+        grant = annual_grant if annual_grant is not None else closing["granted"] - carried_in
+        carryover = min(max(closing["remaining"], 0), carryover_max)
+
+        _insert_snapshot(conn, closing)
+        entries = [(username, year, 'GRANT', grant)]
+        if carryover > 0:
+            entries.append((username, year, 'CARRYOVER', carryover))
+        conn.executemany(
+            "INSERT INTO leave_ledger (username, year, entry_type, granted) VALUES (?, ?, ?, ?)", entries,
+        )
+        conn.execute(
+            "UPDATE employees SET leave_year = ?, total_leave = ?, used_leave = 0 WHERE username = ?",
+            (year, grant + carryover, username),
+        )
+        processed += 1
+
+    conn.execute("""
+        UPDATE leave_rollovers SET last_username = ?, processed = processed + ? WHERE year = ?
+    """, (usernames[-1], processed, year))
+    return processed
+
+
+def _complete_rollover(conn, year):
+    remaining = conn.execute("SELECT COUNT(*) FROM employees WHERE leave_year < ?", (year,)).fetchone()[0]
+    if remaining == 0:
+        conn.execute("UPDATE leave_rollovers SET completed_at = CURRENT_TIMESTAMP WHERE year = ?", (year,))
+    return remaining
+
+
+# year 연차 연도로 전환 (직원 전체를 chunk 단위로, 중단되면 같은 명령으로 이어서 실행)
+def run_rollover(year, db_path=DB_PATH, annual_grant=None, carryover_max=CARRYOVER_MAX,
+                 chunk_size=LEDGER_CHUNK_SIZE, pause=LEDGER_CHUNK_PAUSE, verbose=True):
+    migrate(db_path)
+    conn = _connect(db_path)
+    try:
+        annual_grant, carryover_max, already, completed_at = run_immediate(
+            conn, _start_rollover, year, annual_grant, carryover_max)
+        if completed_at is not None:
+            if verbose:
+                print(f"{year}년 전환은 이미 완료되었습니다.")
+            return 0
+
+        started = time.perf_counter()
+        last_username, processed, chunks = "", 0, 0
+        while True:
+            usernames = [row[0] for row in conn.execute("""
+                SELECT username FROM employees
+                WHERE username > ? AND leave_year < ?
+                ORDER BY username LIMIT ?
+            """, (last_username, year, chunk_size))]
+            if not usernames:
+                break
+            processed += run_immediate(conn, _rollover_chunk, year, usernames, annual_grant, carryover_max)
+            last_username = usernames[-1]
+            chunks += 1
+            time.sleep(pause)
+
+        remaining = run_immediate(conn, _complete_rollover, year)
+        if verbose:
+            elapsed = time.perf_counter() - started
+            print(f"{year}년 전환: 직원 {processed}명을 {chunks}개 트랜잭션으로 {elapsed:.1f}초 만에 처리했습니다."
+                  + (f" (이전 실행 {already}명)" if already else ""))
+            if remaining:
+                print(f"아직 전환되지 않은 직원 {remaining}명이 있습니다. 다시 실행하세요.")
+        return processed
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# 검증
+# ---------------------------------------------------------------------------
+
+# employees 잔액과 현재 연도 원장 합계가 다른 직원
+BALANCE_MISMATCH_SQL = """
+    SELECT e.username, e.leave_year, e.total_leave, e.used_leave,
+           COALESCE(SUM(l.granted), 0), COALESCE(SUM(l.used), 0)
+    FROM employees e
+    LEFT JOIN leave_ledger l ON l.username = e.username AND l.year = e.leave_year
+    GROUP BY e.id
+    HAVING ABS(COALESCE(e.total_leave, 0) - COALESCE(SUM(l.granted), 0)) > 1e-9
+        OR ABS(COALESCE(e.used_leave, 0) - COALESCE(SUM(l.used), 0)) > 1e-9
+"""
+
+# 스냅샷 값과 ledger_id 까지의 원장 합계가 다른 스냅샷
+SNAPSHOT_MISMATCH_SQL = """
+    SELECT * FROM (
+        SELECT s.username, s.year, s.ledger_id, s.granted, s.used,
+               (SELECT COALESCE(SUM(l.granted), 0) FROM leave_ledger l
+                WHERE l.username = s.username AND l.year = s.year AND l.id <= s.ledger_id) AS want_granted,
+               (SELECT COALESCE(SUM(l.used), 0) FROM leave_ledger l
+                WHERE l.username = s.username AND l.year = s.year AND l.id <= s.ledger_id) AS want_used
+        FROM leave_balance_snapshots s
+    )
+    WHERE ABS(granted - want_granted) > 1e-9 OR ABS(used - want_used) > 1e-9
+"""
+
+
+def verify_ledger(conn):
+    return conn.execute(BALANCE_MISMATCH_SQL).fetchall(), conn.execute(SNAPSHOT_MISMATCH_SQL).fetchall()
+
+
+# 직접 실행할 경우
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="연차 원장 스냅샷/연도 전환/검증")
+    parser.add_argument("--db", default=DB_PATH, help="데이터베이스 파일 경로")
+    parser.add_argument("--chunk-size", type=int, default=LEDGER_CHUNK_SIZE, help="한 트랜잭션에서 처리할 직원 수")
+    parser.add_argument("--pause", type=float, default=LEDGER_CHUNK_PAUSE, help="트랜잭션 사이 쉬는 시간(초)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = commands.add_parser("snapshot", help="현재 연도 잔액 스냅샷")
+    snapshot_parser.add_argument("--min-entries", type=int, default=SNAPSHOT_MIN_ENTRIES,
+                                 help="마지막 스냅샷 이후 항목이 이 수 이상인 직원만")
+
+    rollover_parser = commands.add_parser("rollover", help="다음 연차 연도로 전환")
+    rollover_parser.add_argument("year", type=int, help="새 연차 연도")
+    rollover_parser.add_argument("--grant", type=float, help="모든 직원에게 줄 새 연차 (생략하면 직원별 기본 연차 유지)")
+    rollover_parser.add_argument("--carryover-max", type=float, default=CARRYOVER_MAX, help="최대 이월 연차")
+
+    commands.add_parser("verify", help="employees 잔액/스냅샷을 원장과 비교")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        take_snapshots(args.db, args.min_entries, args.chunk_size, args.pause)
+    elif args.command == "rollover":
+        try:
+            run_rollover(args.year, args.db, args.grant, args.carryover_max, args.chunk_size, args.pause)
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+    else:
+        migrate(args.db)
+        conn = _connect(args.db)
+        try:
+            balances, snapshots = verify_ledger(conn)
+        finally:
+            conn.close()
+        for username, year, total_leave, used_leave, granted, used in balances:
+            print(f"  {username} ({year}): employees {total_leave}/{used_leave}, 원장 {granted}/{used}")
+        for username, year, ledger_id, granted, used, want_granted, want_used in snapshots:
+            print(f"  스냅샷 {username} ({year}, ~{ledger_id}): {granted}/{used}, 원장 {want_granted}/{want_used}")
+        print(f"원장과 다른 직원 잔액: {len(balances)}명, 스냅샷: {len(snapshots)}개")
@@ -0,0 +1,343 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from slow_query_log import SLOW_QUERY_LOG_ENABLED, SLOW_QUERY_THRESHOLD_MS, record_slow_query
+
+
+# 지표 수집 사용 여부 (기본 켜짐 - 요청/쿼리당 수 마이크로초 수준)
+METRICS_ENABLED = os.environ.get("LEAVE_METRICS", "1") == "1"
+
+# 느린 쿼리 기록 임계값 (초)
+SLOW_QUERY_THRESHOLD = SLOW_QUERY_THRESHOLD_MS / 1000
+
+# 히스토그램 구간 (초)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# 라벨별 카운터
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+# 라벨별 히스토그램 (구간별 개수 + 합계 + 개수)
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=REQUEST_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count))
+                           for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+# ---------------------------------------------------------------------------
+# 지표 정의
+# ---------------------------------------------------------------------------
+
+http_requests_total = Counter(
+    "leave_http_requests_total", "HTTP 요청 수", ("method", "route", "status"))
+http_request_errors_total = Counter(
+    "leave_http_request_errors_total", "5xx 응답 또는 처리 중 예외가 난 HTTP 요청 수", ("method", "route"))
+http_request_duration_seconds = Histogram(
+    "leave_http_request_duration_seconds", "HTTP 요청 처리 시간(초)", ("method", "route"), REQUEST_BUCKETS)
+
+sql_statements_total = Counter(
+    "leave_sql_statements_total", "SQLite 엔진이 실행한 문장 수 (trace callback 기준)", ("statement",))
+sql_query_duration_seconds = Histogram(
+    "leave_sql_query_duration_seconds", "SQL 실행부터 결과 행을 다 읽을 때까지 SQLite 안에서 쓴 시간(초)",
+    ("statement",), SQL_BUCKETS)
+sql_query_errors_total = Counter(
+    "leave_sql_query_errors_total", "실패한 SQL 실행 수", ("statement",))
+
+ALL_METRICS = [
+    http_requests_total, http_request_errors_total, http_request_duration_seconds,
+    sql_statements_total, sql_query_duration_seconds, sql_query_errors_total,
+]
+
+
+# ---------------------------------------------------------------------------
+# SQL 문장 지문 (리터럴과 공백을 정규화해서 같은 모양의 쿼리를 하나로 묶음)
+# ---------------------------------------------------------------------------
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_FINGERPRINT_CACHE_SIZE = 4096
+_fingerprints = {}
+
+
+def fingerprint(sql):
+    result = _fingerprints.get(sql)
+    if result is None:
+        result = _STRING_LITERAL.sub("?", sql)
+        result = _NUMBER_LITERAL.sub("?", result)
+        result = _IN_LIST.sub("(?...)", result)
+        result = _WHITESPACE.sub(" ", result).strip()
+        if len(_fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        _fingerprints[sql] = result
+    return result
+
+
+def _record_sql(conn, sql, parameters, elapsed, failed, many=False):
+    if METRICS_ENABLED:
+        labels = (fingerprint(sql),)
+        sql_query_duration_seconds.observe(labels, elapsed)
+        if failed:
+            sql_query_errors_total.inc(labels)
+    if SLOW_QUERY_LOG_ENABLED and elapsed >= SLOW_QUERY_THRESHOLD:
+        record_slow_query(conn, sql, parameters, elapsed, many=many, failed=failed)
+
+
+# 계측 커서에서 지금 실행 중인 (파라미터 바인딩 전) 문장 - 실행은 호출한 스레드에서 동기로 일어남
+_executing = threading.local()
+
+# 파라미터가 없는 트랜잭션 제어 문장 (암묵적 BEGIN, commit() 의 COMMIT 등)
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+
+# trace callback 이 받는 문장은 파라미터 값이 채워진 형태라 그대로 지문을 만들면 같은 모양의 쿼리가
+# 값마다 갈라지고 지문 캐시도 계속 비워진다. 계측 커서에서 실행 중이면 바인딩 전 문장으로 묶는다.
+def _trace_statement(sql):
+    statement = getattr(_executing, "sql", None)
+    if statement is None or _TRANSACTION_CONTROL.match(sql):
+        statement = sql
+    sql_statements_total.inc((fingerprint(statement),))
+
+
+# 실행 + 결과 행 읽기 시간을 재는 커서
+#
+# SELECT 는 execute() 에서 첫 행만 준비하고 나머지 일은 fetch 하면서 하므로, 결과가 있는 문장은
+# execute 와 fetchone/fetchmany/fetchall/순회에 걸린 시간을 더해 두었다가 결과를 다 읽었을 때
+# (또는 다시 execute/close 하거나 커서가 버려질 때) 한 번 기록한다. fetch 사이의 Python 코드 시간은 빼고 잰다.
+class InstrumentedCursor(sqlite3.Cursor):
+    _pending = None
+
+    def _run(self, method, sql, parameters, many):
+        self._finish()
+        started = time.perf_counter()
+        _executing.sql = sql
+        try:
+            result = method(self, sql, parameters)
+        except BaseException:
+            _record_sql(self.connection, sql, None if many else parameters, time.perf_counter() - started,
+                        True, many=many)
+            raise
+        finally:
+            _executing.sql = None
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            # 결과 행이 없는 문장 (INSERT/UPDATE 등) 은 execute 에서 끝남
+            _record_sql(self.connection, sql, None if many else parameters, elapsed, False, many=many)
+        else:
+            self._pending = [sql, parameters, elapsed]
+        return result
+
+    def execute(self, sql, parameters=()):
+        return self._run(sqlite3.Cursor.execute, sql, parameters, False)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(sqlite3.Cursor.executemany, sql, seq_of_parameters, True)
+
+    def _fetch(self, method, *args):
+        pending = self._pending
+        if pending is None:
+            return method(self, *args)
+        started = time.perf_counter()
+        try:
+            return method(self, *args)
+        except sqlite3.Error:
+            pending[2] += time.perf_counter() - started
+            self._finish(failed=True)
+            raise
+        finally:
+            if self._pending is pending:
+                pending[2] += time.perf_counter() - started
+
+    def _finish(self, failed=False):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            _record_sql(self.connection, pending[0], pending[1], pending[2], failed)
+
+    def fetchone(self):
+        row = self._fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._fetch(sqlite3.Cursor.fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(sqlite3.Cursor.fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._fetch(sqlite3.Cursor.__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    # 결과를 끝까지 읽지 않고 버린 커서 (conn.execute(...).fetchone() 등)
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+# conn.execute 도 계측 커서를 거치도록 하는 연결 (db_pool 의 connection factory)
+class InstrumentedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 암묵적 BEGIN/COMMIT 등 엔진이 실제로 실행한 문장 수는 trace callback 으로 집계
+        if METRICS_ENABLED:
+            self.set_trace_callback(_trace_statement)
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ---------------------------------------------------------------------------
+# HTTP 요청 지표 ASGI 미들웨어
+# ---------------------------------------------------------------------------
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 라벨은 경로 템플릿(/leave-history)으로 - 실제 경로를 쓰면 라벨 수가 무한히 늘어남
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            elapsed = time.perf_counter() - started
+            http_requests_total.inc((method, route_path, str(status_code)))
+            http_request_duration_seconds.observe((method, route_path), elapsed)
+            if status_code >= 500:
+                http_request_errors_total.inc((method, route_path))
+
+
+# ---------------------------------------------------------------------------
+# Prometheus 텍스트 형식 출력
+# ---------------------------------------------------------------------------
+
+def format_gauge(name, help_text, value, labels=None):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    if isinstance(value, dict):
+        label_name = labels or "key"
+        for key, item in sorted(value.items()):
+            lines.append(f'{name}{{{label_name}="{_escape_label(key)}"}} {_format_value(item)}')
+    else:
+        lines.append(f"{name} {_format_value(value)}")
+    return lines
+
+
+def render_metrics(extra_lines=()):
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,569 @@
+import sqlite3
+
+from db_pool import DB_PATH
+
+
+# 스키마 마이그레이션 엔진
+#
+# 적용된 버전은 PRAGMA user_version 에 기록한다. 프로세스 시작 시 한 번 migrate() 를 호출하면
+# 아직 적용되지 않은 단계만 순서대로 실행하고, 이미 최신이면 user_version 한 번만 읽고 끝난다.
+# 새 인덱스/테이블은 MIGRATIONS 끝에 (다음 버전, 설명, SQL 또는 함수) 로 추가한다.
+# 적용된 단계는 수정하지 말 것 - 이미 배포된 DB 에는 다시 실행되지 않는다.
+
+
+def _table_columns(conn, table):
+    return [column[1] for column in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+# 1: 기본 테이블 생성 + 예전 스키마(request_date 만 있던 leave_requests) 보정
+def _create_base_tables(conn):
+    # 직원 테이블 생성 (기존 데이터 유지)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS employees (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        total_leave INTEGER DEFAULT 14,
+        used_leave REAL DEFAULT 0
+    )
+    """)
+
+    # 휴가 신청 테이블 생성 (기존 데이터 유지)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS leave_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        days REAL NOT NULL,
+        leave_type TEXT NOT NULL,
+        status TEXT DEFAULT 'PENDING'
+    )
+    """)
+
+    # 필요한 컬럼이 없는 경우에만 추가
+    columns = _table_columns(conn, "leave_requests")
+    for column, column_type in (("start_date", "DATE"), ("end_date", "DATE"), ("leave_type", "TEXT")):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE leave_requests ADD COLUMN {column} {column_type}")
+
+    # 예전 데이터는 신청일 하루짜리 전일 휴가로 채움
+    if "request_date" in columns:
+        conn.execute("""
+        UPDATE leave_requests
+        SET start_date = request_date,
+            end_date = request_date,
+            leave_type = 'FULL_DAY'
+        WHERE start_date IS NULL
+        """)
+
+
+# 휴가 기간 R*Tree 인덱스 (팀 캘린더 - "X 일에 누가 쉬나" 겹침 조회)
+# 좌표는 1970-01-01 기준 일 번호 정수 (rtree_i32 - 날짜 경계가 정확히 맞음)
+# leave_requests 에 넣고/바꾸고/지울 때 트리거로 함께 갱신한다.
+INTERVAL_DAY_SQL = "CAST(julianday({column}) - 2440587.5 AS INTEGER)"
+
+INTERVAL_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_interval_insert
+    AFTER INSERT ON leave_requests
+    WHEN NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL
+    BEGIN
+        INSERT INTO leave_request_intervals (id, start_day, end_day)
+        VALUES (NEW.id,
+                MIN({INTERVAL_DAY_SQL.format(column="NEW.start_date")}, {INTERVAL_DAY_SQL.format(column="NEW.end_date")}),
+                MAX({INTERVAL_DAY_SQL.format(column="NEW.start_date")}, {INTERVAL_DAY_SQL.format(column="NEW.end_date")}));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_interval_update
+    AFTER UPDATE OF start_date, end_date ON leave_requests
+    BEGIN
+        DELETE FROM leave_request_intervals WHERE id = OLD.id;
+        INSERT INTO leave_request_intervals (id, start_day, end_day)
+        SELECT NEW.id,
+               MIN({INTERVAL_DAY_SQL.format(column="NEW.start_date")}, {INTERVAL_DAY_SQL.format(column="NEW.end_date")}),
+               MAX({INTERVAL_DAY_SQL.format(column="NEW.start_date")}, {INTERVAL_DAY_SQL.format(column="NEW.end_date")})
+        WHERE NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS leave_requests_interval_delete
+    AFTER DELETE ON leave_requests
+    BEGIN
+        DELETE FROM leave_request_intervals WHERE id = OLD.id;
+    END
+    """,
+]
+
+# 기존 신청 전체로 인덱스 채우기 (마이그레이션, 대량 적재 후)
+FILL_INTERVALS_SQL = f"""
+    INSERT INTO leave_request_intervals (id, start_day, end_day)
+    SELECT id,
+           MIN({INTERVAL_DAY_SQL.format(column="start_date")}, {INTERVAL_DAY_SQL.format(column="end_date")}),
+           MAX({INTERVAL_DAY_SQL.format(column="start_date")}, {INTERVAL_DAY_SQL.format(column="end_date")})
+    FROM leave_requests
+    WHERE start_date IS NOT NULL AND end_date IS NOT NULL
+"""
+
+
+# 4: 휴가 기간 R*Tree 인덱스 + 동기화 트리거
+def _create_interval_index(conn):
+    conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS leave_request_intervals
+    USING rtree_i32(id, start_day, end_day)
+    """)
+    for sql in INTERVAL_TRIGGERS:
+        conn.execute(sql)
+    conn.execute("DELETE FROM leave_request_intervals")
+    conn.execute(FILL_INTERVALS_SQL)
+
+
+# 직원 x 월 x 유형 x 상태별 사용 일수 요약 (HR 월별/연도별 보고서)
+# 휴가는 시작일이 속한 달로 집계한다. leave_requests 를 넣고/바꾸고/지울 때 같은 트랜잭션에서 트리거로 갱신.
+_USAGE_ADD_SQL = """
+        INSERT INTO leave_usage_monthly (month, username, leave_type, status, days, requests)
+        SELECT substr({row}.start_date, 1, 7), {row}.username, {row}.leave_type,
+               COALESCE({row}.status, 'PENDING'), {row}.days, 1
+        WHERE {row}.start_date IS NOT NULL
+        ON CONFLICT (month, username, leave_type, status)
+        DO UPDATE SET days = days + excluded.days, requests = requests + 1;
+"""
+
+_USAGE_REMOVE_SQL = """
+        UPDATE leave_usage_monthly
+        SET days = days - OLD.days, requests = requests - 1
+        WHERE month = substr(OLD.start_date, 1, 7) AND username = OLD.username
+          AND leave_type = OLD.leave_type AND status = COALESCE(OLD.status, 'PENDING');
+        DELETE FROM leave_usage_monthly
+        WHERE month = substr(OLD.start_date, 1, 7) AND username = OLD.username
+          AND leave_type = OLD.leave_type AND status = COALESCE(OLD.status, 'PENDING') AND requests <= 0;
+"""
+
+USAGE_ROLLUP_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_usage_insert
+    AFTER INSERT ON leave_requests
+    BEGIN
+        {_USAGE_ADD_SQL.format(row="NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_usage_update
+    AFTER UPDATE OF username, start_date, days, leave_type, status ON leave_requests
+    BEGIN
+        {_USAGE_REMOVE_SQL}
+        {_USAGE_ADD_SQL.format(row="NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_usage_delete
+    AFTER DELETE ON leave_requests
+    BEGIN
+        {_USAGE_REMOVE_SQL}
+    END
+    """,
+]
+
+# 원본 leave_requests 에서 직접 집계한 요약 (검증용)
+USAGE_ROLLUP_SELECT_SQL = """
+    SELECT substr(start_date, 1, 7), username, leave_type, COALESCE(status, 'PENDING'), SUM(days), COUNT(*)
+    FROM leave_requests
+    WHERE start_date IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+"""
+
+# 기존 신청 전체로 요약 채우기 (마이그레이션, 대량 적재 후, usage_rollup.py 재계산)
+FILL_USAGE_ROLLUP_SQL = """
+    INSERT INTO leave_usage_monthly (month, username, leave_type, status, days, requests)
+""" + USAGE_ROLLUP_SELECT_SQL
+
+
+# 5: 월별 사용 일수 요약 테이블 + 동기화 트리거
+def _create_usage_rollup(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS leave_usage_monthly (
+        month TEXT NOT NULL,
+        username TEXT NOT NULL,
+        leave_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        days REAL NOT NULL,
+        requests INTEGER NOT NULL,
+        PRIMARY KEY (month, username, leave_type, status)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_leave_usage_monthly_username
+    ON leave_usage_monthly (username, month)
+    """)
+    for sql in USAGE_ROLLUP_TRIGGERS:
+        conn.execute(sql)
+    conn.execute("DELETE FROM leave_usage_monthly")
+    conn.execute(FILL_USAGE_ROLLUP_SQL)
+
+
+# 연차 원장 (지급/차감/복원 내역, 추가만 가능)
+#
+# 항목마다 총 연차(granted)와 사용 연차(used)에 더할 양을 기록하고, 연차 연도(year)별로 합하면
+# employees.total_leave / used_leave 와 같다. 잔액 = 최근 스냅샷 + 그 뒤 항목 합계.
+#   OPENING   : 원장 도입/직원 생성 시점의 잔액
+#   GRANT     : 연도 전환 시 새 연차 지급      CARRYOVER : 전년도 잔여 연차 이월
+#   ADJUST    : 총 연차 변경 또는 신청 일수 재계산
+#   DEBIT     : 휴가 신청 (반려 외 상태)       REVERSAL  : 반려/삭제로 되돌림
+# 항목은 직원의 현재 연차 연도(employees.leave_year)에 기록된다.
+# 단, 신청 일수만 바뀐 ADJUST 는 그 신청의 DEBIT 가 기록된 연도에 기록한다 (지난 연도 신청을 고쳐도 올해 잔액은 그대로).
+# 연차 연도 전환(ledger.py rollover)이 시작되면 새로 가입한 직원은 새 연도로 시작한다.
+CURRENT_LEAVE_YEAR_SQL = "COALESCE((SELECT MAX(year) FROM leave_rollovers), CAST(strftime('%Y', 'now') AS INTEGER))"
+
+_LEDGER_YEAR_SQL = ("COALESCE((SELECT leave_year FROM employees WHERE username = {row}.username), "
+                    + CURRENT_LEAVE_YEAR_SQL + ")")
+
+# 사용 연차에 반영되는 신청 (반려 제외)
+_LEDGER_ACTIVE_SQL = "COALESCE({row}.status, 'PENDING') != 'REJECTED'"
+
+_LEDGER_USED_SQL = f"(CASE WHEN {_LEDGER_ACTIVE_SQL} THEN {{row}}.days ELSE 0 END)"
+
+# 신청이 처음 원장에 기록된 연도 (없으면 직원의 현재 연차 연도)
+_REQUEST_LEDGER_YEAR_SQL = ("COALESCE((SELECT year FROM leave_ledger WHERE leave_request_id = {row}.id "
+                            "ORDER BY id LIMIT 1), " + _LEDGER_YEAR_SQL + ")")
+
+# 상태가 바뀌면(DEBIT/REVERSAL) 현재 연도, 일수만 바뀌면(ADJUST) 신청이 기록된 연도
+LEDGER_REQUEST_UPDATE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_ledger_update
+    AFTER UPDATE OF days, status ON leave_requests
+    BEGIN
+        INSERT INTO leave_ledger (username, year, entry_type, used, leave_request_id)
+        SELECT NEW.username,
+               CASE WHEN ({_LEDGER_ACTIVE_SQL.format(row="OLD")}) = ({_LEDGER_ACTIVE_SQL.format(row="NEW")})
+                    THEN {_REQUEST_LEDGER_YEAR_SQL.format(row="NEW")}
+                    ELSE {_LEDGER_YEAR_SQL.format(row="NEW")} END,
+               CASE WHEN {_LEDGER_ACTIVE_SQL.format(row="OLD")} AND NOT {_LEDGER_ACTIVE_SQL.format(row="NEW")} THEN 'REVERSAL'
+                    WHEN NOT {_LEDGER_ACTIVE_SQL.format(row="OLD")} AND {_LEDGER_ACTIVE_SQL.format(row="NEW")} THEN 'DEBIT'
+                    ELSE 'ADJUST' END,
+               {_LEDGER_USED_SQL.format(row="NEW")} - {_LEDGER_USED_SQL.format(row="OLD")},
+               NEW.id
+        WHERE {_LEDGER_USED_SQL.format(row="NEW")} != {_LEDGER_USED_SQL.format(row="OLD")};
+    END
+    """
+
+LEDGER_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS employees_ledger_insert
+    AFTER INSERT ON employees
+    BEGIN
+        UPDATE employees SET leave_year = {CURRENT_LEAVE_YEAR_SQL}
+        WHERE id = NEW.id AND leave_year IS NULL;
+        INSERT INTO leave_ledger (username, year, entry_type, granted, used)
+        VALUES (NEW.username, COALESCE(NEW.leave_year, {CURRENT_LEAVE_YEAR_SQL}), 'OPENING',
+                COALESCE(NEW.total_leave, 0), COALESCE(NEW.used_leave, 0));
+    END
+    """,
+    # 연도 전환은 ledger.py 가 GRANT/CARRYOVER 를 직접 기록하므로 같은 연도 안의 변경만 ADJUST
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_ledger_adjust
+    AFTER UPDATE OF total_leave ON employees
+    WHEN NEW.total_leave IS NOT OLD.total_leave AND NEW.leave_year IS OLD.leave_year
+    BEGIN
+        INSERT INTO leave_ledger (username, year, entry_type, granted)
+        VALUES (NEW.username, NEW.leave_year, 'ADJUST', COALESCE(NEW.total_leave, 0) - COALESCE(OLD.total_leave, 0));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_ledger_insert
+    AFTER INSERT ON leave_requests
+    WHEN {_LEDGER_ACTIVE_SQL.format(row="NEW")}
+    BEGIN
+        INSERT INTO leave_ledger (username, year, entry_type, used, leave_request_id)
+        VALUES (NEW.username, {_LEDGER_YEAR_SQL.format(row="NEW")}, 'DEBIT', NEW.days, NEW.id);
+    END
+    """,
+    LEDGER_REQUEST_UPDATE_TRIGGER,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_ledger_delete
+    AFTER DELETE ON leave_requests
+    WHEN {_LEDGER_ACTIVE_SQL.format(row="OLD")}
+    BEGIN
+        INSERT INTO leave_ledger (username, year, entry_type, used, leave_request_id)
+        VALUES (OLD.username, {_LEDGER_YEAR_SQL.format(row="OLD")}, 'REVERSAL', -OLD.days, OLD.id);
+    END
+    """,
+]
+
+# 원장 항목은 고치거나 지울 수 없음 (정정은 새 항목으로)
+LEDGER_GUARD_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS leave_ledger_no_update
+    BEFORE UPDATE ON leave_ledger
+    BEGIN
+        SELECT RAISE(ABORT, '연차 원장 항목은 수정할 수 없습니다.');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS leave_ledger_no_delete
+    BEFORE DELETE ON leave_ledger
+    BEGIN
+        SELECT RAISE(ABORT, '연차 원장 항목은 삭제할 수 없습니다.');
+    END
+    """,
+]
+
+# 현재 직원/신청으로 원장 채우기 (마이그레이션, 대량 적재 후)
+# OPENING 의 used 는 신청 합계와 employees.used_leave 의 차이 (신청 없이 잡힌 사용 연차)
+FILL_LEDGER_SQLS = [
+    """
+    INSERT INTO leave_ledger (username, year, entry_type, granted, used)
+    SELECT e.username, e.leave_year, 'OPENING', COALESCE(e.total_leave, 0),
+           COALESCE(e.used_leave, 0) - COALESCE((SELECT SUM(r.days) FROM leave_requests r
+                                                 WHERE r.username = e.username
+                                                   AND COALESCE(r.status, 'PENDING') != 'REJECTED'), 0)
+    FROM employees e
+    ORDER BY e.id
+    """,
+    """
+    INSERT INTO leave_ledger (username, year, entry_type, used, leave_request_id)
+    SELECT r.username, e.leave_year, 'DEBIT', r.days, r.id
+    FROM leave_requests r JOIN employees e ON e.username = r.username
+    WHERE COALESCE(r.status, 'PENDING') != 'REJECTED'
+    ORDER BY r.id
+    """,
+]
+
+
+# 6: 연차 원장 + 잔액 스냅샷 + 연도 전환 진행 상태
+def _create_leave_ledger(conn):
+    if "leave_year" not in _table_columns(conn, "employees"):
+        conn.execute("ALTER TABLE employees ADD COLUMN leave_year INTEGER")
+
+    # 연차 연도 전환 작업 (year 로 넘어가는 작업 하나당 한 행, last_username 까지 처리됨)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS leave_rollovers (
+        year INTEGER PRIMARY KEY,
+        annual_grant REAL,
+        carryover_max REAL,
+        last_username TEXT,
+        processed INTEGER NOT NULL DEFAULT 0,
+        started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        completed_at TEXT
+    )
+    """)
+    # 원장 도입 시점의 연도를 완료된 전환으로 기록
+    conn.execute("""
+    INSERT OR IGNORE INTO leave_rollovers (year, completed_at)
+    VALUES (CAST(strftime('%Y', 'now') AS INTEGER), CURRENT_TIMESTAMP)
+    """)
+    conn.execute(f"UPDATE employees SET leave_year = {CURRENT_LEAVE_YEAR_SQL} WHERE leave_year IS NULL")
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS leave_ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        entry_type TEXT NOT NULL,
+        granted REAL NOT NULL DEFAULT 0,
+        used REAL NOT NULL DEFAULT 0,
+        leave_request_id INTEGER,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_leave_ledger_username_year
+    ON leave_ledger (username, year, id)
+    """)
+
+    # 직원 x 연도별 잔액 스냅샷 (ledger_id 까지의 항목 합계)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS leave_balance_snapshots (
+        username TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        ledger_id INTEGER NOT NULL,
+        granted REAL NOT NULL,
+        used REAL NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (username, year, ledger_id)
+    ) WITHOUT ROWID
+    """)
+
+    for sql in LEDGER_TRIGGERS + LEDGER_GUARD_TRIGGERS:
+        conn.execute(sql)
+    if conn.execute("SELECT 1 FROM leave_ledger LIMIT 1").fetchone() is None:
+        for sql in FILL_LEDGER_SQLS:
+            conn.execute(sql)
+
+
+# 9: 신청 일수 재계산(ADJUST)을 신청이 기록된 연도에 기록 (신청 id 로 원장 조회용 인덱스)
+def _book_request_adjustments_to_request_year(conn):
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_leave_ledger_request
+    ON leave_ledger (leave_request_id)
+    """)
+    conn.execute("DROP TRIGGER IF EXISTS leave_requests_ledger_update")
+    conn.execute(LEDGER_REQUEST_UPDATE_TRIGGER)
+
+
+# 변경 이벤트 (SSE/long-poll 변경 피드, change_feed.py)
+# 휴가 신청/잔액이 바뀔 때 같은 트랜잭션에서 트리거로 한 행씩 추가한다. id 가 곧 클라이언트가 이어 받을 이벤트 id.
+_LEAVE_REQUEST_PAYLOAD_SQL = """json_object('id', {row}.id, 'start_date', {row}.start_date, 'end_date', {row}.end_date,
+                                'days', {row}.days, 'leave_type', {row}.leave_type, 'status', {row}.status)"""
+
+CHANGE_EVENT_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_change_insert
+    AFTER INSERT ON leave_requests
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('leave_request.created', NEW.username, {_LEAVE_REQUEST_PAYLOAD_SQL.format(row="NEW")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leave_requests_change_update
+    AFTER UPDATE OF start_date, end_date, days, leave_type, status ON leave_requests
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('leave_request.updated', NEW.username, {_LEAVE_REQUEST_PAYLOAD_SQL.format(row="NEW")});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS leave_requests_change_delete
+    AFTER DELETE ON leave_requests
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('leave_request.deleted', OLD.username, json_object('id', OLD.id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_change_balance
+    AFTER UPDATE OF total_leave, used_leave ON employees
+    WHEN NEW.total_leave IS NOT OLD.total_leave OR NEW.used_leave IS NOT OLD.used_leave
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('balance.updated', NEW.username,
+                json_object('total_leave', NEW.total_leave, 'used_leave', NEW.used_leave,
+                            'remaining_leave', NEW.total_leave - NEW.used_leave));
+    END
+    """,
+]
+
+
+# 7: 변경 이벤트 테이블 + 트리거
+def _create_change_events(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS change_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_type TEXT NOT NULL,
+        username TEXT,
+        payload TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_change_events_username_id
+    ON change_events (username, id)
+    """)
+    for sql in CHANGE_EVENT_TRIGGERS:
+        conn.execute(sql)
+
+
+# 워커 간 캐시 무효화용 변경 이벤트 (비밀번호 변경/직원 삭제/토큰 폐기)
+# 비밀번호 해시는 이벤트에 넣지 않는다 - 받는 쪽은 캐시를 지우고 DB 에서 다시 읽음.
+CACHE_EVENT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_change_password
+    AFTER UPDATE OF password ON employees
+    WHEN NEW.password IS NOT OLD.password
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('employee.updated', NEW.username, json_object());
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS employees_change_delete
+    AFTER DELETE ON employees
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('employee.deleted', OLD.username, json_object());
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS revoked_tokens_change_insert
+    AFTER INSERT ON revoked_tokens
+    BEGIN
+        INSERT INTO change_events (event_type, username, payload)
+        VALUES ('token.revoked', NULL, json_object('token_id', NEW.token_id, 'expires_at', NEW.expires_at));
+    END
+    """,
+]
+
+
+# 8: 캐시 무효화용 변경 이벤트 트리거
+def _create_cache_event_triggers(conn):
+    for sql in CACHE_EVENT_TRIGGERS:
+        conn.execute(sql)
+
+
+MIGRATIONS = [
+    (1, "기본 테이블 생성 및 예전 스키마 보정", _create_base_tables),
+    # 사용자별 휴가 내역을 최신 순으로 페이지 단위 조회 (/leave-history keyset 페이지네이션)
+    (2, "휴가 내역 (username, id DESC) 인덱스", """
+    CREATE INDEX IF NOT EXISTS idx_leave_requests_username_id
+    ON leave_requests (username, id DESC)
+    """),
+    # 로그아웃 등으로 폐기된 액세스 토큰 (만료 시각이 지나면 정리)
+    (3, "폐기된 토큰 테이블", """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        token_id TEXT PRIMARY KEY,
+        expires_at INTEGER NOT NULL
+    )
+    """),
+    (4, "휴가 기간 R*Tree 인덱스", _create_interval_index),
+    (5, "월별 사용 일수 요약 테이블", _create_usage_rollup),
+    (6, "연차 원장 및 잔액 스냅샷", _create_leave_ledger),
+    (7, "변경 이벤트 테이블", _create_change_events),
+    (8, "캐시 무효화용 변경 이벤트 트리거", _create_cache_event_triggers),
+    (9, "신청 일수 재계산을 신청 연도 원장에 기록", _book_request_adjustments_to_request_year),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# 적용되지 않은 마이그레이션을 한 트랜잭션으로 실행하고 적용한 단계 수를 반환
+def apply_migrations(conn):
+    if current_version(conn) >= LATEST_VERSION:
+        return 0
+
+    # 여러 프로세스가 동시에 시작해도 한 곳에서만 적용되도록 쓰기 잠금을 잡고 버전을 다시 확인
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = current_version(conn)
+        applied = 0
+        for step_version, _, step in MIGRATIONS:
+            if step_version <= version:
+                continue
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {step_version}")
+            applied += 1
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def migrate(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    try:
+        return apply_migrations(conn)
+    finally:
+        conn.close()
+
+
+# 직접 실행할 경우
+if __name__ == "__main__":
+    applied = migrate()
+    print(f"마이그레이션 {applied}단계를 적용했습니다. (현재 버전: {LATEST_VERSION})")
@@ -0,0 +1,159 @@
+import argparse
+import sqlite3
+
+import numpy as np
+
+from db_pool import DB_PATH
+from holiday_calendar import get_calendar, load_holidays, HOLIDAYS_PATH, HolidayCalendar
+from migrations import migrate
+from repository import run_immediate
+
+
+# 반차 유형 (근무일 하루 0.5일)
+HALF_DAY_TYPES = ('MORNING_HALF', 'AFTERNOON_HALF')
+
+# 한 번에 읽어서 다시 계산할 행 수
+DEFAULT_CHUNK_SIZE = 50000
+
+
+# 휴가 신청 테이블을 id 순서로 chunk 단위로 읽기 (keyset 방식이라 갱신과 섞여도 안전)
+def iter_leave_chunks(conn, chunk_size):
+    last_id = 0
+    while True:
+        rows = conn.execute("""
+            SELECT id, start_date, end_date, days, leave_type
+            FROM leave_requests
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+# chunk 하나의 일수를 numpy.busday_count 로 한꺼번에 계산
+def recompute_chunk(rows, holidays):
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    starts = np.array([str(row[1]) for row in rows], dtype='datetime64[D]')
+    ends = np.array([str(row[2]) for row in rows], dtype='datetime64[D]')
+    old_days = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+    is_half = np.array([row[4] in HALF_DAY_TYPES for row in rows], dtype=bool)
+
+    # 종료일 포함 계산이므로 end + 1일, 종료일이 시작일보다 빠르면 0일
+    full_days = np.busday_count(starts, ends + np.timedelta64(1, 'D'), holidays=holidays)
+    full_days = np.maximum(full_days, 0)
+    # 반차는 시작일이 근무일이면 0.5일, 주말·공휴일이면 0일 (calculate_working_days 와 동일)
+    half_days = np.where(np.is_busday(starts, holidays=holidays), 0.5, 0.0)
+    new_days = np.where(is_half, half_days, full_days).astype(np.float64)
+
+    changed = ~np.isclose(old_days, new_days)
+    return ids[changed], old_days[changed], new_days[changed]
+
+
+# 직원별 사용 연차를 연차 원장에서 다시 집계 (현재 연차 연도 항목 합계)
+# 일수를 고친 신청은 트리거가 그 신청이 기록된 연도의 원장에 ADJUST 항목으로 남기므로
+# 현재 연도 원장 합계가 곧 올바른 사용 연차다 (지난 연도 신청을 고쳐도 올해 사용 연차는 그대로).
+USED_LEAVE_SQL = """
+    SELECT e.username, e.used_leave,
+           COALESCE((SELECT SUM(l.used) FROM leave_ledger l
+                     WHERE l.username = e.username AND l.year = e.leave_year), 0)
+    FROM employees e
+"""
+
+REBUILD_USED_LEAVE_SQL = """
+    UPDATE employees
+    SET used_leave = COALESCE((SELECT SUM(l.used) FROM leave_ledger l
+                               WHERE l.username = employees.username AND l.year = employees.leave_year), 0)
+"""
+
+
+# 일수를 고친 chunk 하나를 짧은 BEGIN IMMEDIATE 트랜잭션으로 저장 (트랜잭션 사이에는 온라인 쓰기가 진행됨)
+def _apply_updates(conn, updates):
+    conn.executemany("UPDATE leave_requests SET days = ? WHERE id = ?", updates)
+
+
+def recompute_leave_days(db_path=DB_PATH, calendar=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         dry_run=False, rebuild_used_leave=True, verbose=True):
+    calendar = calendar or get_calendar()
+    holidays = np.array(sorted(calendar.holidays), dtype='datetime64[D]')
+
+    migrate(db_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        scanned = 0
+        corrections = []
+
+        for rows in iter_leave_chunks(conn, chunk_size):
+            scanned += len(rows)
+            ids, old_days, new_days = recompute_chunk(rows, holidays)
+            if len(ids) == 0:
+                continue
+
+            updates = list(zip(new_days.tolist(), ids.tolist()))
+            if dry_run:
+                if verbose:
+                    for request_id, old, new in zip(ids.tolist(), old_days.tolist(), new_days.tolist()):
+                        print(f"  leave_requests.id={request_id}: {old} -> {new}")
+                # dry-run 은 한 트랜잭션 안에서 반영한 뒤 마지막에 롤백 (사용 연차 diff 가 정확하도록)
+                # 그동안 쓰기 잠금을 잡고 있으므로 온라인 쓰기는 작업이 끝날 때까지 기다림
+                _apply_updates(conn, updates)
+            else:
+                run_immediate(conn, _apply_updates, updates)
+            corrections.extend(updates)
+
+        balance_changes = []
+        if rebuild_used_leave:
+            if not dry_run:
+                conn.execute("BEGIN IMMEDIATE")
+            balance_changes = [
+                (username, old, new)
+                for username, old, new in conn.execute(USED_LEAVE_SQL)
+                if abs((old or 0) - new) > 1e-9
+            ]
+            if verbose and dry_run:
+                for username, old, new in balance_changes:
+                    print(f"  employees.used_leave[{username}]: {old} -> {new}")
+            conn.execute(REBUILD_USED_LEAVE_SQL)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+
+        if verbose:
+            mode = "(dry-run) " if dry_run else ""
+            print(f"{mode}휴가 신청 {scanned}건 중 {len(corrections)}건의 일수가 "
+                  f"{'변경될 예정입니다' if dry_run else '수정되었습니다'}.")
+            if rebuild_used_leave:
+                print(f"{mode}직원 {len(balance_changes)}명의 사용 연차가 "
+                      f"{'변경될 예정입니다' if dry_run else '다시 집계되었습니다'}.")
+
+        return {"scanned": scanned, "corrections": corrections, "balance_changes": balance_changes}
+
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# 직접 실행할 경우
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="공휴일 달력 변경 후 휴가 일수와 사용 연차를 일괄 재계산합니다.")
+    parser.add_argument("--db", default=DB_PATH, help="데이터베이스 파일 경로")
+    parser.add_argument("--holidays", default=HOLIDAYS_PATH, help="공휴일 CSV 파일 경로")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="한 번에 처리할 행 수")
+    parser.add_argument("--dry-run", action="store_true", help="변경 내역만 출력하고 저장하지 않음")
+    parser.add_argument("--skip-used-leave", action="store_true", help="직원 사용 연차 재집계를 건너뜀")
+    args = parser.parse_args()
+
+    recompute_leave_days(
+        db_path=args.db,
+        calendar=HolidayCalendar(load_holidays(args.holidays)),
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        rebuild_used_leave=not args.skip_used_leave,
+    )
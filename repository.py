@@ -0,0 +1,537 @@
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from balance_cache import balance_cache
+from db_pool import get_pool, POOL_SIZE
+
+
+# DB 전용 스레드 수 (기본값은 연결 풀 크기와 동일 - 스레드가 연결을 기다리지 않도록)
+DB_EXECUTOR_WORKERS = int(os.environ.get("LEAVE_DB_EXECUTOR_WORKERS", str(POOL_SIZE)))
+
+# 쓰기 트랜잭션이 SQLITE_BUSY 로 실패했을 때 재시도 횟수 / 첫 대기 시간(초, 지수적으로 증가)
+BUSY_RETRIES = int(os.environ.get("LEAVE_DB_BUSY_RETRIES", "5"))
+BUSY_BACKOFF = float(os.environ.get("LEAVE_DB_BUSY_BACKOFF", "0.02"))
+
+
+# 남은 연차보다 많은 휴가를 신청했을 때 발생
+class InsufficientLeaveError(Exception):
+    pass
+
+
+# 존재하지 않는 사용자일 때 발생
+class UserNotFoundError(Exception):
+    pass
+
+
+# 결재할 수 없는 휴가 신청 (없는 id 이거나 이미 승인/반려됨)
+class LeaveDecisionError(Exception):
+    pass
+
+
+# 휴가 기간 인덱스의 일 번호 기준 (1970-01-01 = 0)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# IN (...) 한 번에 넣을 최대 값 수 (SQLite 변수 개수 제한보다 충분히 작게)
+IN_CLAUSE_CHUNK = 500
+
+
+# ---------------------------------------------------------------------------
+# 동기 쿼리 함수 (연결을 인자로 받음 - DB 스레드 안에서 실행됨)
+# ---------------------------------------------------------------------------
+
+def insert_employee(conn, username, hashed_password):
+    conn.execute("""
+        INSERT INTO employees (username, password, total_leave, used_leave)
+        VALUES (?, ?, 14, 0)
+    """, (username, hashed_password))
+    conn.commit()
+
+
+# 비밀번호 해시 교체 (다른 요청이 먼저 바꿨으면 덮어쓰지 않음)
+def update_password(conn, username, old_hash, new_hash):
+    cursor = conn.execute("UPDATE employees SET password=? WHERE username=? AND password=?",
+                          (new_hash, username, old_hash))
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def fetch_employee(conn, username):
+    return conn.execute(
+        "SELECT password, total_leave, used_leave FROM employees WHERE username=?",
+        (username,),
+    ).fetchone()
+
+
+def fetch_balance(conn, username):
+    return conn.execute("""
+        SELECT total_leave, used_leave
+        FROM employees
+        WHERE username = ?
+    """, (username,)).fetchone()
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+# fn 을 BEGIN IMMEDIATE 트랜잭션 안에서 실행 (시작부터 쓰기 잠금을 잡아 읽기-후-쓰기 경합을 없앰)
+# busy_timeout 을 넘겨 SQLITE_BUSY 가 나면 롤백 후 지수 백오프로 재시도
+def run_immediate(conn, fn, *args):
+    for attempt in range(BUSY_RETRIES + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn, *args)
+            conn.commit()
+            return result
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if not _is_busy(e) or attempt == BUSY_RETRIES:
+                raise
+            time.sleep(BUSY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+
+# 남은 연차 확인과 차감을 조건부 UPDATE 한 번으로 처리 (동시 신청이 있어도 초과 사용 불가)
+def reserve_leave(conn, username, start_date, end_date, days, leave_type):
+    cursor = conn.execute("""
+        UPDATE employees
+        SET used_leave = used_leave + ?
+        WHERE username = ? AND total_leave - used_leave >= ?
+    """, (days, username, days))
+
+    if cursor.rowcount == 0:
+        user = fetch_balance(conn, username)
+        if user is None:
+            raise UserNotFoundError(username)
+        raise InsufficientLeaveError(user['total_leave'] - user['used_leave'])
+
+    # 휴가 요청 테이블에 저장
+    cursor = conn.execute("""
+        INSERT INTO leave_requests
+        (username, start_date, end_date, days, leave_type, status)
+        VALUES (?, ?, ?, ?, ?, 'PENDING')
+    """, (username, start_date, end_date, days, leave_type))
+    return cursor.lastrowid
+
+
+def insert_leave_request(conn, username, start_date, end_date, days, leave_type):
+    return run_immediate(conn, reserve_leave, username, start_date, end_date, days, leave_type)
+
+
+# 여러 휴가 신청을 한 트랜잭션(= fsync 한 번)으로 처리 (group commit 용)
+# 신청마다 SAVEPOINT 를 두어 한 건이 실패해도 나머지는 그대로 커밋되고,
+# 결과 목록에는 새 신청 id 또는 해당 건의 예외가 순서대로 담김
+def insert_leave_requests_batch(conn, requests):
+    def apply(conn):
+        results = []
+        for request in requests:
+            conn.execute("SAVEPOINT leave_item")
+            try:
+                results.append(reserve_leave(conn, *request))
+            except (InsufficientLeaveError, UserNotFoundError, sqlite3.IntegrityError) as e:
+                conn.execute("ROLLBACK TO leave_item")
+                results.append(e)
+            conn.execute("RELEASE leave_item")
+        return results
+
+    return run_immediate(conn, apply)
+
+
+def _chunks(values, size=IN_CLAUSE_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _fetch_balances(conn, usernames):
+    balances = {}
+    for chunk in _chunks(usernames):
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = conn.execute(f"""
+            SELECT username, total_leave, used_leave FROM employees WHERE username IN ({placeholders})
+        """, chunk).fetchall()
+        balances.update((row[0], row[1] - row[2]) for row in rows)
+    return balances
+
+
+# 일괄 휴가 신청 (HR 일괄 등록 등)
+# requests: [(username, start_date, end_date, days, leave_type), ...]
+# 쓰기 잠금을 잡은 상태에서 관련 직원 잔여 연차를 한 번에 읽고, 직원별로 순서대로 잔여 연차 안에서 받아들인 뒤
+# INSERT 는 executemany 한 번, 사용 연차는 직원당 UPDATE 한 번(executemany)으로 반영한다.
+# 결과 목록에는 새 신청 id 또는 해당 건의 예외가 순서대로 담김
+def insert_leave_requests_bulk(conn, requests):
+    def apply(conn):
+        remaining = _fetch_balances(conn, sorted({request[0] for request in requests}))
+        results, accepted, used_by_user = [], [], {}
+        for username, start_date, end_date, days, leave_type in requests:
+            if username not in remaining:
+                results.append(UserNotFoundError(username))
+            elif remaining[username] < days:
+                results.append(InsufficientLeaveError(remaining[username]))
+            else:
+                remaining[username] -= days
+                used_by_user[username] = used_by_user.get(username, 0) + days
+                results.append(len(accepted))
+                accepted.append((username, start_date, end_date, days, leave_type))
+
+        if accepted:
+            conn.executemany("""
+                INSERT INTO leave_requests
+                (username, start_date, end_date, days, leave_type, status)
+                VALUES (?, ?, ?, ?, ?, 'PENDING')
+            """, accepted)
+            # 쓰기 잠금을 잡고 있고 AUTOINCREMENT 라서 이번에 넣은 id 는 연속됨
+            first_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0] - len(accepted) + 1
+            results = [first_id + result if isinstance(result, int) else result for result in results]
+
+            conn.executemany("UPDATE employees SET used_leave = used_leave + ? WHERE username = ?",
+                             [(days, username) for username, days in used_by_user.items()])
+        return results
+
+    return run_immediate(conn, apply)
+
+
+# 일괄 승인/반려 - decisions: [(leave_request_id, 'APPROVED' | 'REJECTED'), ...]
+# 대기 중(PENDING)인 신청만 결재할 수 있고, 반려된 신청의 일수는 직원당 UPDATE 한 번으로 사용 연차에서 되돌림
+# 결과 목록에는 (username, 새 상태) 또는 해당 건의 예외가 순서대로 담김
+def apply_leave_decisions(conn, decisions):
+    def apply(conn):
+        ids = sorted({leave_id for leave_id, _ in decisions})
+        current = {}
+        for chunk in _chunks(ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(f"""
+                SELECT id, username, days, status FROM leave_requests WHERE id IN ({placeholders})
+            """, chunk).fetchall()
+            current.update((row[0], row) for row in rows)
+
+        results, updates, restored_by_user, decided = [], [], {}, set()
+        for leave_id, new_status in decisions:
+            row = current.get(leave_id)
+            if row is None:
+                results.append(LeaveDecisionError(f"휴가 신청 {leave_id} 을(를) 찾을 수 없습니다."))
+            elif row[3] != 'PENDING' or leave_id in decided:
+                results.append(LeaveDecisionError(f"휴가 신청 {leave_id} 은(는) 이미 처리되었습니다."))
+            else:
+                decided.add(leave_id)
+                updates.append((new_status, leave_id))
+                if new_status == 'REJECTED':
+                    restored_by_user[row[1]] = restored_by_user.get(row[1], 0) + row[2]
+                results.append((row[1], new_status))
+
+        if updates:
+            conn.executemany("UPDATE leave_requests SET status = ? WHERE id = ? AND status = 'PENDING'", updates)
+        if restored_by_user:
+            conn.executemany("UPDATE employees SET used_leave = used_leave - ? WHERE username = ?",
+                             [(days, username) for username, days in restored_by_user.items()])
+        return results
+
+    return run_immediate(conn, apply)
+
+
+def fetch_leave_history(conn, username, limit=None, after_id=None):
+    # 현재 사용자의 휴가 신청 내역 조회 (최신 순으로 정렬)
+    # after_id 가 주어지면 그보다 오래된 신청부터 limit 건 (idx_leave_requests_username_id 사용)
+    sql = """
+        SELECT id, username, start_date, end_date, days, leave_type, status
+        FROM leave_requests
+        WHERE username = ?
+    """
+    params = [username]
+    if after_id is not None:
+        sql += " AND id < ?"
+        params.append(after_id)
+    sql += " ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+# 날짜(date 또는 'YYYY-MM-DD')를 1970-01-01 기준 일 번호로 (leave_request_intervals 좌표)
+def epoch_day(value):
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+# 기간 [date_from, date_to] 와 겹치는 휴가 신청 (팀 캘린더)
+# R*Tree(leave_request_intervals) 로 겹치는 id 만 찾은 뒤 leave_requests 를 기본 키로 조인
+def fetch_calendar(conn, date_from, date_to, include_pending=True):
+    statuses = ('APPROVED', 'PENDING') if include_pending else ('APPROVED',)
+    placeholders = ", ".join("?" for _ in statuses)
+    return conn.execute(f"""
+        SELECT r.id, r.username, r.start_date, r.end_date, r.days, r.leave_type, r.status
+        FROM leave_request_intervals i
+        JOIN leave_requests r ON r.id = i.id
+        WHERE i.start_day <= ? AND i.end_day >= ? AND r.status IN ({placeholders})
+        ORDER BY r.start_date, r.username
+    """, (epoch_day(date_to), epoch_day(date_from), *statuses)).fetchall()
+
+
+# 월별 사용 일수 보고서 - leave_usage_monthly 요약 테이블만 읽음 (직원 수 x 개월 수에 비례)
+# month_from/month_to 는 'YYYY-MM', statuses 는 집계할 상태 목록
+def fetch_monthly_usage(conn, month_from, month_to, statuses, username=None):
+    placeholders = ", ".join("?" for _ in statuses)
+    sql = f"""
+        SELECT username, month, leave_type, SUM(days) AS days, SUM(requests) AS requests
+        FROM leave_usage_monthly
+        WHERE month BETWEEN ? AND ? AND status IN ({placeholders})
+    """
+    params = [month_from, month_to, *statuses]
+    if username is not None:
+        sql += " AND username = ?"
+        params.append(username)
+    sql += " GROUP BY username, month, leave_type ORDER BY username, month, leave_type"
+    return conn.execute(sql, params).fetchall()
+
+
+# 연도별 사용 일수 보고서 (직원 x 유형)
+def fetch_yearly_usage(conn, year, statuses, username=None):
+    placeholders = ", ".join("?" for _ in statuses)
+    sql = f"""
+        SELECT username, substr(month, 1, 4) AS year, leave_type, SUM(days) AS days, SUM(requests) AS requests
+        FROM leave_usage_monthly
+        WHERE month BETWEEN ? AND ? AND status IN ({placeholders})
+    """
+    params = [f"{year:04d}-01", f"{year:04d}-12", *statuses]
+    if username is not None:
+        sql += " AND username = ?"
+        params.append(username)
+    sql += " GROUP BY username, leave_type ORDER BY username, leave_type"
+    return conn.execute(sql, params).fetchall()
+
+
+# 연차 원장 잔액 = 최근 스냅샷 + 스냅샷 이후 항목 합계 (year 를 생략하면 직원의 현재 연차 연도)
+def fetch_ledger_balance(conn, username, year=None):
+    if year is None:
+        row = conn.execute("SELECT leave_year FROM employees WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        year = row[0]
+
+    snapshot = conn.execute("""
+        SELECT ledger_id, granted, used FROM leave_balance_snapshots
+        WHERE username = ? AND year = ?
+        ORDER BY ledger_id DESC LIMIT 1
+    """, (username, year)).fetchone()
+    snapshot_id, granted, used = snapshot if snapshot is not None else (0, 0.0, 0.0)
+
+    last_id, delta_granted, delta_used, delta_entries = conn.execute("""
+        SELECT MAX(id), COALESCE(SUM(granted), 0), COALESCE(SUM(used), 0), COUNT(*)
+        FROM leave_ledger
+        WHERE username = ? AND year = ? AND id > ?
+    """, (username, year, snapshot_id)).fetchone()
+    granted += delta_granted
+    used += delta_used
+    return {
+        "username": username,
+        "year": year,
+        "granted": granted,
+        "used": used,
+        "remaining": granted - used,
+        "ledger_id": last_id or snapshot_id,
+        "snapshot_ledger_id": snapshot_id,
+        "delta_entries": delta_entries,
+    }
+
+
+def fetch_ledger_entries(conn, username, year):
+    return conn.execute("""
+        SELECT id, entry_type, granted, used, leave_request_id, created_at
+        FROM leave_ledger
+        WHERE username = ? AND year = ?
+        ORDER BY id
+    """, (username, year)).fetchall()
+
+
+# 변경 이벤트 (after_id, until_id] 범위를 id 순서로 (username 이 주어지면 그 직원 것만, exclude_types 유형은 제외)
+def fetch_change_events(conn, after_id, until_id, username=None, limit=500, exclude_types=()):
+    sql = """
+        SELECT id, event_type, username, payload, created_at
+        FROM change_events
+        WHERE id > ? AND id <= ?
+    """
+    params = [after_id, until_id]
+    if exclude_types:
+        sql += f" AND event_type NOT IN ({', '.join('?' for _ in exclude_types)})"
+        params.extend(exclude_types)
+    if username is not None:
+        sql += " AND username = ?"
+        params.append(username)
+    sql += " ORDER BY id LIMIT ?"
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+# 보관 중인 가장 오래된 변경 이벤트 id (그 앞은 정리됨)
+def fetch_oldest_change_event_id(conn):
+    return conn.execute("SELECT MIN(id) FROM change_events").fetchone()[0]
+
+
+# 가장 최근 변경 이벤트 id (이벤트가 없으면 0) - 정수 기본키 끝을 한 번 찾는 조회
+def fetch_last_change_event_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_events").fetchone()[0]
+
+
+# 전체 휴가 신청을 batch 단위로 읽기 (내보내기용 - 메모리에는 batch 하나만 유지)
+# date_from/date_to 는 휴가 기간이 겹치는 신청을 고름
+def iter_leave_requests(conn, date_from=None, date_to=None, status=None, batch_size=1000):
+    sql = """
+        SELECT id, username, start_date, end_date, days, leave_type, status
+        FROM leave_requests
+        WHERE 1 = 1
+    """
+    params = []
+    if date_from is not None:
+        sql += " AND end_date >= ?"
+        params.append(date_from)
+    if date_to is not None:
+        sql += " AND start_date <= ?"
+        params.append(date_to)
+    if status is not None:
+        sql += " AND status = ?"
+        params.append(status)
+    sql += " ORDER BY id"
+
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+# ---------------------------------------------------------------------------
+# DB 전용 스레드 풀
+# ---------------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS,
+                                               thread_name_prefix="leave-db")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _run_with_connection(fn, args):
+    with get_pool().connection() as conn:
+        return fn(conn, *args)
+
+
+# 동기 쿼리 함수를 DB 스레드에서 실행하고 결과를 기다림 (이벤트 루프는 막히지 않음)
+async def run_db(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _run_with_connection, fn, args)
+
+
+# ---------------------------------------------------------------------------
+# 비동기 저장소 - FastAPI 엔드포인트는 이 클래스만 await 함
+# ---------------------------------------------------------------------------
+
+class LeaveRepository:
+    def __init__(self, cache=balance_cache, write_queue=None):
+        self.cache = cache
+        # write-behind 모드에서는 휴가 신청을 write_queue.LeaveWriteQueue 로 넘김
+        self.write_queue = write_queue
+
+    async def _run(self, fn, *args):
+        return await run_db(fn, *args)
+
+    async def create_employee(self, username, hashed_password):
+        return await self._run(insert_employee, username, hashed_password)
+
+    # 직원 정보는 캐시를 먼저 확인하고, 없을 때만 DB 스레드에서 조회
+    async def get_employee(self, username):
+        employee = self.cache.get(username)
+        if employee is not None:
+            return employee
+
+        token = self.cache.begin_load()
+        row = await self._run(fetch_employee, username)
+        if row is None:
+            return None
+        employee = dict(row)
+        self.cache.put(username, employee, token)
+        return employee
+
+    async def update_password(self, username, old_hash, new_hash):
+        try:
+            return await self._run(update_password, username, old_hash, new_hash)
+        finally:
+            self.cache.invalidate(username)
+
+    async def get_balance(self, username):
+        return await self.get_employee(username)
+
+    async def create_leave_request(self, username, start_date, end_date, days, leave_type):
+        try:
+            if self.write_queue is not None and self.write_queue.running:
+                return await self.write_queue.submit(username, start_date, end_date, days, leave_type)
+            return await self._run(insert_leave_request, username, start_date, end_date, days, leave_type)
+        finally:
+            # 사용 연차가 바뀌었을 수 있으므로 캐시 무효화
+            self.cache.invalidate(username)
+
+    async def create_leave_requests_bulk(self, requests):
+        try:
+            return await self._run(insert_leave_requests_bulk, requests)
+        finally:
+            for username in {request[0] for request in requests}:
+                self.cache.invalidate(username)
+
+    async def decide_leave_requests(self, decisions):
+        results = await self._run(apply_leave_decisions, decisions)
+        for username in {result[0] for result in results if isinstance(result, tuple)}:
+            self.cache.invalidate(username)
+        return results
+
+    async def get_calendar(self, date_from, date_to, include_pending=True):
+        return await self._run(fetch_calendar, date_from, date_to, include_pending)
+
+    async def get_monthly_usage(self, month_from, month_to, statuses, username=None):
+        return await self._run(fetch_monthly_usage, month_from, month_to, statuses, username)
+
+    async def get_yearly_usage(self, year, statuses, username=None):
+        return await self._run(fetch_yearly_usage, year, statuses, username)
+
+    async def get_ledger_balance(self, username, year=None):
+        return await self._run(fetch_ledger_balance, username, year)
+
+    async def get_ledger_entries(self, username, year):
+        return await self._run(fetch_ledger_entries, username, year)
+
+    async def get_leave_history(self, username, limit=None, after_id=None):
+        return await self._run(fetch_leave_history, username, limit, after_id)
+
+
+_repository = LeaveRepository()
+
+
+# FastAPI 의존성
+def get_repository():
+    return _repository
@@ -1,92 +1,39 @@
 import sqlite3
 import random
-import hashlib
-
-# 비밀번호 해시 함수
-def hash_password(password, salt=None):
-    if salt is None:
-        salt = str(random.randint(1000, 9999))
-    
-    salted_password = f"{salt}{password}"
-    hashed = hashlib.sha256(salted_password.encode()).hexdigest()
-    
-    return f"{salt}${hashed}"
+import argparse
+import time
+
+from credentials import hash_password
+from db_pool import DB_PATH, DEFAULT_PRAGMAS
+from migrations import (CURRENT_LEAVE_YEAR_SQL, FILL_INTERVALS_SQL, FILL_LEDGER_SQLS, FILL_USAGE_ROLLUP_SQL,
+                        LEDGER_GUARD_TRIGGERS, migrate)
 
 # 데이터베이스 초기화 및 마이그레이션 함수
 def init_database():
     try:
-        conn = sqlite3.connect("leave_management.db")
-        cursor = conn.cursor()
-
-        # 직원 테이블 생성
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS employees (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            total_leave INTEGER DEFAULT 14,
-            used_leave REAL DEFAULT 0
-        )
-        """)
-
-        # 휴가 신청 테이블 생성
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS leave_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL,
-            start_date DATE NOT NULL,
-            end_date DATE NOT NULL,
-            days REAL NOT NULL,
-            leave_type TEXT NOT NULL,
-            status TEXT DEFAULT 'PENDING'
-        )
-        """)
-
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        st.error(f"데이터베이스 초기화 중 오류 발생: {e}")
-
-        # 기존 테이블에 새 컬럼 추가 (이미 존재하면 무시됨)
-        try:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN start_date DATE")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN end_date DATE")
-        except sqlite3.OperationalError:
-            pass
-
-        try:
-            cursor.execute("ALTER TABLE leave_requests ADD COLUMN leave_type TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-        # 기존 데이터가 있다면 default 값 업데이트
-        cursor.execute("""
-        UPDATE leave_requests 
-        SET start_date = request_date, 
-            end_date = request_date, 
-            leave_type = 'FULL_DAY'
-        WHERE start_date IS NULL
-        """)
-
-        conn.commit()
-        conn.close()
-        print("데이터베이스가 초기화되었습니다!")
+        applied = migrate()
+        print(f"데이터베이스가 초기화되었습니다! (마이그레이션 {applied}단계 적용)")
     except Exception as e:
         print(f"데이터베이스 초기화 중 오류 발생: {e}")
 
+# 연차 원장/스냅샷 비우기 (원장은 평소에 지울 수 없으므로 보호 트리거를 잠깐 내렸다가 다시 생성)
+def clear_ledger(cursor):
+    cursor.execute("DROP TRIGGER IF EXISTS leave_ledger_no_delete")
+    cursor.execute("DELETE FROM leave_ledger")
+    cursor.execute("DELETE FROM leave_balance_snapshots")
+    for sql in LEDGER_GUARD_TRIGGERS:
+        cursor.execute(sql)
+
 # 데이터베이스에 초기 사용자 추가 함수
 def reset_database():
     # 데이터베이스 연결
-    conn = sqlite3.connect("leave_management.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # 기존 동적으로 추가된 테이블 데이터는 삭제하고 초기 데이터만 유지
     cursor.execute("DELETE FROM leave_requests")
     cursor.execute("DELETE FROM employees")
+    clear_ledger(cursor)
 
     # 포켓몬 이름들
     pokemon_names = ["이상해", "피카츄", "파이리", "꼬부기", "버터플", "야도란", "피존투", "또가스", "식스테", "팬텀"]
@@ -109,7 +56,170 @@ def reset_database():
     conn.close()
     print("데이터베이스가 초기 상태로 리셋되었습니다!")
 
+# ---------------------------------------------------------------------------
+# 대용량 합성 데이터 시드 (용량 산정용)
+# ---------------------------------------------------------------------------
+
+# 한 트랜잭션에 넣을 휴가 신청 행 수
+SEED_BATCH_SIZE = 200000
+
+# 연차 유형 분포 (전일 / 오전 반차 / 오후 반차)
+SEED_LEAVE_TYPES = ['FULL_DAY', 'MORNING_HALF', 'AFTERNOON_HALF']
+SEED_LEAVE_TYPE_WEIGHTS = [0.7, 0.15, 0.15]
+
+# 월별 휴가 시작 비중 (여름휴가철과 연말에 몰림)
+SEED_MONTH_WEIGHTS = [0.07, 0.08, 0.06, 0.07, 0.09, 0.07, 0.13, 0.14, 0.08, 0.09, 0.05, 0.07]
+
+
+# 인덱스 i 를 한글 음절 3개로 바꾼 고유 이름 (같은 i 는 항상 같은 이름)
+def synthetic_username(index):
+    syllables = []
+    for _ in range(3):
+        index, offset = divmod(index, 11172)
+        syllables.append(chr(0xAC00 + offset))
+    return "".join(reversed(syllables))
+
+
+# chunk 하나 분량의 휴가 신청 행 생성 (numpy 로 한꺼번에)
+def generate_leave_rows(rng, usernames, count, start_year, years, holidays):
+    import numpy as np
+
+    # 시작일: 연도 균등, 월은 계절 비중, 일은 월 안에서 균등 -> 다음 영업일로 이동
+    year = start_year + rng.integers(0, years, count)
+    month = rng.choice(12, count, p=SEED_MONTH_WEIGHTS)
+    month_start = (year - 1970) * 12 + month
+    month_start = month_start.astype('datetime64[M]').astype('datetime64[D]')
+    month_days = ((month_start.astype('datetime64[M]') + 1).astype('datetime64[D]') - month_start).astype(int)
+    start = month_start + (rng.random(count) * month_days).astype(int)
+    start = np.busday_offset(start, 0, roll='forward', holidays=holidays)
+
+    leave_type = rng.choice(len(SEED_LEAVE_TYPES), count, p=SEED_LEAVE_TYPE_WEIGHTS)
+    is_half = leave_type > 0
+
+    # 전일 휴가 기간(영업일 수)은 대부분 1~3일, 가끔 길게 (기하 분포, 최대 10일)
+    business_days = np.minimum(rng.geometric(0.45, count), 10)
+    end = np.where(is_half, start, np.busday_offset(start, business_days - 1, holidays=holidays))
+    days = np.where(is_half, 0.5, business_days).astype(float)
+
+    # 상태: 대부분 승인, 일부 반려, 최근 신청은 대기
+    status = np.where(rng.random(count) < 0.08, 'REJECTED', 'APPROVED')
+    recent = start >= np.datetime64(f"{start_year + years - 1}-10-01")
+    status = np.where(recent & (rng.random(count) < 0.5), 'PENDING', status)
+
+    owner = rng.integers(0, len(usernames), count)
+    return zip(
+        (usernames[i] for i in owner.tolist()),
+        start.astype(str).tolist(),
+        end.astype(str).tolist(),
+        days.tolist(),
+        (SEED_LEAVE_TYPES[i] for i in leave_type.tolist()),
+        status.tolist(),
+    )
+
+
+# 직원 employees 명과 휴가 신청 requests 건을 생성 (seed 가 같으면 같은 데이터)
+def seed_synthetic(employees, requests, seed=42, start_year=2022, years=3, db_path=DB_PATH):
+    import numpy as np
+    from holiday_calendar import get_calendar
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    holidays = np.array(sorted(get_calendar().holidays), dtype='datetime64[D]')
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # 적재하는 동안만 내구성 설정을 낮춤 (실패하면 DB 를 다시 만들면 됨)
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA cache_size=-200000")
+
+    # 보조 인덱스와 휴가 기간 인덱스/월별 요약/연차 원장 동기화 트리거는 지웠다가 적재 후 한 번에 다시 생성
+    # (행마다 인덱스를 갱신하는 것보다 훨씬 빠름)
+    indexes = cursor.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND tbl_name IN ('employees', 'leave_requests', 'leave_ledger')
+          AND sql IS NOT NULL
+    """).fetchall()
+    for object_type, name, _ in indexes:
+        cursor.execute(f"DROP {object_type.upper()} {name}")
+
+    cursor.execute("DELETE FROM leave_requests")
+    cursor.execute("DELETE FROM employees")
+    cursor.execute("DELETE FROM leave_request_intervals")
+    cursor.execute("DELETE FROM leave_usage_monthly")
+    cursor.execute("DELETE FROM leave_ledger")
+    cursor.execute("DELETE FROM leave_balance_snapshots")
+
+    # 직원: 비밀번호 해시는 한 번만 계산해서 공유
+    hashed_password = hash_password("1234qwer")
+    usernames = [synthetic_username(i) for i in range(employees)]
+    total_leaves = rng.choice([14, 15, 16], employees).tolist()
+    cursor.executemany("""
+        INSERT INTO employees (username, password, total_leave, used_leave)
+        VALUES (?, ?, ?, 0)
+    """, zip(usernames, [hashed_password] * employees, total_leaves))
+    conn.commit()
+
+    # 휴가 신청: SEED_BATCH_SIZE 건씩 한 트랜잭션
+    inserted = 0
+    while inserted < requests:
+        count = min(SEED_BATCH_SIZE, requests - inserted)
+        cursor.executemany("""
+            INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, generate_leave_rows(rng, usernames, count, start_year, years, holidays))
+        conn.commit()
+        inserted += count
+
+    # 인덱스 재생성 후 사용 연차 집계 (총 연차는 사용 연차 이상이 되도록 보정) 및 원장 채우기
+    for object_type, _, sql in indexes:
+        if object_type == 'index':
+            cursor.execute(sql)
+    cursor.execute(FILL_INTERVALS_SQL)
+    cursor.execute(FILL_USAGE_ROLLUP_SQL)
+    cursor.execute("""
+        UPDATE employees
+        SET used_leave = COALESCE((SELECT SUM(r.days) FROM leave_requests r
+                                   WHERE r.username = employees.username AND r.status != 'REJECTED'), 0)
+    """)
+    cursor.execute("""
+        UPDATE employees
+        SET total_leave = MAX(total_leave, CAST(used_leave AS INTEGER) + (used_leave > CAST(used_leave AS INTEGER)))
+    """)
+    cursor.execute(f"UPDATE employees SET leave_year = {CURRENT_LEAVE_YEAR_SQL}")
+
+    # 트리거는 위의 일괄 UPDATE 가 끝난 뒤에 다시 만들어야 원장에 ADJUST 항목이 겹쳐 쌓이지 않음
+    # (원장의 OPENING/DEBIT 항목은 FILL_LEDGER_SQLS 가 한 번에 채움)
+    for object_type, _, sql in indexes:
+        if object_type == 'trigger':
+            cursor.execute(sql)
+    for sql in FILL_LEDGER_SQLS:
+        cursor.execute(sql)
+    conn.commit()
+    cursor.execute("ANALYZE")
+
+    # 평소 설정으로 복구
+    cursor.execute(f"PRAGMA journal_mode={DEFAULT_PRAGMAS['journal_mode']}")
+    cursor.execute(f"PRAGMA synchronous={DEFAULT_PRAGMAS['synchronous']}")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"직원 {employees}명, 휴가 신청 {requests}건을 {elapsed:.1f}초 만에 생성했습니다! (seed={seed})")
+
 # 직접 실행할 경우
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터베이스 초기화 및 시드 데이터 생성")
+    parser.add_argument("--synthetic", action="store_true", help="포켓몬 사용자 대신 대용량 합성 데이터 생성")
+    parser.add_argument("--employees", type=int, default=10000, help="합성 직원 수")
+    parser.add_argument("--requests", type=int, default=1000000, help="합성 휴가 신청 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같으면 같은 데이터)")
+    parser.add_argument("--start-year", type=int, default=2022, help="휴가 신청 시작 연도")
+    parser.add_argument("--years", type=int, default=3, help="휴가 신청이 분포할 연수")
+    args = parser.parse_args()
+
     init_database()  # 데이터베이스 초기화 및 마이그레이션
-    reset_database()  # 초기 데이터 삽입
+    if args.synthetic:
+        seed_synthetic(args.employees, args.requests, args.seed, args.start_year, args.years)
+    else:
+        reset_database()  # 초기 데이터 삽입
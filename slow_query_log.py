@@ -0,0 +1,176 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+
+# 느린 쿼리 로그 (기본 꺼짐)
+#
+# LEAVE_SLOW_QUERY_LOG=1 이면 db_pool 연결에서 실행 + 결과 행 읽기 시간이 임계값(ms)을 넘을 때마다
+# SQL, 파라미터 모양(값은 기록하지 않음), 소요 시간, EXPLAIN QUERY PLAN 결과를 JSON 한 줄로 남긴다.
+# leave_requests / employees 를 인덱스 없이 전체 스캔하는 계획은 full_scans 에 표시된다.
+#
+#   요약: python slow_query_log.py --top 10 --sort total
+SLOW_QUERY_LOG_ENABLED = os.environ.get("LEAVE_SLOW_QUERY_LOG", "0") == "1"
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("LEAVE_SLOW_QUERY_MS", "50"))
+SLOW_QUERY_LOG_PATH = os.environ.get("LEAVE_SLOW_QUERY_LOG_PATH", os.path.join("logs", "slow_queries.log"))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get("LEAVE_SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get("LEAVE_SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# 전체 스캔을 경고할 테이블
+WATCHED_TABLES = ("leave_requests", "employees")
+
+# EXPLAIN 을 돌릴 문장 (PRAGMA/BEGIN/COMMIT 등은 계획이 없음)
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\b", re.IGNORECASE)
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+# 같은 SQL 의 계획은 한 번만 뽑아 둠
+_PLAN_CACHE_SIZE = 1024
+_plans = {}
+_plans_lock = threading.Lock()
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_logger(path=SLOW_QUERY_LOG_PATH):
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                logger = logging.getLogger("leave.slow_query")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(path, maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                                              backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+# 파라미터 값 대신 타입만 기록 (비밀번호 해시 등이 로그에 남지 않도록)
+def parameter_shape(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _explain(conn, sql, parameters):
+    with _plans_lock:
+        cached = _plans.get(sql)
+    if cached is not None:
+        return cached
+
+    # 계측되지 않은 기본 커서로 실행 (자기 자신을 다시 기록하지 않도록)
+    cursor = sqlite3.Cursor(conn)
+    try:
+        rows = sqlite3.Cursor.execute(cursor, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    finally:
+        cursor.close()
+    plan = [row[3] for row in rows]
+    # "SCAN leave_requests" 는 전체 스캔, "SCAN leave_requests USING INDEX ..." 는 인덱스 순회
+    full_scans = sorted({
+        match.group(1) for match in map(_FULL_SCAN.match, plan)
+        if match and match.group(1) in WATCHED_TABLES and "USING" not in match.string
+    })
+    result = (plan, full_scans)
+    with _plans_lock:
+        if len(_plans) >= _PLAN_CACHE_SIZE:
+            _plans.clear()
+        _plans[sql] = result
+    return result
+
+
+def record_slow_query(conn, sql, parameters, elapsed, many=False, failed=False):
+    entry = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "duration_ms": round(elapsed * 1000, 3),
+        "sql": " ".join(sql.split()),
+        "params": "executemany" if many else parameter_shape(parameters),
+        "failed": failed,
+        "plan": [],
+        "full_scans": [],
+    }
+    if not many and not failed and _EXPLAINABLE.match(sql):
+        try:
+            entry["plan"], entry["full_scans"] = _explain(conn, sql, parameters)
+        except sqlite3.Error as e:
+            entry["plan_error"] = str(e)
+    get_logger().info(json.dumps(entry, ensure_ascii=False))
+
+
+# ---------------------------------------------------------------------------
+# 요약 CLI
+# ---------------------------------------------------------------------------
+
+def read_entries(path=SLOW_QUERY_LOG_PATH):
+    # 회전된 파일(.1, .2, ...)까지 모두 읽음
+    for log_path in sorted(glob.glob(glob.escape(path) + "*")):
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarize(entries):
+    summary = {}
+    for entry in entries:
+        item = summary.setdefault(entry["sql"], {
+            "sql": entry["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "plan": entry.get("plan", []), "full_scans": entry.get("full_scans", []),
+        })
+        item["count"] += 1
+        item["total_ms"] += entry["duration_ms"]
+        item["max_ms"] = max(item["max_ms"], entry["duration_ms"])
+    for item in summary.values():
+        item["avg_ms"] = item["total_ms"] / item["count"]
+    return list(summary.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="느린 쿼리 로그 요약")
+    parser.add_argument("--path", default=SLOW_QUERY_LOG_PATH, help="로그 파일 경로")
+    parser.add_argument("--top", type=int, default=10, help="출력할 쿼리 수")
+    parser.add_argument("--sort", choices=["total", "max", "avg", "count"], default="total")
+    parser.add_argument("--full-scans-only", action="store_true", help="전체 스캔 쿼리만 출력")
+    args = parser.parse_args(argv)
+
+    items = summarize(read_entries(args.path))
+    if args.full_scans_only:
+        items = [item for item in items if item["full_scans"]]
+    sort_key = {"total": "total_ms", "max": "max_ms", "avg": "avg_ms", "count": "count"}[args.sort]
+    items.sort(key=lambda item: item[sort_key], reverse=True)
+
+    if not items:
+        print("기록된 느린 쿼리가 없습니다.")
+        return 0
+    for rank, item in enumerate(items[:args.top], 1):
+        scan_note = f"  [전체 스캔: {', '.join(item['full_scans'])}]" if item["full_scans"] else ""
+        print(f"{rank}. {item['count']}회  합계 {item['total_ms']:.1f}ms  평균 {item['avg_ms']:.1f}ms  "
+              f"최대 {item['max_ms']:.1f}ms{scan_note}")
+        print(f"   {item['sql']}")
+        for detail in item["plan"]:
+            print(f"     - {detail}")
+    return 0
+
+
+# 직접 실행할 경우
+if __name__ == "__main__":
+    raise SystemExit(main())
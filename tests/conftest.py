@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 모듈이 import 시점에 환경 변수를 읽으므로 가장 먼저 임시 DB 와 테스트 설정을 지정
+WORK_DIR = tempfile.mkdtemp(prefix="leave-tests-")
+os.environ["LEAVE_DB_PATH"] = os.path.join(WORK_DIR, "leave_management.db")
+os.environ["LEAVE_TOKEN_SECRET"] = "test-secret"
+os.environ["LEAVE_ADMIN_USERS"] = "관리자"
+os.environ["LEAVE_PASSWORD_KDF"] = "pbkdf2_sha256"
+os.environ["LEAVE_PBKDF2_ITERATIONS"] = "1000"
+
+ADMIN = "관리자"
+
+
+@pytest.fixture(scope="session")
+def db_path():
+    return os.environ["LEAVE_DB_PATH"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import api
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+# 직원을 DB 에 직접 넣고 Bearer 헤더 반환 (signup/login 의 KDF 계산 생략)
+@pytest.fixture
+def employee(client, db_path):
+    from auth_tokens import issue_token
+
+    def create(username, total_leave=15):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT OR IGNORE INTO employees (username, password, total_leave, used_leave) "
+                     "VALUES (?, 'x', ?, 0)", (username, total_leave))
+        conn.commit()
+        conn.close()
+        return {"Authorization": f"Bearer {issue_token(username)[0]}"}
+    return create
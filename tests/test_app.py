@@ -0,0 +1,61 @@
+import os
+import sqlite3
+from datetime import date
+
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import ROOT
+
+
+def run_app(username, total_leave, used_leave):
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=30)
+    app.session_state['logged_in'] = True
+    app.session_state['username'] = username
+    app.session_state['total_leave'] = total_leave
+    app.session_state['used_leave'] = used_leave
+    app.run()
+    return app
+
+
+def submit_leave(app, start, end):
+    app.date_input(key="start_date").set_value(start)
+    app.date_input(key="end_date").set_value(end)
+    app.run()
+    next(button for button in app.button if button.label == "휴가 신청하기").click()
+    app.run()
+
+
+def balance(db_path, username):
+    conn = sqlite3.connect(db_path)
+    try:
+        used = conn.execute("SELECT used_leave FROM employees WHERE username = ?", (username,)).fetchone()[0]
+        count = conn.execute("SELECT COUNT(*) FROM leave_requests WHERE username = ?", (username,)).fetchone()[0]
+    finally:
+        conn.close()
+    return used, count
+
+
+# 세션에 남은 잔액이 오래됐어도 DB 의 잔액으로 확인해서 초과 사용하지 않음
+def test_db_mode_submission_checks_balance_in_database(client, employee, db_path):
+    employee("앱신청", total_leave=15)
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE employees SET used_leave = 14 WHERE username = '앱신청'")
+    conn.commit()
+    conn.close()
+
+    app = run_app("앱신청", total_leave=15, used_leave=0)
+    submit_leave(app, date(2026, 10, 19), date(2026, 10, 21))
+
+    assert [error.value for error in app.error] == ["남은 연차가 부족합니다."]
+    assert balance(db_path, "앱신청") == (14, 0)
+
+
+def test_db_mode_submission_reserves_and_refreshes_session(client, employee, db_path):
+    employee("앱신청성공", total_leave=15)
+
+    app = run_app("앱신청성공", total_leave=15, used_leave=0)
+    submit_leave(app, date(2026, 10, 19), date(2026, 10, 21))
+
+    assert not app.exception
+    assert balance(db_path, "앱신청성공") == (3, 1)
+    assert app.session_state['used_leave'] == 3
@@ -0,0 +1,74 @@
+import sqlite3
+import time
+
+import pytest
+
+import api
+from auth_tokens import InvalidTokenError, RevocationList, decode_token, issue_token, prune_revocations
+from change_feed import CHANGE_FEED_POLL_INTERVAL
+
+
+def test_multiple_workers_require_shared_secret(monkeypatch):
+    monkeypatch.setattr(api, "TOKEN_SECRET_CONFIGURED", False)
+    api.check_worker_settings(1)
+    with pytest.raises(RuntimeError):
+        api.check_worker_settings(2)
+
+    monkeypatch.setattr(api, "TOKEN_SECRET_CONFIGURED", True)
+    api.check_worker_settings(2)
+
+
+@pytest.mark.parametrize("token", ["abc.123.def.서명", "abc.١٢٣.def.sig", "가나다"])
+def test_non_ascii_token_is_invalid(token):
+    with pytest.raises(InvalidTokenError):
+        decode_token(token)
+
+
+def test_non_ascii_bearer_token_returns_401(client, employee):
+    employee("토큰김")
+    token = issue_token("토큰김")[0][:-2] + "서명"
+    # 헤더는 latin-1 로 해석되므로 UTF-8 바이트가 그대로 비ASCII 문자가 됨
+    response = client.get("/user-info", headers={"Authorization": f"Bearer {token}".encode("utf-8")})
+    assert response.status_code == 401
+
+
+def test_revocation_load_is_read_only(db_path, client):
+    conn = sqlite3.connect(db_path)
+    now = int(time.time())
+    conn.executemany("INSERT INTO revoked_tokens (token_id, expires_at) VALUES (?, ?)",
+                     [("expired-token", now - 10), ("live-token", now + 600)])
+    conn.commit()
+    conn.close()
+
+    revocations = RevocationList()
+    read_only = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        revocations.load(read_only)
+    finally:
+        read_only.close()
+    assert "live-token" in revocations
+    assert "expired-token" not in revocations
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert prune_revocations(conn) >= 1
+        assert conn.execute("SELECT COUNT(*) FROM revoked_tokens WHERE expires_at <= ?", (now,)).fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_revocation_from_other_process_applies_via_change_feed(client, employee, db_path):
+    headers = employee("폐기자")
+    assert client.get("/user-info", headers=headers).status_code == 200
+
+    # 다른 워커가 /logout 한 것처럼 DB 에만 기록
+    _, expires_at, token_id = decode_token(headers["Authorization"].split()[1])
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO revoked_tokens (token_id, expires_at) VALUES (?, ?)", (token_id, expires_at))
+    conn.commit()
+    conn.close()
+
+    deadline = time.monotonic() + CHANGE_FEED_POLL_INTERVAL + 2
+    while client.get("/user-info", headers=headers).status_code != 401:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
@@ -0,0 +1,69 @@
+import sqlite3
+import time
+
+from balance_cache import BalanceCache, balance_cache, balance_etag
+
+
+def test_lru_eviction_and_ttl():
+    cache = BalanceCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # a 가 최근 사용
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    expired = BalanceCache(maxsize=2, ttl=0.01)
+    expired.put("a", 1)
+    time.sleep(0.02)
+    assert expired.get("a") is None
+
+
+# 읽는 도중 무효화되면 그 결과는 캐시에 넣지 않음
+def test_put_after_invalidation_is_dropped():
+    cache = BalanceCache(maxsize=10, ttl=60)
+    token = cache.begin_load()
+    cache.invalidate_many(["다른사람"])
+    cache.put("a", "오래된 값", token)
+    assert cache.get("a") is None
+
+    token = cache.begin_load()
+    cache.put("a", "새 값", token)
+    assert cache.get("a") == "새 값"
+
+
+def test_etag_depends_only_on_balance():
+    assert balance_etag("a", 15, 1.5) == balance_etag("a", 15, 1.5)
+    assert balance_etag("a", 15, 1.5) != balance_etag("a", 15, 2)
+
+
+def test_user_info_revalidates_after_own_write(client, employee):
+    headers = employee("잔액이")
+    first = client.get("/user-info", headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get("/user-info", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    response = client.post("/leave-request", headers=headers,
+                           json={"start_date": "2027-03-02", "end_date": "2027-03-02", "leave_type": "FULL_DAY"})
+    assert response.status_code == 200
+
+    second = client.get("/user-info", headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.json()["used_leave"] == first.json()["used_leave"] + 1
+
+
+# 다른 프로세스의 변경은 변경 피드가 캐시를 지운 뒤 반영 (그 전까지는 캐시 값)
+def test_user_info_sees_other_process_write_through_change_feed(client, employee, db_path):
+    headers = employee("잔액삼")
+    assert client.get("/user-info", headers=headers).json()["total_leave"] == 15
+    assert balance_cache.get("잔액삼") is not None
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE employees SET total_leave = 20 WHERE username = '잔액삼'")
+    conn.commit()
+    conn.close()
+
+    deadline = time.monotonic() + 5
+    while client.get("/user-info", headers=headers).json()["total_leave"] != 20:
+        assert time.monotonic() < deadline, "변경 피드가 캐시를 무효화하지 않았습니다."
+        time.sleep(0.05)
@@ -0,0 +1,100 @@
+import sqlite3
+
+from tests.conftest import ADMIN
+
+
+def admin_headers(employee):
+    return employee(ADMIN)
+
+
+def used_leave(db_path, username):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT used_leave FROM employees WHERE username = ?", (username,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def item(username, start_date, end_date, leave_type="FULL_DAY"):
+    return {"username": username, "start_date": start_date, "end_date": end_date, "leave_type": leave_type}
+
+
+# 유효한 건만 저장하고 결과는 요청 순서대로 - 같은 직원의 여러 건은 앞의 건부터 잔여 연차에서 차감
+def test_batch_submission_reports_each_item_in_order(client, employee, db_path):
+    headers = admin_headers(employee)
+    employee("일괄갑", total_leave=5)
+    employee("일괄을", total_leave=15)
+
+    response = client.post("/leave-requests/batch", headers=headers, json={"requests": [
+        item("일괄갑", "2027-03-02", "2027-03-05"),                    # 4일
+        item("일괄갑", "2027-03-08", "2027-03-09"),                    # 2일 - 잔여 1일이라 부족
+        item("일괄을", "2027-03-08", "2027-03-08", "MORNING_HALF"),
+        item("없는직원", "2027-03-08", "2027-03-08"),
+        item("일괄갑", "2027-03-10", "2027-03-10", "AFTERNOON_HALF"),  # 남은 1일 안에서 성공
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (3, 2)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[0]["days"] == 4 and "id" in results[0]
+    assert results[1]["error"] == "남은 연차가 부족합니다."
+    assert results[2]["days"] == 0.5
+    assert results[3]["error"] == "사용자를 찾을 수 없습니다."
+    assert results[4]["id"] > results[0]["id"]
+
+    assert used_leave(db_path, "일괄갑") == 4.5
+    assert used_leave(db_path, "일괄을") == 0.5
+
+
+def test_batch_for_other_employee_requires_admin(client, employee, db_path):
+    headers = employee("일괄병")
+    employee("일괄정")
+    response = client.post("/leave-requests/batch", headers=headers, json={"requests": [
+        item("일괄정", "2027-03-02", "2027-03-02"),
+        item(None, "2027-03-02", "2027-03-02"),
+    ]})
+    results = response.json()["results"]
+    assert "관리자" in results[0]["error"]
+    assert results[1]["username"] == "일괄병"
+    assert used_leave(db_path, "일괄정") == 0
+
+
+def test_decisions_approve_reject_and_restore_balance(client, employee, db_path):
+    headers = admin_headers(employee)
+    employee("결재대상")
+    created = client.post("/leave-requests/batch", headers=headers, json={"requests": [
+        item("결재대상", "2027-03-02", "2027-03-03"),
+        item("결재대상", "2027-03-04", "2027-03-04"),
+    ]}).json()["results"]
+    first, second = created[0]["id"], created[1]["id"]
+    assert used_leave(db_path, "결재대상") == 3
+
+    response = client.post("/leave-requests/decisions", headers=headers, json={"decisions": [
+        {"id": first, "status": "APPROVED"},
+        {"id": second, "status": "REJECTED"},
+        {"id": second, "status": "APPROVED"},     # 같은 요청 안에서 이미 처리됨
+        {"id": 999999999, "status": "APPROVED"},
+        {"id": first, "status": "CANCELLED"},
+    ]})
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert results[0]["status"] == "APPROVED" and results[1]["status"] == "REJECTED"
+    assert "이미 처리" in results[2]["error"]
+    assert "찾을 수 없습니다" in results[3]["error"]
+    assert "status" in results[4]["error"]
+
+    # 반려한 1일만 되돌림
+    assert used_leave(db_path, "결재대상") == 2
+
+    again = client.post("/leave-requests/decisions", headers=headers,
+                        json={"decisions": [{"id": second, "status": "APPROVED"}]}).json()
+    assert again["updated"] == 0 and "이미 처리" in again["results"][0]["error"]
+
+
+def test_decisions_require_admin(client, employee):
+    headers = employee("일반직원")
+    response = client.post("/leave-requests/decisions", headers=headers,
+                           json={"decisions": [{"id": 1, "status": "APPROVED"}]})
+    assert response.status_code == 403
@@ -0,0 +1,98 @@
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from calendar_view import build_calendar_frame, read_team_calendar
+from migrations import migrate
+from repository import fetch_calendar
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db_path = str(tmp_path / "calendar.db")
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def brute_force(requests, date_from, date_to, statuses):
+    return sorted(leave_id for leave_id, (start, end, status) in requests.items()
+                  if start <= date_to and end >= date_from and status in statuses)
+
+
+# R*Tree 조회 결과가 전체 비교와 같음 (경계일 포함, 상태 필터, 수정/삭제 후에도)
+def test_overlap_query_matches_brute_force(conn):
+    rng = random.Random(7)
+    base = date(2027, 1, 1)
+    requests = {}
+    for i in range(300):
+        start = base + timedelta(days=rng.randrange(365))
+        end = start + timedelta(days=rng.randrange(10))
+        status = rng.choice(['APPROVED', 'PENDING', 'REJECTED'])
+        cursor = conn.execute(
+            "INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) "
+            "VALUES (?, ?, ?, 1, 'FULL_DAY', ?)", (f"u{i % 20}", start.isoformat(), end.isoformat(), status))
+        requests[cursor.lastrowid] = (start, end, status)
+
+    # 일부 기간 이동, 일부 삭제 - 트리거가 인덱스를 함께 갱신
+    for leave_id in rng.sample(sorted(requests), 40):
+        start = base + timedelta(days=rng.randrange(365))
+        conn.execute("UPDATE leave_requests SET start_date = ?, end_date = ? WHERE id = ?",
+                     (start.isoformat(), start.isoformat(), leave_id))
+        requests[leave_id] = (start, start, requests[leave_id][2])
+    for leave_id in rng.sample(sorted(requests), 40):
+        conn.execute("DELETE FROM leave_requests WHERE id = ?", (leave_id,))
+        del requests[leave_id]
+    conn.commit()
+
+    for _ in range(50):
+        date_from = base + timedelta(days=rng.randrange(365))
+        date_to = date_from + timedelta(days=rng.randrange(31))
+        for include_pending, statuses in ((True, {'APPROVED', 'PENDING'}), (False, {'APPROVED'})):
+            got = sorted(row['id'] for row in fetch_calendar(conn, date_from, date_to, include_pending))
+            assert got == brute_force(requests, date_from, date_to, statuses)
+
+
+def test_overlap_query_uses_rtree(conn):
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT r.id FROM leave_request_intervals i JOIN leave_requests r ON r.id = i.id "
+        "WHERE i.start_day <= ? AND i.end_day >= ?", (20000, 19990)))
+    assert "VIRTUAL TABLE INDEX" in plan
+
+
+def test_calendar_frame_marks_pending_and_skips_holidays(conn):
+    conn.executemany(
+        "INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) VALUES (?, ?, ?, ?, ?, ?)",
+        [("갑", "2027-09-13", "2027-09-17", 2, "FULL_DAY", "APPROVED"),
+         ("을", "2027-09-17", "2027-09-17", 0.5, "MORNING_HALF", "PENDING")],
+    )
+    entries = read_team_calendar(conn, date(2027, 9, 13), date(2027, 9, 19))
+    frame = build_calendar_frame(entries, date(2027, 9, 13), date(2027, 9, 19))
+
+    # 9/14~16 추석 연휴와 주말은 열에서 빠짐
+    assert list(frame.columns) == ["09/13 (월)", "09/17 (금)"]
+    assert frame.loc["갑", "09/13 (월)"] == "🌴 전일"
+    assert frame.loc["을", "09/17 (금)"] == "🌅 오전 (대기)"
+    assert frame.loc["을", "09/13 (월)"] == ""
+
+
+def test_calendar_endpoint(client, employee):
+    headers = employee("달력사")
+    client.post("/leave-request", headers=headers,
+                json={"start_date": "2027-09-13", "end_date": "2027-09-17", "leave_type": "FULL_DAY"})
+
+    body = client.get("/calendar", headers=headers, params={"from": "2027-09-13", "to": "2027-09-19"}).json()
+    assert list(body["days"]) == ["2027-09-13", "2027-09-17"]
+    assert "달력사" in body["days"]["2027-09-13"]
+    approved_only = client.get("/calendar", headers=headers,
+                               params={"from": "2027-09-13", "to": "2027-09-19", "include_pending": "false"}).json()
+    assert all("달력사" not in names for names in approved_only["days"].values())
+
+    assert client.get("/calendar", headers=headers,
+                      params={"from": "2027-09-19", "to": "2027-09-13"}).status_code == 400
+    assert client.get("/calendar", headers=headers,
+                      params={"from": "2027-01-01", "to": "2027-12-31"}).status_code == 400
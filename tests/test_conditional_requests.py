@@ -0,0 +1,37 @@
+import sqlite3
+
+CALENDAR = {"from": "2028-03-06", "to": "2028-03-12"}
+
+
+def test_leave_history_revalidates_after_post(client, employee):
+    headers = employee("조건부")
+    first = client.get("/leave-history", headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get("/leave-history", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    response = client.post("/leave-request", headers=headers,
+                           json={"start_date": "2028-03-07", "end_date": "2028-03-07", "leave_type": "FULL_DAY"})
+    assert response.status_code == 200
+
+    second = client.get("/leave-history", headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert len(second.json()["items"]) == len(first.json()["items"]) + 1
+
+
+def test_calendar_revalidates_after_write_from_other_process(client, employee, db_path):
+    headers = employee("달력이")
+    first = client.get("/calendar", params=CALENDAR, headers=headers)
+    etag = first.headers["ETag"]
+
+    # 다른 워커/Streamlit 앱의 쓰기 - 이 워커의 변경 피드 poller 는 아직 모름
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) "
+                 "VALUES ('달력이', '2028-03-08', '2028-03-08', 1, 'FULL_DAY', 'APPROVED')")
+    conn.execute("UPDATE employees SET used_leave = used_leave + 1 WHERE username = '달력이'")
+    conn.commit()
+    conn.close()
+
+    second = client.get("/calendar", params=CALENDAR, headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert "달력이" in second.json()["days"]["2028-03-08"]
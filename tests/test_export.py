@@ -0,0 +1,18 @@
+from tests.conftest import ADMIN
+
+
+def test_export_requires_token(client):
+    response = client.get("/export/leave-requests")
+    assert response.status_code == 401
+
+
+def test_export_rejects_non_admin(client, employee):
+    response = client.get("/export/leave-requests", headers=employee("수출일"))
+    assert response.status_code == 403
+
+
+def test_export_allows_admin(client, employee):
+    headers = employee(ADMIN)
+    response = client.get("/export/leave-requests", headers=headers)
+    assert response.status_code == 200
+    assert response.text.splitlines()[0].startswith("id,")
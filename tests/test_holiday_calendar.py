@@ -0,0 +1,93 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from holiday_calendar import (DateRangeError, HolidayCalendar, calculate_working_days, get_calendar,
+                              load_holidays)
+
+
+def test_leave_request_outside_supported_years_is_rejected(client, employee):
+    headers = employee("달력끝")
+    for start, end in (("9999-12-31", "9999-12-31"), ("2025-01-02", "9999-12-31"), ("0001-01-01", "0001-01-02")):
+        response = client.post("/leave-request", headers=headers,
+                               json={"start_date": start, "end_date": end, "leave_type": "FULL_DAY"})
+        assert response.status_code == 422, (start, end, response.text)
+
+    response = client.post("/leave-request", headers=headers,
+                           json={"start_date": "2025-13-01", "end_date": "2025-13-02", "leave_type": "FULL_DAY"})
+    assert response.status_code == 422
+
+    response = client.get("/calendar", headers=headers, params={"from": "9999-12-01", "to": "9999-12-31"})
+    assert response.status_code == 400
+
+
+# 공휴일 데이터가 없는 연도는 공휴일을 근무일로 세지 않도록 거부
+def test_dates_without_holiday_data_are_rejected(client, employee):
+    first, last = get_calendar().covered_years
+    headers = employee("달력밖")
+    for year in (first - 1, last + 1):
+        response = client.post("/leave-request", headers=headers,
+                               json={"start_date": f"{year}-03-06", "end_date": f"{year}-03-07",
+                                     "leave_type": "FULL_DAY"})
+        assert response.status_code == 422
+        assert "공휴일 정보" in response.json()["detail"]
+
+        response = client.get("/calendar", headers=headers, params={"from": f"{year}-03-01", "to": f"{year}-03-31"})
+        assert response.status_code == 400
+
+    with pytest.raises(DateRangeError):
+        calculate_working_days(f"{last + 1}-01-04", f"{last + 1}-01-04", "FULL_DAY")
+
+
+def test_count_business_days_rejects_out_of_range_years():
+    calendar = HolidayCalendar()
+    with pytest.raises(DateRangeError):
+        calendar.count_business_days(date(9999, 12, 30), date(9999, 12, 31))
+    with pytest.raises(DateRangeError):
+        calendar.count_business_days(date(1999, 12, 31), date(2000, 1, 3))
+    with pytest.raises(DateRangeError):
+        calendar.count_business_days(date(2099, 12, 31), date(2100, 1, 1))
+    assert calendar.count_business_days(date(2000, 1, 1), date(2099, 12, 31)) > 0
+
+
+# 여러 스레드가 서로 다른 연도 범위로 표를 넓히는 동안 읽어도 처음부터 만든 달력과 결과가 같아야 함
+def test_concurrent_reads_while_tables_grow():
+    holidays = load_holidays()
+    reference = HolidayCalendar(holidays)
+    ranges = []
+    for i in range(40):
+        # 범위가 앞뒤로 번갈아 넓어지도록 (기준 연도가 바뀌는 재계산 포함)
+        year = 2050 + (i if i % 2 else -i)
+        start = date(year, 3, 1)
+        ranges.append((start, start + timedelta(days=400)))
+    expected = {r: reference.count_business_days(*r) for r in ranges}
+
+    for _ in range(5):
+        calendar = HolidayCalendar(holidays)
+        errors = []
+        barrier = threading.Barrier(8)
+
+        def worker(offset):
+            barrier.wait()
+            for index in range(len(ranges)):
+                r = ranges[(index + offset) % len(ranges)]
+                try:
+                    if calendar.count_business_days(*r) != expected[r]:
+                        errors.append(r)
+                except Exception as e:
+                    errors.append((r, e))
+
+        threads = [threading.Thread(target=worker, args=(offset * 5,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+
+# 주말·공휴일의 반차는 차감하지 않음 (2025-10-06 추석, 2025-10-11 토요일)
+def test_half_day_on_non_business_day_is_not_charged():
+    assert calculate_working_days("2025-10-06", "2025-10-06", "MORNING_HALF") == {"days": 0}
+    assert calculate_working_days("2025-10-11", "2025-10-11", "AFTERNOON_HALF") == {"days": 0}
+    assert calculate_working_days("2025-10-13", "2025-10-13", "MORNING_HALF") == {"days": 0.5}
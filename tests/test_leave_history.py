@@ -0,0 +1,68 @@
+import sqlite3
+
+from repository import fetch_leave_history
+
+
+def insert_requests(db_path, username, count):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) "
+        "VALUES (?, '2027-03-02', '2027-03-02', 1, 'FULL_DAY', 'APPROVED')",
+        [(username,)] * count,
+    )
+    conn.commit()
+    conn.close()
+
+
+def read_pages(client, headers, limit, on_page=None):
+    pages, after_id = [], None
+    while True:
+        params = {"limit": limit}
+        if after_id is not None:
+            params["after_id"] = after_id
+        page = client.get("/leave-history", headers=headers, params=params).json()
+        pages.append([item["id"] for item in page["items"]])
+        if on_page is not None:
+            on_page()
+        after_id = page["next_cursor"]
+        if after_id is None:
+            return pages
+
+
+# 최신 순 keyset 페이지 - 페이지를 넘기는 사이 새 신청이 들어와도 건너뛰거나 겹치는 항목 없음
+def test_pages_are_newest_first_and_stable_under_inserts(client, employee, db_path):
+    headers = employee("내역이")
+    insert_requests(db_path, "내역이", 7)
+    insert_requests(db_path, "다른사람", 3)
+
+    pages = read_pages(client, headers, 3, on_page=lambda: insert_requests(db_path, "내역이", 1))
+
+    ids = [leave_id for page in pages for leave_id in page]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 7
+
+
+def test_limit_is_bounded(client, employee):
+    headers = employee("내역이")
+    assert client.get("/leave-history", headers=headers, params={"limit": 0}).status_code == 422
+    assert client.get("/leave-history", headers=headers, params={"limit": 501}).status_code == 422
+
+
+def test_history_query_uses_username_id_index(client, db_path):
+    insert_requests(db_path, "내역삼", 3)
+    conn = sqlite3.connect(db_path)
+    try:
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM leave_requests WHERE username = ? AND id < ? ORDER BY id DESC LIMIT 10",
+            ("내역삼", 100),
+        ))
+        assert "idx_leave_requests_username_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+        conn.row_factory = sqlite3.Row
+        rows = fetch_leave_history(conn, "내역삼", limit=2)
+        older = fetch_leave_history(conn, "내역삼", limit=2, after_id=rows[-1]["id"])
+        assert [row["id"] for row in older] == [rows[-1]["id"] - 1]
+    finally:
+        conn.close()
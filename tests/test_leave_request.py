@@ -0,0 +1,37 @@
+import pytest
+
+LEAVE_CASES = [
+    # (start_date, end_date, leave_type, 상태 코드, 오류 메시지 일부)
+    ("2025-10-13", "2025-10-13", "BOGUS", 422, "leave_type"),
+    ("2025-10-14", "2025-10-13", "FULL_DAY", 400, "시작 날짜"),
+    ("2025-10-11", "2025-10-12", "FULL_DAY", 400, "근무일이 없습니다"),
+    ("2025-10-06", "2025-10-06", "MORNING_HALF", 400, "근무일이 없습니다"),
+    ("2025-10-13", "2025-10-14", "MORNING_HALF", 400, "반차"),
+    ("2025/10/13", "2025/10/13", "FULL_DAY", 422, "YYYY-MM-DD"),
+]
+
+
+# 단건 신청과 일괄 신청이 같은 검증을 거침
+@pytest.mark.parametrize("start_date, end_date, leave_type, status_code, message", LEAVE_CASES)
+def test_invalid_leave_request_is_rejected(client, employee, start_date, end_date, leave_type, status_code, message):
+    headers = employee("검증")
+    body = {"start_date": start_date, "end_date": end_date, "leave_type": leave_type}
+
+    response = client.post("/leave-request", headers=headers, json=body)
+    assert response.status_code == status_code
+    assert message in response.json()["detail"]
+
+    response = client.post("/leave-requests/batch", headers=headers, json={"requests": [body]})
+    assert response.status_code == 200
+    assert message in response.json()["results"][0]["error"]
+
+    assert client.get("/leave-history", headers=headers).json()["items"] == []
+
+
+def test_valid_leave_request_is_charged_business_days(client, employee):
+    headers = employee("검증통과")
+    response = client.post("/leave-request", headers=headers,
+                           json={"start_date": "2025-10-02", "end_date": "2025-10-13", "leave_type": "FULL_DAY"})
+    assert response.status_code == 200
+    assert response.json()["days"] == 3
+    assert client.get("/user-info", headers=headers).json()["used_leave"] == 3
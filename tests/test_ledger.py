@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+import ledger
+from migrations import migrate
+from repository import fetch_ledger_balance, insert_leave_request
+
+
+@pytest.fixture
+def ledger_db(tmp_path):
+    db_path = str(tmp_path / "ledger.db")
+    migrate(db_path)
+    return db_path
+
+
+@pytest.fixture
+def conn(ledger_db):
+    conn = sqlite3.connect(ledger_db)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def entry_types(conn, username):
+    return [row[0] for row in conn.execute(
+        "SELECT entry_type FROM leave_ledger WHERE username = ? ORDER BY id", (username,))]
+
+
+# 직원/신청을 바꿀 때마다 트리거가 원장 항목을 남기고 employees 잔액과 원장 합계가 같음
+def test_triggers_record_every_balance_change(conn):
+    conn.execute("INSERT INTO employees (username, password, total_leave, used_leave) VALUES ('원장', 'x', 15, 0)")
+    conn.commit()
+    leave_id = insert_leave_request(conn, "원장", "2027-03-02", "2027-03-03", 2, "FULL_DAY")
+    conn.execute("UPDATE employees SET total_leave = 16 WHERE username = '원장'")
+    conn.execute("UPDATE leave_requests SET status = 'REJECTED' WHERE id = ?", (leave_id,))
+    conn.execute("UPDATE employees SET used_leave = used_leave - 2 WHERE username = '원장'")
+    conn.commit()
+    assert ledger.verify_ledger(conn) == ([], [])
+
+    conn.execute("UPDATE leave_requests SET status = 'PENDING' WHERE id = ?", (leave_id,))
+    conn.execute("DELETE FROM leave_requests WHERE id = ?", (leave_id,))
+    conn.commit()
+    assert entry_types(conn, "원장") == ['OPENING', 'DEBIT', 'ADJUST', 'REVERSAL', 'DEBIT', 'REVERSAL']
+    assert ledger.verify_ledger(conn) == ([], [])
+
+    balance = fetch_ledger_balance(conn, "원장")
+    assert (balance["granted"], balance["used"], balance["remaining"]) == (16, 0, 16)
+
+
+def test_ledger_entries_cannot_be_changed(conn):
+    conn.execute("INSERT INTO employees (username, password, total_leave, used_leave) VALUES ('원장', 'x', 15, 0)")
+    conn.commit()
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE leave_ledger SET granted = 100")
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("DELETE FROM leave_ledger")
+
+
+# 스냅샷 뒤에는 스냅샷 이후 항목만 더해도 같은 잔액
+def test_snapshots_do_not_change_balances(conn, ledger_db):
+    conn.execute("INSERT INTO employees (username, password, total_leave, used_leave) VALUES ('원장', 'x', 15, 0)")
+    conn.commit()
+    for day in ("2027-03-02", "2027-03-03", "2027-03-04"):
+        insert_leave_request(conn, "원장", day, day, 1, "FULL_DAY")
+    before = fetch_ledger_balance(conn, "원장")
+
+    assert ledger.take_snapshots(ledger_db, min_entries=1, pause=0, verbose=False) == 1
+    after = fetch_ledger_balance(conn, "원장")
+    assert (after["granted"], after["used"], after["delta_entries"]) == (before["granted"], before["used"], 0)
+
+    insert_leave_request(conn, "원장", "2027-03-05", "2027-03-05", 0.5, "MORNING_HALF")
+    assert fetch_ledger_balance(conn, "원장")["used"] == before["used"] + 0.5
+    assert ledger.verify_ledger(conn) == ([], [])
+
+
+def test_rollover_grants_and_carries_over(conn, ledger_db):
+    conn.executemany("INSERT INTO employees (username, password, total_leave, used_leave) VALUES (?, 'x', 15, 0)",
+                     [("전환갑",), ("전환을",)])
+    conn.commit()
+    insert_leave_request(conn, "전환갑", "2027-03-02", "2027-03-04", 3, "FULL_DAY")
+    insert_leave_request(conn, "전환을", "2027-03-02", "2027-03-02", 13, "FULL_DAY")
+    year = conn.execute("SELECT leave_year FROM employees LIMIT 1").fetchone()[0]
+
+    assert ledger.run_rollover(year + 1, ledger_db, carryover_max=5, chunk_size=1, pause=0, verbose=False) == 2
+    balances = {row[0]: (row[1], row[2], row[3]) for row in conn.execute(
+        "SELECT username, leave_year, total_leave, used_leave FROM employees")}
+    # 새 연차 15 + 이월 min(잔여, 5)
+    assert balances == {"전환갑": (year + 1, 20, 0), "전환을": (year + 1, 17, 0)}
+    assert ledger.verify_ledger(conn) == ([], [])
+
+    # 다시 실행하면 아무것도 하지 않고, 지난 연도로는 전환할 수 없음
+    assert ledger.run_rollover(year + 1, ledger_db, pause=0, verbose=False) == 0
+    with pytest.raises(ValueError):
+        ledger.run_rollover(year, ledger_db, pause=0, verbose=False)
+
+
+def test_ledger_endpoint(client, employee):
+    headers = employee("원장조회")
+    client.post("/leave-request", headers=headers,
+                json={"start_date": "2027-03-02", "end_date": "2027-03-03", "leave_type": "FULL_DAY"})
+    body = client.get("/ledger", headers=headers).json()
+    assert body["balance"]["remaining"] == 13
+    assert [entry["entry_type"] for entry in body["entries"]] == ["OPENING", "DEBIT"]
+    assert client.get("/ledger", headers=headers, params={"username": "다른사람"}).status_code == 403
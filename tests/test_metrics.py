@@ -0,0 +1,60 @@
+import sqlite3
+import time
+
+import metrics
+from metrics import InstrumentedConnection, fingerprint, sql_query_duration_seconds, sql_statements_total
+
+# 첫 행은 바로 나오고 나머지 행을 찾는 일은 fetch 하면서 하는 쿼리
+SLOW_SELECT = """
+    WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c LIMIT 400000)
+    SELECT x FROM c WHERE x = 1 OR x = 400000
+"""
+
+
+def recorded_seconds(sql):
+    series = sql_query_duration_seconds._values.get((fingerprint(sql),))
+    return (series[1], series[2]) if series else (0.0, 0)
+
+
+def test_select_duration_includes_fetch():
+    conn = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+    before, count_before = recorded_seconds(SLOW_SELECT)
+
+    started = time.perf_counter()
+    cursor = conn.execute(SLOW_SELECT)
+    executed = time.perf_counter() - started
+    rows = cursor.fetchall()
+    total = time.perf_counter() - started
+
+    after, count_after = recorded_seconds(SLOW_SELECT)
+    assert [row[0] for row in rows] == [1, 400000]
+    assert count_after == count_before + 1
+    assert after - before > executed * 5
+    assert after - before >= total * 0.8
+    conn.close()
+
+
+def test_partially_read_cursor_is_recorded_when_dropped():
+    conn = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+    _, count_before = recorded_seconds(SLOW_SELECT)
+    assert conn.execute(SLOW_SELECT).fetchone()[0] == 1
+    assert recorded_seconds(SLOW_SELECT)[1] == count_before + 1
+    conn.close()
+
+
+def test_trace_uses_unexpanded_statement():
+    conn = sqlite3.connect(":memory:", factory=InstrumentedConnection)
+    conn.execute("CREATE TABLE t (name TEXT)")
+    sql = "INSERT INTO t (name) VALUES (?)"
+    label = (fingerprint(sql),)
+    before = sql_statements_total._values.get(label, 0)
+
+    metrics._fingerprints.clear()
+    for i in range(50):
+        conn.execute(sql, (f"이름-{i}",))
+    conn.commit()
+
+    assert sql_statements_total._values.get(label, 0) - before == 50
+    # 값마다 지문 캐시 항목이 생기지 않음 (INSERT 문장 + 암묵적 BEGIN/COMMIT)
+    assert len(metrics._fingerprints) <= 3
+    conn.close()
@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+
+import ledger
+from migrations import LATEST_VERSION, apply_migrations, current_version, migrate
+from usage_rollup import verify_usage_rollup
+
+
+def test_fresh_database_reaches_latest_version_once(tmp_path):
+    db_path = str(tmp_path / "fresh.db")
+    assert migrate(db_path) == LATEST_VERSION
+    assert migrate(db_path) == 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert current_version(conn) == LATEST_VERSION
+    finally:
+        conn.close()
+
+
+# 여러 프로세스가 동시에 시작해도 각 단계는 한 번만 적용
+def test_concurrent_migrations_apply_each_step_once(tmp_path):
+    db_path = str(tmp_path / "concurrent.db")
+    applied = []
+    barrier = threading.Barrier(4)
+
+    def run():
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            barrier.wait()
+            applied.append(apply_migrations(conn))
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(applied) == [0, 0, 0, LATEST_VERSION]
+
+
+# 신청일(request_date)만 있던 예전 스키마 - 하루짜리 전일 휴가로 보정하고 파생 테이블도 기존 데이터로 채움
+def test_legacy_schema_is_upgraded_with_existing_data(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            total_leave INTEGER DEFAULT 14,
+            used_leave REAL DEFAULT 0
+        );
+        CREATE TABLE leave_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            request_date DATE,
+            days REAL NOT NULL,
+            status TEXT DEFAULT 'PENDING'
+        );
+        INSERT INTO employees (username, password, total_leave, used_leave) VALUES ('예전', 'x', 14, 2);
+        INSERT INTO leave_requests (username, request_date, days, status) VALUES
+            ('예전', '2024-03-04', 1, 'APPROVED'),
+            ('예전', '2024-03-05', 1, 'PENDING'),
+            ('예전', '2024-03-06', 1, 'REJECTED');
+    """)
+    conn.close()
+
+    migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT start_date, end_date, leave_type FROM leave_requests ORDER BY id").fetchall()
+        assert [tuple(row) for row in rows][0] == ('2024-03-04', '2024-03-04', 'FULL_DAY')
+        assert conn.execute("SELECT COUNT(*) FROM leave_request_intervals").fetchone()[0] == 3
+        assert verify_usage_rollup(conn) == []
+        assert ledger.verify_ledger(conn) == ([], [])
+    finally:
+        conn.close()
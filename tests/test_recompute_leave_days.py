@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+from holiday_calendar import HolidayCalendar, get_calendar
+from migrations import LATEST_VERSION, _create_base_tables, current_version, migrate
+from recompute_leave_days import recompute_chunk, recompute_leave_days
+
+# 2025-10-06 (월) 을 공휴일로 추가한 달력 - 10/06~10/08 신청은 3일에서 2일이 됨
+CALENDAR = HolidayCalendar({date(2025, 10, 6): "추석"})
+
+
+def holiday_array():
+    return np.array(sorted(get_calendar().holidays), dtype='datetime64[D]')
+
+
+def insert_requests(conn):
+    conn.execute("INSERT INTO employees (username, password, total_leave, used_leave) VALUES ('재계산', 'x', 15, 0)")
+    conn.executemany(
+        "INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) "
+        "VALUES ('재계산', ?, ?, ?, ?, 'APPROVED')",
+        [("2025-10-06", "2025-10-08", 3, "FULL_DAY"), ("2025-10-13", "2025-10-13", 0.5, "MORNING_HALF")],
+    )
+    conn.execute("UPDATE employees SET used_leave = 3.5")
+    conn.commit()
+
+
+# 반차는 calculate_working_days 와 같이 근무일만 0.5일 (2025-10-06 추석, 2025-10-11 토요일)
+def test_recompute_chunk_charges_half_days_only_on_business_days():
+    rows = [
+        (1, "2025-10-06", "2025-10-06", 0.5, "MORNING_HALF"),
+        (2, "2025-10-11", "2025-10-11", 0.5, "AFTERNOON_HALF"),
+        (3, "2025-10-13", "2025-10-13", 0.5, "MORNING_HALF"),
+        (4, "2025-10-02", "2025-10-13", 8, "FULL_DAY"),
+    ]
+    ids, old_days, new_days = recompute_chunk(rows, holiday_array())
+    assert dict(zip(ids.tolist(), new_days.tolist())) == {1: 0.0, 2: 0.0, 4: 3.0}
+
+
+# 원장 도입 전 스키마의 DB 도 먼저 마이그레이션한 뒤 재계산
+def test_recompute_migrates_old_database(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    _create_base_tables(conn)
+    insert_requests(conn)
+    conn.close()
+
+    result = recompute_leave_days(db_path, calendar=CALENDAR, chunk_size=1, verbose=False)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert current_version(conn) == LATEST_VERSION
+        assert result["corrections"] == [(2.0, 1)]
+        assert conn.execute("SELECT used_leave FROM employees").fetchone()[0] == 2.5
+    finally:
+        conn.close()
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    db_path = str(tmp_path / "dry.db")
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    insert_requests(conn)
+
+    result = recompute_leave_days(db_path, calendar=CALENDAR, dry_run=True, verbose=False)
+
+    assert result["balance_changes"] == [("재계산", 3.5, 2.5)]
+    assert conn.execute("SELECT days FROM leave_requests ORDER BY id").fetchall() == [(3.0,), (0.5,)]
+    assert conn.execute("SELECT used_leave FROM employees").fetchone()[0] == 3.5
+    conn.close()
+
+
+# 지난 연차 연도에 기록된 신청의 일수 정정은 그 연도 원장에 ADJUST 로 남고 올해 사용 연차는 그대로
+def test_adjustments_are_booked_to_the_request_year(tmp_path):
+    db_path = str(tmp_path / "rollover.db")
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    insert_requests(conn)
+    booked_year = conn.execute("SELECT leave_year FROM employees").fetchone()[0]
+
+    # 다음 연차 연도로 전환 (새 연도에는 아직 사용 내역 없음)
+    next_year = booked_year + 1
+    conn.execute("INSERT INTO leave_rollovers (year, completed_at) VALUES (?, CURRENT_TIMESTAMP)", (next_year,))
+    conn.execute("UPDATE employees SET leave_year = ?, used_leave = 0", (next_year,))
+    conn.execute("INSERT INTO leave_ledger (username, year, entry_type, granted) VALUES ('재계산', ?, 'GRANT', 15)",
+                 (next_year,))
+    conn.commit()
+
+    recompute_leave_days(db_path, calendar=CALENDAR, verbose=False)
+
+    adjust = conn.execute("SELECT year, used FROM leave_ledger WHERE entry_type = 'ADJUST'").fetchall()
+    assert adjust == [(booked_year, -1.0)]
+    assert conn.execute("SELECT used_leave FROM employees").fetchone()[0] == 0
+    conn.close()
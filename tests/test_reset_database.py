@@ -0,0 +1,30 @@
+import sqlite3
+
+import ledger
+from migrations import migrate
+from reset_database import seed_synthetic
+
+
+def test_seed_synthetic_fills_ledger_once(tmp_path):
+    db_path = str(tmp_path / "synthetic.db")
+    migrate(db_path)
+    seed_synthetic(50, 2000, db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM employees WHERE leave_year IS NULL").fetchone()[0] == 0
+        entry_types = dict(conn.execute("SELECT entry_type, COUNT(*) FROM leave_ledger GROUP BY entry_type"))
+        assert entry_types.get("OPENING") == 50
+        assert "ADJUST" not in entry_types
+        balances, snapshots = ledger.verify_ledger(conn)
+        assert balances == [] and snapshots == []
+
+        # 트리거가 다시 만들어졌는지 - 새 신청이 원장에 DEBIT 으로 남아야 함
+        username = conn.execute("SELECT username FROM employees ORDER BY id LIMIT 1").fetchone()[0]
+        conn.execute("INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) "
+                     "VALUES (?, '2030-03-04', '2030-03-04', 0.5, 'MORNING_HALF', 'PENDING')", (username,))
+        conn.execute("UPDATE employees SET used_leave = used_leave + 0.5 WHERE username = ?", (username,))
+        conn.commit()
+        assert ledger.verify_ledger(conn) == ([], [])
+    finally:
+        conn.close()
@@ -0,0 +1,79 @@
+import sqlite3
+
+from migrations import migrate
+from tests.conftest import ADMIN
+from usage_rollup import rebuild_usage_rollup, verify_usage_rollup
+
+
+# 넣기/고치기/지우기마다 트리거가 요약 테이블을 원본 집계와 같게 유지
+def test_triggers_keep_rollup_in_sync(tmp_path):
+    db_path = str(tmp_path / "rollup.db")
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO leave_requests (username, start_date, end_date, days, leave_type, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [("요약", "2027-03-02", "2027-03-03", 2, "FULL_DAY", "PENDING"),
+             ("요약", "2027-03-10", "2027-03-10", 0.5, "MORNING_HALF", "PENDING"),
+             ("요약", "2027-04-01", "2027-04-01", 1, "FULL_DAY", "APPROVED")],
+        )
+        assert verify_usage_rollup(conn) == []
+        assert conn.execute("SELECT days, requests FROM leave_usage_monthly "
+                            "WHERE month = '2027-03' AND leave_type = 'FULL_DAY'").fetchone() == (2, 1)
+
+        conn.execute("UPDATE leave_requests SET status = 'APPROVED' WHERE start_date = '2027-03-02'")
+        conn.execute("UPDATE leave_requests SET days = 1 WHERE start_date = '2027-04-01'")
+        conn.execute("UPDATE leave_requests SET start_date = '2027-05-03', end_date = '2027-05-03' "
+                     "WHERE start_date = '2027-03-10'")
+        assert verify_usage_rollup(conn) == []
+
+        conn.execute("DELETE FROM leave_requests WHERE start_date = '2027-05-03'")
+        assert verify_usage_rollup(conn) == []
+        # 요청 수가 0 이 된 칸은 지워짐
+        assert conn.execute("SELECT COUNT(*) FROM leave_usage_monthly WHERE month = '2027-05'").fetchone()[0] == 0
+        conn.commit()
+
+        conn.execute("DELETE FROM leave_usage_monthly")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert rebuild_usage_rollup(db_path, verbose=False) == 2
+    conn = sqlite3.connect(db_path)
+    try:
+        assert verify_usage_rollup(conn) == []
+    finally:
+        conn.close()
+
+
+def test_monthly_and_yearly_reports(client, employee):
+    headers = employee("보고서")
+    admin = employee(ADMIN)
+    for start, end, leave_type in (("2027-03-02", "2027-03-03", "FULL_DAY"),
+                                   ("2027-04-05", "2027-04-05", "AFTERNOON_HALF")):
+        response = client.post("/leave-request", headers=headers,
+                               json={"start_date": start, "end_date": end, "leave_type": leave_type})
+        assert response.status_code == 200
+
+    monthly = client.get("/reports/usage/monthly", headers=headers,
+                         params={"from": "2027-03", "to": "2027-04"}).json()["items"]
+    assert [(row["month"], row["leave_type"], row["days"]) for row in monthly] == [
+        ("2027-03", "FULL_DAY", 2), ("2027-04", "AFTERNOON_HALF", 0.5)]
+
+    # 반려된 신청은 기본 보고서(반려 제외)에서 빠지고 status=REJECTED 로 볼 수 있음
+    history = client.get("/leave-history", headers=headers).json()["items"]
+    half_day = next(item for item in history if item["leave_type"] == "AFTERNOON_HALF")
+    client.post("/leave-requests/decisions", headers=admin,
+                json={"decisions": [{"id": half_day["id"], "status": "REJECTED"}]})
+
+    yearly = client.get("/reports/usage/yearly", headers=admin,
+                        params={"year": 2027, "username": "보고서"}).json()["items"]
+    assert [(row["leave_type"], row["days"]) for row in yearly] == [("FULL_DAY", 2)]
+    rejected = client.get("/reports/usage/yearly", headers=admin,
+                          params={"year": 2027, "username": "보고서", "status": "REJECTED"}).json()["items"]
+    assert [(row["leave_type"], row["days"]) for row in rejected] == [("AFTERNOON_HALF", 0.5)]
+
+    assert client.get("/reports/usage/yearly", headers=headers,
+                      params={"year": 2027, "username": ADMIN}).status_code == 403
+    assert client.get("/reports/usage/yearly", headers=headers,
+                      params={"year": 2027, "status": "BOGUS"}).status_code == 400
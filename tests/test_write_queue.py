@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+import write_queue
+from write_queue import LeaveWriteQueue, WriteQueueClosedError
+
+REQUEST = ("2031-04-01", "2031-04-01", 0.5, "MORNING_HALF")
+
+
+def test_pending_submits_fail_when_writer_stops(employee):
+    employee("대기열")
+
+    async def scenario():
+        queue = LeaveWriteQueue(max_wait_ms=0)
+        queue.start()
+        committed = asyncio.ensure_future(queue.submit("대기열", *REQUEST))
+        await asyncio.sleep(0)
+        # writer 가 종료 신호를 먼저 꺼낸 뒤에 들어온 신청 (stop() 과 submit() 이 엇갈린 경우)
+        queue._queue.put_nowait(write_queue._STOP)
+        stranded = asyncio.ensure_future(queue.submit("대기열", *REQUEST))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(queue.stop(), 5)
+
+        assert isinstance(await committed, int)
+        with pytest.raises(WriteQueueClosedError):
+            await asyncio.wait_for(stranded, 5)
+        with pytest.raises(WriteQueueClosedError):
+            await queue.submit("대기열", *REQUEST)
+
+    asyncio.run(scenario())
@@ -0,0 +1,75 @@
+import argparse
+import sqlite3
+
+from db_pool import DB_PATH
+from migrations import FILL_USAGE_ROLLUP_SQL, USAGE_ROLLUP_SELECT_SQL, migrate
+
+
+# 월별 사용 일수 요약(leave_usage_monthly) 일괄 재계산
+#
+# 평소에는 leave_requests 트리거가 같은 트랜잭션에서 요약을 갱신하므로 필요 없다.
+# 트리거 없이 데이터를 직접 고쳤거나 요약이 의심스러울 때 --verify 로 차이를 확인하고 재계산한다.
+
+
+def _expected_rows(conn):
+    return {tuple(row[:4]): (row[4], row[5]) for row in conn.execute(USAGE_ROLLUP_SELECT_SQL)}
+
+
+def _current_rows(conn):
+    return {
+        tuple(row[:4]): (row[4], row[5])
+        for row in conn.execute("SELECT month, username, leave_type, status, days, requests FROM leave_usage_monthly")
+    }
+
+
+# 요약 테이블과 원본 집계를 비교해서 다른 (월, 직원, 유형, 상태) 목록 반환
+def verify_usage_rollup(conn):
+    expected = _expected_rows(conn)
+    current = _current_rows(conn)
+    mismatches = []
+    for key in sorted(expected.keys() | current.keys()):
+        want = expected.get(key, (0, 0))
+        have = current.get(key, (0, 0))
+        if want[1] != have[1] or abs(want[0] - have[0]) > 1e-9:
+            mismatches.append((key, have, want))
+    return mismatches
+
+
+def rebuild_usage_rollup(db_path=DB_PATH, verbose=True):
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        # 재계산 중 새 신청이 끼어들지 않도록 쓰기 잠금을 잡고 한 트랜잭션으로 교체
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM leave_usage_monthly")
+        rows = conn.execute(FILL_USAGE_ROLLUP_SQL).rowcount
+        conn.commit()
+        if verbose:
+            print(f"월별 사용 일수 요약 {rows}행을 다시 계산했습니다.")
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# 직접 실행할 경우
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="월별 휴가 사용 요약 테이블을 다시 계산합니다.")
+    parser.add_argument("--db", default=DB_PATH, help="데이터베이스 파일 경로")
+    parser.add_argument("--verify", action="store_true", help="재계산하지 않고 요약과 원본의 차이만 출력")
+    args = parser.parse_args()
+
+    if args.verify:
+        migrate(args.db)
+        conn = sqlite3.connect(args.db)
+        try:
+            mismatches = verify_usage_rollup(conn)
+        finally:
+            conn.close()
+        for (month, username, leave_type, status), have, want in mismatches:
+            print(f"  {month} {username} {leave_type} {status}: 요약 {have[0]}일/{have[1]}건, 원본 {want[0]}일/{want[1]}건")
+        print(f"요약과 원본이 다른 항목: {len(mismatches)}개")
+    else:
+        rebuild_usage_rollup(args.db)
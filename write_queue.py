@@ -0,0 +1,159 @@
+import asyncio
+import os
+from bisect import bisect_left
+
+from repository import run_db, insert_leave_requests_batch
+
+
+# write-behind 모드 사용 여부 / 한 트랜잭션에 묶을 최대 신청 수 / 묶음을 모으려고 기다리는 최대 시간(ms)
+WRITE_BEHIND_ENABLED = os.environ.get("LEAVE_WRITE_BEHIND", "0") == "1"
+WRITE_BATCH_SIZE = int(os.environ.get("LEAVE_WRITE_BATCH_SIZE", "100"))
+WRITE_MAX_WAIT_MS = float(os.environ.get("LEAVE_WRITE_MAX_WAIT_MS", "5"))
+
+# 묶음 크기 분포 집계 구간
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_STOP = object()
+
+
+# stop() 이후 들어온 신청 (종료 중)
+class WriteQueueClosedError(Exception):
+    pass
+
+
+# 휴가 신청 group commit 큐
+#
+# 요청 핸들러는 submit() 으로 신청을 큐에 넣고 자기 future 만 기다린다.
+# 백그라운드 writer 태스크 하나가 큐를 비우면서 최대 batch_size 건을 한 트랜잭션으로 커밋하므로
+# SQLite 의 단일 writer 제약 아래에서도 fsync 한 번이 여러 요청을 처리한다.
+# 잔여 연차 부족 등 건별 실패는 해당 요청의 future 에만 예외로 전달된다.
+class LeaveWriteQueue:
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, max_wait_ms=WRITE_MAX_WAIT_MS):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        self._closed = True
+
+        # 지표
+        self.submitted = 0
+        self.batches = 0
+        self.flushed_items = 0
+        self.committed_items = 0
+        self.failed_batches = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._closed = False
+        self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    # 이미 받은 신청을 모두 처리한 뒤 writer 종료 (이후 submit 은 WriteQueueClosedError)
+    async def stop(self):
+        if not self.running:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, username, start_date, end_date, days, leave_type):
+        if self._closed:
+            raise WriteQueueClosedError("휴가 신청 큐가 종료되었습니다.")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((username, start_date, end_date, days, leave_type), future))
+        self.submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _writer(self):
+        try:
+            await self._write_batches()
+        finally:
+            # _STOP 뒤에 남은 신청은 처리하지 않고 실패로 알림 (기다리는 요청이 영원히 멈추지 않도록)
+            self._closed = True
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not _STOP and not item[1].done():
+                    item[1].set_exception(WriteQueueClosedError("휴가 신청 큐가 종료되었습니다."))
+
+    async def _write_batches(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+
+            # 묶음이 다 차지 않았으면 잠깐 기다려 더 모음
+            if self.max_wait > 0 and self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.max_wait)
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        self._record_batch(len(batch))
+        try:
+            results = await run_db(insert_leave_requests_batch, [request for request, _ in batch])
+        except Exception as e:
+            # 트랜잭션 전체가 실패하면 묶음의 모든 요청에 같은 예외 전달
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                self.committed_items += 1
+                future.set_result(result)
+
+    def _record_batch(self, size):
+        self.batches += 1
+        self.flushed_items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.batch_size_counts[bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+
+    def stats(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(BATCH_SIZE_BUCKETS, self.batch_size_counts)}
+        buckets["gt_" + str(BATCH_SIZE_BUCKETS[-1])] = self.batch_size_counts[-1]
+        return {
+            "running": self.running,
+            "batch_size_limit": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "committed": self.committed_items,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "avg_batch_size": self.flushed_items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size_histogram": buckets,
+        }
+
+
+# 프로세스 전역 write 큐 (LEAVE_WRITE_BEHIND=1 일 때 API 시작 시 start)
+leave_write_queue = LeaveWriteQueue()